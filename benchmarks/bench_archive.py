@@ -0,0 +1,108 @@
+"""Measure hot/cold archiving: archive throughput, file size and page timings.
+
+Times every page data path of bench_pages.py on a copy of a seeded database
+(the same fixed-seed databases), archives the resolved submissions older
+than ``--days`` days (counted back from the seed's end date) in batches,
+reclaims the freed pages, and times the page data paths again. Also reports
+how long the single longest batch held the write lock and, where SQLite has
+the dbstat table, the size of the hot table and its indexes.
+
+    python benchmarks/bench_archive.py --rows 1000000
+"""
+
+import argparse
+import datetime
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_archive  # noqa: E402
+import feedback_db  # noqa: E402
+from bench_pages import SEED_END, data_paths, measure, seeded_database  # noqa: E402
+
+# Paths that write would change what the second pass measures.
+SKIPPED_PATHS = ("submit_insert", "admin_update")
+
+
+def _pages(db, repeats):
+    timings = {}
+    for name, fn in data_paths(db):
+        if name in SKIPPED_PATHS:
+            continue
+        try:
+            timings[name] = measure(fn, repeats, warm=False)["median_ms"]
+        except Exception as exc:  # keep going so one broken path doesn't hide the rest
+            timings[name] = f"{type(exc).__name__}"
+    return timings
+
+
+HOT_SIZE_SQL = '''
+    SELECT SUM(pgsize) FROM dbstat
+    WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = 'feedback_submissions')
+'''
+
+
+def _size_mib(db):
+    """(file MiB, hot table and index MiB or None without dbstat, space_stats)."""
+    # Checkpoint first so the main file holds every page.
+    with feedback_db.connection(db) as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        stats = feedback_archive.space_stats(conn)
+        try:
+            hot = conn.execute(HOT_SIZE_SQL).fetchone()[0] / 2**20
+        except sqlite3.OperationalError:
+            hot = None
+    return os.path.getsize(db) / 2**20, hot, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=feedback_archive.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=feedback_archive.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    source = seeded_database(args.rows)
+    days = (datetime.datetime.utcnow() - SEED_END).days + args.days
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "archive.db")
+        shutil.copyfile(source, db)
+        feedback_db.init_database(db)
+        size_before, hot_before, stats = _size_mib(db)
+        before = _pages(db, args.repeats)
+
+        batch_seconds = []
+
+        def on_progress(archived, seconds):
+            batch_seconds.append(seconds)
+
+        result = feedback_archive.archive_resolved(db, days, args.batch_size, on_progress=on_progress)
+        longest = max((b - a for a, b in zip([0.0] + batch_seconds, batch_seconds)), default=0.0)
+        released = feedback_archive.reclaim_space(db, convert=stats["auto_vacuum"] != 2)
+        size_after, hot_after, _ = _size_mib(db)
+        after = _pages(db, args.repeats)
+        hot = feedback_db.fetch_one("SELECT COUNT(*) FROM feedback_submissions", path=db)[0]
+        feedback_db.close_pools()
+
+    print(f"{args.rows:,} rows; archived {result['archived']:,} resolved submissions older than {args.days} days "
+          f"in {result['batches']:,} batches of {args.batch_size:,} ({result['seconds']:.1f}s, "
+          f"{result['archived'] / max(result['seconds'], 1e-9):,.0f} rows/s, longest batch {longest * 1000:.0f} ms)")
+    print(f"{hot:,} submissions left hot; {released:,} pages released; "
+          f"file {size_before:,.1f} MiB -> {size_after:,.1f} MiB")
+    if hot_before is not None:
+        print(f"feedback_submissions and its indexes {hot_before:,.1f} MiB -> {hot_after:,.1f} MiB")
+    print(f"{'data path':22}{'before ms':>11}{'after ms':>10}{'change':>9}")
+    for name, ms in before.items():
+        if isinstance(ms, str) or isinstance(after[name], str):
+            print(f"{name:22}{ms if isinstance(ms, str) else '':>11}")
+            continue
+        print(f"{name:22}{ms:>11.2f}{after[name]:>10.2f}{(after[name] - ms) / ms if ms else 0.0:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Benchmark: ad hoc sqlite3.connect calls vs. the pooled feedback_db layer.
+
+Simulates 50 concurrent Streamlit sessions. Each session repeatedly "loads a
+page" (reads) and every few iterations submits feedback (a write). The same
+workload runs twice against fresh database files: once the way the app used
+to do it (a new default connection per operation) and once through
+``feedback_db``'s pool.
+
+    python benchmarks/bench_connection_pool.py --sessions 50 --seconds 10
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_db  # noqa: E402
+
+READ_SQL = "SELECT * FROM feedback_submissions ORDER BY id DESC LIMIT 50"
+SAMPLE = {
+    "student_id": "CU2023001",
+    "student_name": "Jane Doe",
+    "email": "jane.doe@caleb.edu.ng",
+    "department": "Computer Science",
+    "course_code": "CSC101",
+    "feedback_type": "Feedback",
+    "category": "Academic",
+    "priority": "High",
+    "feedback_text": "The course content is very engaging!",
+}
+SAMPLE_VALUES = tuple(SAMPLE[field] for field in feedback_db.SUBMISSION_FIELDS)
+
+
+def legacy_read(path):
+    conn = sqlite3.connect(path)
+    conn.execute(READ_SQL).fetchall()
+    conn.close()
+
+
+def legacy_write(path):
+    conn = sqlite3.connect(path)
+    conn.execute(feedback_db.INSERT_SUBMISSION_SQL, SAMPLE_VALUES)
+    conn.commit()
+    conn.close()
+
+
+def pooled_read(path):
+    feedback_db.fetch_all(READ_SQL, path=path)
+
+
+def pooled_write(path):
+    feedback_db.insert_submission(SAMPLE, path=path)
+
+
+def seed(path, rows, legacy):
+    feedback_db.init_database(path)
+    with feedback_db.transaction(path) as conn:
+        conn.executemany(feedback_db.INSERT_SUBMISSION_SQL, [SAMPLE_VALUES] * rows)
+    feedback_db.close_pools()
+    if legacy:
+        # journal_mode is stored in the file; put the baseline back on the
+        # default rollback journal the app used before.
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
+
+
+def run(path, read, write, sessions, seconds, write_every):
+    reads = [0] * sessions
+    write_latencies = [[] for _ in range(sessions)]
+    errors = [0] * sessions
+    stop = threading.Event()
+
+    def session(n):
+        i = 0
+        while not stop.is_set():
+            i += 1
+            try:
+                if i % write_every == 0:
+                    started = time.perf_counter()
+                    write(path)
+                    write_latencies[n].append(time.perf_counter() - started)
+                else:
+                    read(path)
+                    reads[n] += 1
+            except sqlite3.OperationalError:
+                errors[n] += 1
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies = sorted(x for per_session in write_latencies for x in per_session)
+    return {
+        "reads_per_sec": sum(reads) / seconds,
+        "writes": len(latencies),
+        "write_p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "write_p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan"),
+        "locked_errors": sum(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--write-every", type=int, default=10,
+                        help="every Nth operation of a session is a write")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, read, write in (("before (connect per call)", legacy_read, legacy_write),
+                                   ("after (feedback_db pool)", pooled_read, pooled_write)):
+            path = os.path.join(tmp, label.split()[0] + ".db")
+            seed(path, args.rows, legacy=read is legacy_read)
+            results[label] = run(path, read, write, args.sessions, args.seconds, args.write_every)
+            feedback_db.close_pools()
+
+    print(f"{args.sessions} sessions, {args.seconds:g}s, 1 write per {args.write_every} ops")
+    print(f"{'':28}{'reads/s':>10}{'writes':>8}{'w p50 ms':>10}{'w p99 ms':>10}{'locked':>8}")
+    for label, r in results.items():
+        print(f"{label:28}{r['reads_per_sec']:>10.0f}{r['writes']:>8}"
+              f"{r['write_p50_ms']:>10.2f}{r['write_p99_ms']:>10.2f}{r['locked_errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Measure the near-duplicate index: recall, precision and insert-time overhead.
+
+Quality is measured on ``--sample`` random submissions of a seeded database
+(the same fixed-seed databases as bench_pages.py): every pair whose exact
+word-bigram Jaccard similarity reaches ``feedback_dedup.THRESHOLD`` should
+share a cluster (recall), and every pair sharing a cluster should reach it
+(precision). Overhead is measured by inserting ``--inserts`` fresh
+submissions into a copy of the database one transaction at a time, timing
+the INSERT and commit separately from the index update.
+
+    python benchmarks/bench_dedup.py --rows 1000000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_db  # noqa: E402
+import feedback_dedup  # noqa: E402
+import feedback_generator  # noqa: E402
+from bench_pages import seeded_database  # noqa: E402
+
+
+def jaccard(first, second):
+    return len(first & second) / len(first | second) if first or second else 0.0
+
+
+def quality(db, sample_size, seed):
+    """(true pairs, clustered pairs, pairs in both) over a random sample."""
+    newest = feedback_db.fetch_one("SELECT MAX(id) FROM feedback_submissions", path=db)[0]
+    ids = random.Random(seed).sample(range(1, newest + 1), min(sample_size, newest))
+    rows = []
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        rows.extend(feedback_db.fetch_all(f'''
+            SELECT s.feedback_text, d.cluster_id FROM feedback_submissions AS s
+            JOIN feedback_duplicates AS d ON d.submission_id = s.id
+            WHERE s.id IN ({", ".join("?" * len(chunk))})
+        ''', chunk, path=db))
+    sample = [(feedback_dedup.shingles(text), cluster_id) for text, cluster_id in rows]
+    true_pairs = clustered = both = 0
+    for (first, first_cluster), (second, second_cluster) in itertools.combinations(sample, 2):
+        similar = jaccard(first, second) >= feedback_dedup.THRESHOLD
+        same = first_cluster == second_cluster
+        true_pairs += similar
+        clustered += same
+        both += similar and same
+    return true_pairs, clustered, both
+
+
+def insert_overhead(db, inserts, seed):
+    """Per-insert milliseconds (INSERT + commit, index update) on a copy of ``db``."""
+    base, index = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "dedup.db")
+        shutil.copyfile(db, copy)
+        rows = feedback_generator.generate_submissions(inserts, seed=seed)
+        for row in rows:
+            values = tuple(row[field] for field in feedback_db.SUBMISSION_FIELDS)
+            started = time.perf_counter()
+            with feedback_db.transaction(copy) as conn:
+                conn.execute(feedback_db.INSERT_SUBMISSION_SQL, values)
+                inserted = time.perf_counter()
+                feedback_dedup.index_new_submissions(conn)
+                indexed = time.perf_counter()
+            committed = time.perf_counter()
+            base.append((inserted - started + committed - indexed) * 1000)
+            index.append((indexed - inserted) * 1000)
+        feedback_db.close_pools()
+    return base, index
+
+
+def _p(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--sample", type=int, default=2000, help="submissions compared pairwise for quality")
+    parser.add_argument("--inserts", type=int, default=1000, help="single-row inserts timed for overhead")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    db = seeded_database(args.rows)
+    feedback_db.ensure_database(db)
+    clusters, buckets = feedback_db.fetch_one('''
+        SELECT (SELECT COUNT(*) FROM feedback_duplicate_clusters), (SELECT COUNT(*) FROM feedback_lsh_buckets)
+    ''', path=db)
+    print(f"{args.rows:,} rows, {clusters:,} clusters, {buckets:,} LSH bucket entries "
+          f"({feedback_dedup.BANDS} bands x {feedback_dedup.ROWS_PER_BAND} rows, threshold {feedback_dedup.THRESHOLD})")
+
+    started = time.perf_counter()
+    true_pairs, clustered, both = quality(db, args.sample, args.seed)
+    print(f"quality over {args.sample:,} sampled submissions ({time.perf_counter() - started:.1f}s):")
+    print(f"  recall    {both / true_pairs if true_pairs else 1.0:.3f}  ({both:,} of {true_pairs:,} similar pairs clustered)")
+    print(f"  precision {both / clustered if clustered else 1.0:.3f}  ({both:,} of {clustered:,} clustered pairs similar)")
+
+    base, index = insert_overhead(db, args.inserts, args.seed)
+    print(f"insert overhead over {args.inserts:,} single-row transactions:")
+    print(f"{'':16}{'p50 ms':>9}{'p99 ms':>9}{'mean ms':>9}")
+    for name, values in (("insert+commit", base), ("index update", index)):
+        print(f"{name:16}{statistics.median(values):>9.2f}{_p(values, 0.99):>9.2f}{statistics.fmean(values):>9.2f}")
+    print(f"index update adds {statistics.fmean(index) / statistics.fmean(base):.0%} to the mean insert")
+    feedback_db.close_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark streaming export throughput and memory on a seeded table.
+
+Uses the same fixed-seed databases as bench_pages.py (1M rows by default)
+and exports every row in each format, reporting rows per second, output
+size and peak traced Python allocation (measured in a second pass).
+
+    python benchmarks/bench_export.py --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_db  # noqa: E402
+import feedback_export  # noqa: E402
+from bench_pages import seeded_database  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunk-size", type=int, default=feedback_export.CHUNK_SIZE)
+    parser.add_argument("--formats", nargs="+", default=list(feedback_export.FORMATS))
+    args = parser.parse_args()
+
+    db = seeded_database(args.rows)
+    feedback_db.ensure_database(db)
+    print(f"{args.rows:,} rows, chunk size {args.chunk_size:,}")
+    print(f"{'format':10}{'rows/s':>12}{'seconds':>10}{'file MiB':>10}{'peak KiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            output = os.path.join(tmp, f"export.{fmt}")
+            try:
+                stats = feedback_export.export_submissions(fmt, output, chunk_size=args.chunk_size, path=db)
+            except ImportError as exc:
+                print(f"{fmt:10}  skipped: {exc}")
+                continue
+            # Second pass under tracemalloc, which would distort the timing.
+            tracemalloc.start()
+            feedback_export.export_submissions(fmt, output, chunk_size=args.chunk_size, path=db)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{fmt:10}{stats['rows_per_sec']:>12,.0f}{stats['seconds']:>10.2f}"
+                  f"{os.path.getsize(output) / 2**20:>10.1f}{peak / 1024:>10.0f}")
+    feedback_db.close_pools()
+
+
+if __name__ == "__main__":
+    main()
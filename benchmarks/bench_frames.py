@@ -0,0 +1,65 @@
+"""Compare DataFrame memory of each listing view: all object columns vs typed and projected.
+
+For every view the "before" frame holds the same rows read with
+``SELECT *`` and default (object) dtypes, as the pages did before the
+typed loader; the "after" frame is what the app loads now, with only the
+view's columns, Categoricals and parsed dates. Uses the same fixed-seed
+databases as bench_pages.py.
+
+    python benchmarks/bench_frames.py --rows 100000
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_db  # noqa: E402
+from bench_pages import seeded_database  # noqa: E402
+
+PENDING = {"status": "Pending", "priority": "All", "category": "All"}
+
+
+def views(db):
+    """(name, before frame, after frame) for every listing view."""
+    def select_all(where, params, limit):
+        return feedback_db.read_dataframe(
+            f"SELECT * FROM feedback_submissions {where} ORDER BY submission_date DESC, id DESC LIMIT ?",
+            params + (limit,), path=db)
+
+    search_ids = feedback_db.search_submissions("hostel generator", PENDING, page_size=200, path=db)[0]["id"]
+    placeholders = ", ".join("?" * len(search_ids))
+    yield ("dashboard_recent", select_all("", (), 10), feedback_db.recent_submissions(10, path=db))
+    for size in (50, 200):
+        yield (f"manage_page_{size}", select_all("WHERE status = ?", ("Pending",), size),
+               feedback_db.submission_page(PENDING, page_size=size, path=db)[0])
+    yield ("manage_search_200",
+           feedback_db.read_dataframe(f"SELECT * FROM feedback_submissions WHERE id IN ({placeholders})",
+                                      tuple(int(i) for i in search_ids), path=db),
+           feedback_db.search_submissions("hostel generator", PENDING, page_size=200, path=db)[0])
+    everything = feedback_db.read_dataframe("SELECT * FROM feedback_submissions", path=db)
+    yield ("full_table", everything,
+           feedback_db.read_frame(f"SELECT {', '.join(feedback_db.MANAGE_COLUMNS)} FROM feedback_submissions",
+                                  path=db))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    db = seeded_database(args.rows)
+    feedback_db.ensure_database(db)
+    print(f"{args.rows:,} rows")
+    print(f"{'view':20}{'rows':>8}{'before KiB':>12}{'after KiB':>11}{'ratio':>8}")
+    for name, before, after in views(db):
+        before_kib = feedback_db.frame_memory(before) / 1024
+        after_kib = feedback_db.frame_memory(after) / 1024
+        print(f"{name:20}{len(after):>8,}{before_kib:>12,.1f}{after_kib:>11,.1f}"
+              f"{before_kib / after_kib if after_kib else 0:>7.1f}x")
+    feedback_db.close_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Reproducible benchmark of every page's data path, without the browser.
+
+Seeds databases of 1k, 100k and 1M synthetic submissions with a fixed seed
+(cached under benchmarks/.data/ and copied fresh for each run), then times
+the feedback_db calls behind each page: Welcome stats, Dashboard cards and
+recent list, Analytics counts and SLA figures, Manage Submissions filtering,
+search, near-duplicate groups and selection, the submit INSERT and the
+admin UPDATE.
+
+For every path it records median and p95 wall time, peak Python allocation
+(tracemalloc) and the number of SQL statements executed. The run's peak RSS
+is recorded too. Results go to a JSON report that can be compared with an
+earlier one:
+
+    python benchmarks/bench_pages.py --output before.json
+    python benchmarks/bench_pages.py --output after.json --compare before.json --threshold 0.2
+
+With --compare the script exits with status 1 if any path's median got
+slower by more than the threshold (relative, ignoring sub-millisecond noise).
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import feedback_db  # noqa: E402
+import feedback_generator  # noqa: E402
+import feedback_import  # noqa: E402
+import feedback_migrations  # noqa: E402
+from feedback_cache import query_cache  # noqa: E402
+
+DATA_DIR = os.path.join(ROOT, "benchmarks", ".data")
+DEFAULT_SIZES = (1000, 100000, 1000000)
+SEED = 0
+# A fixed end date keeps the generated rows identical from day to day.
+SEED_END = datetime.datetime(2026, 1, 1)
+NOISE_FLOOR_MS = 1.0
+
+SAMPLE = {
+    "student_id": "CU2023001",
+    "student_name": "Jane Doe",
+    "email": "jane.doe@caleb.edu.ng",
+    "department": "Computer Science",
+    "course_code": "CSC101",
+    "feedback_type": "Feedback",
+    "category": "Academic",
+    "priority": "High",
+    "feedback_text": "The course content is very engaging!",
+}
+
+
+def seeded_database(rows):
+    """Return the path of a cached database seeded with ``rows`` submissions."""
+    name = f"feedback_{rows}_seed{SEED}_v{feedback_migrations.LATEST_VERSION}.db"
+    path = os.path.join(DATA_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        partial = path + ".partial"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(partial + suffix):
+                os.remove(partial + suffix)
+        print(f"Seeding {rows:,} rows into {path} ...", file=sys.stderr)
+        feedback_import.bulk_import(
+            feedback_generator.generate_submissions(rows, seed=SEED, end=SEED_END),
+            partial, defer_indexes=True,
+        )
+        feedback_db.close_pools()
+        conn = sqlite3.connect(partial)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+        os.replace(partial, path)
+    return path
+
+
+def data_paths(db):
+    """(name, callable) for every page data path, bound to database ``db``."""
+    newest = feedback_db.fetch_one("SELECT MAX(id) FROM feedback_submissions", path=db)[0]
+    pending = {"status": "Pending", "priority": "All", "category": "All"}
+    narrow = {"status": "Pending", "priority": "Urgent", "category": "Facilities"}
+
+    def dashboard():
+        feedback_db.submission_metrics(path=db)
+        feedback_db.recent_submissions(10, path=db)
+
+    def analytics_sla():
+        feedback_db.sla_summary("priority", path=db)
+        feedback_db.sla_summary("department", path=db)
+        feedback_db.submission_volume("week", path=db)
+
+    def manage_filter():
+        for column in feedback_db.FILTER_COLUMNS:
+            feedback_db.filter_options(column, path=db)
+        feedback_db.count_submissions(pending, path=db)
+        feedback_db.submission_page(pending, path=db)
+
+    def manage_filter_narrow():
+        feedback_db.count_submissions(narrow, path=db)
+        feedback_db.submission_page(narrow, path=db)
+
+    def manage_next_page():
+        _, cursor = feedback_db.submission_page(pending, path=db)
+        feedback_db.submission_page(pending, after=cursor, path=db)
+
+    def manage_duplicates():
+        # The seeded rows end at SEED_END, so the window reaches back to its last month.
+        days = (datetime.datetime.utcnow() - SEED_END).days + feedback_db.DUPLICATE_WINDOW_DAYS
+        clusters = feedback_db.duplicate_clusters(pending, days=days, path=db)
+        if clusters:
+            feedback_db.cluster_submission_ids(clusters[0]["cluster_id"], pending, days=days, path=db)
+
+    def manage_search():
+        feedback_db.count_search_results("hostel generator", pending, path=db)
+        feedback_db.search_submissions("hostel generator", pending, path=db)
+
+    return [
+        ("welcome_stats", lambda: feedback_db.submission_metrics(path=db)),
+        ("dashboard", dashboard),
+        ("analytics", lambda: feedback_db.analytics_counts(path=db)),
+        ("analytics_sla", analytics_sla),
+        ("manage_filter", manage_filter),
+        ("manage_filter_narrow", manage_filter_narrow),
+        ("manage_next_page", manage_next_page),
+        ("manage_search", manage_search),
+        ("manage_duplicates", manage_duplicates),
+        ("manage_select", lambda: feedback_db.get_submission(newest // 2 or 1, path=db)),
+        ("submit_insert", lambda: feedback_db.insert_submission(SAMPLE, path=db)),
+        ("admin_update", lambda: feedback_db.update_submission(newest, "In Progress", "Looking into it.", path=db)),
+    ]
+
+
+def measure(fn, repeats, warm):
+    statements = []
+
+    def count(sql):
+        # Statements run inside triggers are reported as "-- TRIGGER ..." comments.
+        if not sql.startswith("--"):
+            statements.append(sql)
+
+    feedback_db.add_statement_listener(count)
+    try:
+        timings = []
+        for _ in range(repeats):
+            if not warm:
+                query_cache.invalidate()
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        feedback_db.remove_statement_listener(count)
+
+    if not warm:
+        query_cache.invalidate()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "queries": round(len(statements) / repeats, 1),
+    }
+
+
+def run(sizes, repeats, warm):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            db = os.path.join(tmp, f"bench_{rows}.db")
+            shutil.copyfile(seeded_database(rows), db)
+            feedback_db.init_database(db)
+            results[str(rows)] = {}
+            for name, fn in data_paths(db):
+                try:
+                    results[str(rows)][name] = measure(fn, repeats, warm)
+                except Exception as exc:  # keep going so one broken path doesn't hide the rest
+                    results[str(rows)][name] = {"error": f"{type(exc).__name__}: {exc}"}
+            feedback_db.close_pools()
+            query_cache.invalidate()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(report, baseline, threshold):
+    found = []
+    for size, paths in report["results"].items():
+        for name, result in paths.items():
+            before = baseline.get("results", {}).get(size, {}).get(name, {})
+            if "median_ms" not in result or "median_ms" not in before:
+                continue
+            if (result["median_ms"] > before["median_ms"] * (1 + threshold)
+                    and result["median_ms"] - before["median_ms"] > NOISE_FLOOR_MS):
+                found.append((size, name, before["median_ms"], result["median_ms"]))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--warm", action="store_true", help="leave the query cache on between repeats")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative slowdown before a path counts as a regression")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeats, args.warm)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": SEED,
+            "repeats": args.repeats,
+            "warm_cache": args.warm,
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        "results": results,
+    }
+
+    print(f"{'rows':>9}  {'path':22}{'median ms':>11}{'p95 ms':>10}{'peak KiB':>10}{'queries':>9}")
+    for size, paths in results.items():
+        for name, r in paths.items():
+            if "error" in r:
+                print(f"{int(size):>9,}  {name:22}  {r['error']}")
+            else:
+                print(f"{int(size):>9,}  {name:22}{r['median_ms']:>11.3f}{r['p95_ms']:>10.3f}"
+                      f"{r['peak_alloc_kb']:>10.1f}{r['queries']:>9.1f}")
+    print(f"peak RSS: {report['meta']['peak_rss_kb'] / 1024:.1f} MiB")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        found = regressions(report, baseline, args.threshold)
+        for size, name, before, after in found:
+            print(f"REGRESSION {name} @ {int(size):,} rows: {before:.3f} ms -> {after:.3f} ms")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Submit latency while analytics and exports run, on the live file vs. the replica.
+
+On a copy of a seeded database (the same fixed-seed databases as
+bench_pages.py), one thread submits feedback in a loop, as the submit form
+does, while ``--readers`` threads run the Analytics page's reads (with the
+query cache cleared each time, as after every write) and stream a full
+export. The same workload runs once with the readers on the live file and
+once on a replica kept by ``feedback_replica``, refreshed from a background
+thread after every ``--refresh-writes`` submissions. Reports submit p50/p99, WAL growth and
+reader throughput.
+
+    python benchmarks/bench_replica.py --rows 1000000 --seconds 20
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_db  # noqa: E402
+import feedback_export  # noqa: E402
+import feedback_replica  # noqa: E402
+from bench_pages import SAMPLE, seeded_database  # noqa: E402
+
+
+def analytics_pass(path):
+    feedback_db.invalidate_cache(path)
+    feedback_db.analytics_counts(path=path)
+    for by in feedback_db.SLA_BREAKDOWNS:
+        feedback_db.sla_summary(by, None, path=path)
+    for period in feedback_db.SLA_PERIODS:
+        try:
+            feedback_db.submission_volume(period, None, path=path)
+        except ImportError:
+            # The volume chart needs pandas; the rest of the load still runs.
+            break
+    for _ in feedback_export.iter_chunks(path=path):
+        pass
+
+
+def run(db, read_db, readers, seconds, replica=None):
+    latencies = []
+    passes = [0] * readers
+    stop = threading.Event()
+
+    def reader(n):
+        while not stop.is_set():
+            analytics_pass(read_db)
+            passes[n] += 1
+
+    def refresher():
+        # feedback_replica's own thread, minus the poll interval and with a way to stop.
+        while not stop.wait(0.05):
+            if replica.due():
+                replica.refresh()
+
+    threads = [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+    if replica is not None:
+        threads.append(threading.Thread(target=refresher))
+    for t in threads:
+        t.start()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        feedback_db.insert_submission(SAMPLE, path=db)
+        latencies.append(time.perf_counter() - started)
+    wal_bytes = os.path.getsize(db + "-wal") if os.path.exists(db + "-wal") else 0
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    return {
+        "writes": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "wal_mib": wal_bytes / 2**20,
+        "passes": sum(passes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--refresh-writes", type=int, default=feedback_replica.REFRESH_AFTER_WRITES)
+    args = parser.parse_args()
+
+    source = seeded_database(args.rows)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("idle", "live file", "replica"):
+            db = os.path.join(tmp, f"{label.replace(' ', '_')}.db")
+            shutil.copyfile(source, db)
+            feedback_db.init_database(db)
+            if label == "replica":
+                replica = feedback_replica.SnapshotReplica(db, os.path.join(tmp, "replica_copy.db"),
+                                                           refresh_after_writes=args.refresh_writes)
+                replica.refresh()
+                results[label] = run(db, replica.replica, args.readers, args.seconds, replica)
+                results[label]["refreshes"] = replica.refreshes
+                results[label]["refresh_ms"] = replica.last_refresh_ms
+            else:
+                results[label] = run(db, db, 0 if label == "idle" else args.readers, args.seconds)
+        feedback_db.close_pools()
+
+    print(f"{args.rows:,} rows, {args.readers} analytics readers, {args.seconds:g}s, "
+          f"replica refreshed every {args.refresh_writes:,} submissions")
+    print(f"{'readers on':12}{'submits':>9}{'p50 ms':>9}{'p99 ms':>9}{'WAL MiB':>9}{'passes':>8}")
+    for label, r in results.items():
+        print(f"{label:12}{r['writes']:>9,}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['wal_mib']:>9.1f}{r['passes']:>8}")
+    print(f"replica: {results['replica']['refreshes']} refreshes, last took {results['replica']['refresh_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare a full reload of the open-submissions view with an incremental refresh.
+
+On a copy of a seeded database (the same fixed-seed databases as
+bench_pages.py), loads a ``feedback_sync.SyncedView`` of the Pending and In
+Progress submissions, then for each count in ``--changes`` inserts that many
+submissions and answers that many open ones, and times ``refresh()``
+against loading the view from scratch. Also times a refresh with nothing
+changed, which is what an idle auto-refresh pays. Only the SQL and merge
+are timed, not building the DataFrame.
+
+    python benchmarks/bench_sync.py --rows 1000000
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_db  # noqa: E402
+import feedback_sync  # noqa: E402
+from bench_pages import SAMPLE, seeded_database  # noqa: E402
+
+
+def _ms(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--changes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    source = seeded_database(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "sync.db")
+        shutil.copyfile(source, db)
+        feedback_db.init_database(db)
+        view = feedback_sync.SyncedView()
+        view.refresh(db)
+        full_ms = _ms(lambda: feedback_sync.SyncedView().refresh(db), args.repeats)
+        idle_ms = _ms(lambda: view.refresh(db), args.repeats)
+        print(f"{args.rows:,} rows, {len(view):,} open; full load {full_ms:.2f} ms, idle refresh {idle_ms:.3f} ms")
+        print(f"{'changes':>8}{'refresh ms':>12}{'vs full load':>14}")
+        for changes in args.changes:
+            timings = []
+            for _ in range(args.repeats):
+                with feedback_db.transaction(db) as conn:
+                    values = tuple(SAMPLE[field] for field in feedback_db.SUBMISSION_FIELDS)
+                    conn.executemany(feedback_db.INSERT_SUBMISSION_SQL, [values] * changes)
+                answered = [row["id"] for row in feedback_db.fetch_all(
+                    "SELECT id FROM feedback_submissions WHERE status = 'Pending' LIMIT ?", (changes,), path=db)]
+                feedback_db.bulk_update_submissions(answered, "Completed", "Resolved.", path=db)
+                started = time.perf_counter()
+                view.refresh(db)
+                timings.append((time.perf_counter() - started) * 1000)
+            refresh_ms = statistics.median(timings)
+            print(f"{changes:>8,}{refresh_ms:>12.2f}{refresh_ms / full_ms:>14.1%}")
+        feedback_db.close_pools()
+
+
+if __name__ == "__main__":
+    main()
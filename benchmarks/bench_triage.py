@@ -0,0 +1,123 @@
+"""Simulate concurrent admins working through the triage queue.
+
+``--admins`` threads each take ``--batch`` items at a time off the front of
+the queue and answer them, for ``--seconds`` seconds, in three modes:
+
+    overwrite  read the queue head and update unconditionally (the old behaviour)
+    versioned  read the queue head and update with the version read
+    claimed    claim items with a lease, then update with the version read
+
+For each mode it reports items answered per second, claim/read and update
+latency, how many updates overwrote another admin's answer (lost), how many
+were rejected as conflicts, and how many items were handed to two admins at
+once. Runs on a copy of a seeded database (the same fixed-seed databases as
+bench_pages.py).
+
+    python benchmarks/bench_triage.py --admins 20 --rows 100000
+"""
+
+import argparse
+import collections
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_db  # noqa: E402
+from bench_pages import seeded_database  # noqa: E402
+
+MODES = ("overwrite", "versioned", "claimed")
+
+
+def _p(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run(db, mode, admins, batch, seconds, think_ms):
+    answered = collections.Counter()
+    taken = collections.Counter()
+    stats = {"take_ms": [], "update_ms": [], "conflicts": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def admin(number):
+        name = f"admin{number}"
+        take_ms, update_ms, done, got, conflicts = [], [], [], [], 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            if mode == "claimed":
+                ids = feedback_db.claim_next(name, batch, path=db)
+                items = [(submission_id, feedback_db.get_submission(submission_id, path=db)["version"])
+                         for submission_id in ids]
+            else:
+                items = [(row["id"], row["version"]) for row in feedback_db.triage_queue(batch, path=db)]
+            take_ms.append((time.perf_counter() - started) * 1000)
+            got.extend(submission_id for submission_id, _ in items)
+            for submission_id, version in items:
+                time.sleep(think_ms / 1000)
+                started = time.perf_counter()
+                try:
+                    feedback_db.update_submission(submission_id, "In Progress", f"Handled by {name}.",
+                                                  version=None if mode == "overwrite" else version, path=db)
+                    done.append(submission_id)
+                except feedback_db.UpdateConflict:
+                    conflicts += 1
+                update_ms.append((time.perf_counter() - started) * 1000)
+        with lock:
+            answered.update(done)
+            taken.update(got)
+            stats["take_ms"].extend(take_ms)
+            stats["update_ms"].extend(update_ms)
+            stats["conflicts"] += conflicts
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=admin, args=(number,)) for number in range(admins)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stats.update(
+        elapsed=elapsed,
+        answered=len(answered),
+        lost=sum(answered.values()) - len(answered),
+        double_taken=sum(1 for count in taken.values() if count > 1),
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--admins", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=5, help="items taken off the queue at a time")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--think-ms", type=float, default=2.0, help="time spent writing each response")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    source = seeded_database(args.rows)
+    print(f"{args.rows:,} rows, {args.admins} admins, batches of {args.batch}, {args.seconds:.0f}s per mode")
+    print(f"{'mode':11}{'items/s':>9}{'take p50':>10}{'take p99':>10}{'upd p50':>9}{'upd p99':>9}"
+          f"{'lost':>7}{'conflicts':>11}{'double':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            db = os.path.join(tmp, f"{mode}.db")
+            shutil.copyfile(source, db)
+            feedback_db.ensure_database(db)
+            stats = run(db, mode, args.admins, args.batch, args.seconds, args.think_ms)
+            feedback_db.close_pools()
+            print(f"{mode:11}{stats['answered'] / stats['elapsed']:>9,.0f}"
+                  f"{statistics.median(stats['take_ms']):>10.2f}{_p(stats['take_ms'], 0.99):>10.2f}"
+                  f"{statistics.median(stats['update_ms']):>9.2f}{_p(stats['update_ms'], 0.99):>9.2f}"
+                  f"{stats['lost']:>7,}{stats['conflicts']:>11,}{stats['double_taken']:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark: direct per-request INSERT transactions vs. the coalescing writer.
+
+Simulates a burst of students submitting at the same moment. Each session
+submits feedback in a loop; the same workload runs once with a transaction
+per submission (``feedback_db.insert_submission``) and once through
+``feedback_writer``.
+
+    python benchmarks/bench_write_queue.py --sessions 200 --seconds 10
+"""
+
+import argparse
+import itertools
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_db  # noqa: E402
+import feedback_ratelimit  # noqa: E402
+import feedback_writer  # noqa: E402
+
+SAMPLE = {
+    "student_id": "CU2023002",
+    "student_name": "John Smith",
+    "email": "john.smith@caleb.edu.ng",
+    "department": "Engineering",
+    "course_code": "ENG201",
+    "feedback_type": "Grievance",
+    "category": "Facilities",
+    "priority": "Urgent",
+    "feedback_text": "The air conditioning is not working.",
+}
+
+
+def new_student(numbers=itertools.count()):
+    """SAMPLE as sent by a new student each time, so rate limits never refuse it."""
+    n = next(numbers)
+    return dict(SAMPLE, student_id=f"CU{n:07d}", email=f"student{n}@caleb.edu.ng")
+
+
+def run(write, sessions, seconds):
+    latencies = [[] for _ in range(sessions)]
+    errors = [0] * sessions
+    stop = threading.Event()
+
+    def session(n):
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                write()
+            except (sqlite3.OperationalError, feedback_writer.WriteQueueFull, feedback_ratelimit.RateLimited):
+                errors[n] += 1
+                continue
+            latencies[n].append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    all_latencies = sorted(x for per_session in latencies for x in per_session)
+    return {
+        "writes_per_sec": len(all_latencies) / seconds,
+        "p50_ms": statistics.median(all_latencies) * 1000 if all_latencies else float("nan"),
+        "p99_ms": all_latencies[int(len(all_latencies) * 0.99) - 1] * 1000 if all_latencies else float("nan"),
+        "errors": sum(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        direct_db = os.path.join(tmp, "direct.db")
+        queued_db = os.path.join(tmp, "queued.db")
+        feedback_db.init_database(direct_db)
+        feedback_db.init_database(queued_db)
+
+        direct = run(lambda: feedback_db.insert_submission(new_student(), path=direct_db), args.sessions, args.seconds)
+        queued = run(lambda: feedback_writer.submit_feedback(new_student(), path=queued_db), args.sessions, args.seconds)
+        writer_stats = feedback_writer.get_writer(queued_db).stats()
+        feedback_db.close_pools()
+
+    print(f"{args.sessions} concurrent submitters, {args.seconds:g}s")
+    print(f"{'':30}{'writes/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for label, r in (("direct (txn per submission)", direct), ("feedback_writer (coalesced)", queued)):
+        print(f"{label:30}{r['writes_per_sec']:>10.0f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}")
+    print(f"writer: {writer_stats['batches']} commits, avg batch {writer_stats['avg_batch_size']:.1f}, "
+          f"largest {writer_stats['largest_batch']}, rejected {writer_stats['rejected']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Record EXPLAIN QUERY PLAN output for the app's hot queries.
+
+Builds a scratch database at the latest schema version, seeds it with
+generated submissions (archiving the resolved ones older than
+``feedback_archive.ARCHIVE_AFTER_DAYS``), runs ANALYZE and prints the plan
+of every query in ``HOT_QUERIES``. Exits with status 1 if any of them does
+a full scan (a ``SCAN`` that uses no index, under its table name or an
+alias) of a table in ``GUARDED_TABLES``, other than those listed in
+``EXPECTED_SCANS``, so a missing index on a hot path is caught.
+tests/test_query_plans.py runs the same check.
+
+    python benchmarks/check_query_plans.py [--rows 5000] [--output plans.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_archive  # noqa: E402
+import feedback_db  # noqa: E402
+import feedback_dedup  # noqa: E402
+import feedback_enrich  # noqa: E402
+import feedback_import  # noqa: E402
+import feedback_sync  # noqa: E402
+import feedback_triage  # noqa: E402
+from feedback_generator import generate_submissions  # noqa: E402
+
+HOT_QUERIES = {
+    "submission_metrics": (feedback_db.SUBMISSION_METRICS_SQL, ("2025-01-01 00:00:00",)),
+    "recent_submissions": (feedback_db.RECENT_SUBMISSIONS_SQL, (10,)),
+    "analytics_counts": (feedback_db.ROLLUP_COUNTS_SQL, ()),
+    "change_token": (feedback_db.CHANGE_TOKEN_SQL, ()),
+    "sla_volume_week": (feedback_db.SLA_VOLUME_SQL.format(period=feedback_db.SLA_PERIODS["week"]), ("2025-01-01",)),
+    "sla_totals": (feedback_db.SLA_TOTALS_SQL, ("2025-01-01",)),
+    "sla_open_breaches": (feedback_db.OPEN_BREACHES_SQL, ("2025-01-01", "2025-06-01 00:00:00")),
+    "duplicate_clusters": (
+        feedback_db.DUPLICATE_CLUSTERS_SQL.format(where="s.submission_date >= ? AND s.status = ?"),
+        ("2025-01-01 00:00:00", "Pending", 20),
+    ),
+    "cluster_members": (
+        feedback_db.CLUSTER_MEMBERS_SQL.format(where="d.cluster_id = ? AND s.submission_date >= ?"),
+        (1, "2025-01-01 00:00:00"),
+    ),
+    "lsh_bucket_hits": (feedback_dedup.BUCKET_HITS_SQL, ("[1, 2, 3]",)),
+    "lsh_clusters": (feedback_dedup.CLUSTERS_SQL, ("[1, 2, 3]",)),
+    "triage_queue": (feedback_db.TRIAGE_QUEUE_SQL, ("2025-01-01 00:00:00", 20)),
+    "triage_claim": (feedback_triage.CLAIM_SQL, ("admin", "+15 minutes", 5)),
+    "claimed_submissions": (feedback_db.CLAIMED_SQL, ("admin", "2025-01-01 00:00:00")),
+    "sync_changes": (
+        feedback_sync.CHANGED_SQL.format(columns=", ".join(feedback_db.MANAGE_COLUMNS)), (4000, 100, 4000),
+    ),
+    "sync_deleted": (feedback_sync.DELETED_SQL, (100,)),
+    "enrich_next_rows": (feedback_enrich.NEXT_ROWS_SQL, {"after": 1000, "limit": 5000}),
+    "enrich_missing_rows": (feedback_enrich.MISSING_ROWS_SQL, {"after": 1000, "limit": 5000}),
+    "text_sentiment": (feedback_db.TEXT_SENTIMENT_SQL, ()),
+    "text_topics": (feedback_db.TEXT_TOPICS_SQL, ()),
+    "text_features": (feedback_db.TEXT_FEATURES_SQL, (1,)),
+    "filter_status": (
+        "SELECT * FROM feedback_submissions WHERE status = ? ORDER BY submission_date DESC LIMIT 50",
+        ("Pending",),
+    ),
+    "filter_priority": (
+        "SELECT * FROM feedback_submissions WHERE priority = ? ORDER BY submission_date DESC LIMIT 50",
+        ("Urgent",),
+    ),
+    "filter_category": (
+        "SELECT * FROM feedback_submissions WHERE category = ? ORDER BY submission_date DESC LIMIT 50",
+        ("Facilities",),
+    ),
+    "filter_department": (
+        "SELECT * FROM feedback_submissions WHERE department = ? ORDER BY submission_date DESC LIMIT 50",
+        ("Law",),
+    ),
+    "manage_page_keyset": (
+        "SELECT * FROM feedback_submissions WHERE status = ? AND priority = ? AND (submission_date, id) < (?, ?)"
+        " ORDER BY submission_date DESC, id DESC LIMIT ?",
+        ("Pending", "High", "2025-01-01 00:00:00", 1000, 51),
+    ),
+    "get_submission": (feedback_db.GET_SUBMISSION_SQL, (1,)),
+    "get_archived": (feedback_archive.GET_ARCHIVED_SQL, (1,)),
+    "archive_batch": (
+        feedback_archive.ARCHIVE_BATCH_SQL,
+        feedback_archive.RESOLVED_STATUSES + ("2025-01-01 00:00:00", 1000),
+    ),
+    "filter_options": (feedback_db.FILTER_OPTIONS_SQL, ("status",)),
+    "search": (
+        feedback_db.SEARCH_SQL.format(where="feedback_fts MATCH ? AND s.status = ?"),
+        ("\x02", "\x03", '"air" "conditioning"', "Pending", 51, 0),
+    ),
+    "student_submissions": (
+        feedback_db._student_page_query(("2025-01-01 00:00:00", 1000), feedback_db.STUDENT_PAGE_SIZE),
+        {"student": "CU2023001", "email": "student@caleb.edu.ng", "date": "2025-01-01 00:00:00", "id": 1000,
+         "limit": feedback_db.STUDENT_PAGE_SIZE + 1},
+    ),
+    "count_by_category": (
+        "SELECT category, COUNT(*) FROM feedback_submissions GROUP BY category", (),
+    ),
+    "count_by_status": (
+        "SELECT status, COUNT(*) FROM feedback_submissions GROUP BY status", (),
+    ),
+}
+
+GUARDED_TABLES = {
+    "feedback_submissions", feedback_archive.ARCHIVE_TABLE, "feedback_rollups", "feedback_sla_daily",
+    "feedback_duplicate_clusters", "feedback_lsh_buckets", "feedback_duplicates",
+}
+
+# Queries that read the whole of a small table by design.
+EXPECTED_SCANS = {
+    # Every chart of the Analytics page, from a few hundred rollup rows.
+    "analytics_counts": {"feedback_rollups"},
+}
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+TABLE_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+AS)?\s+(\w+)", re.IGNORECASE)
+NOT_ALIASES = {"cross", "group", "inner", "join", "left", "limit", "natural", "on", "order", "using", "where"}
+
+
+def seed(path, rows):
+    feedback_import.bulk_import(generate_submissions(rows, seed=0), path)
+    feedback_archive.archive_resolved(path)
+    with feedback_db.connection(path) as conn:
+        conn.execute("ANALYZE")
+
+
+def full_scans(name, sql, steps):
+    """Guarded tables that ``steps``, the plan of ``sql``, reads in full, less those expected for ``name``."""
+    tables = {alias: table for table, alias in TABLE_ALIAS.findall(sql) if alias.lower() not in NOT_ALIASES}
+    scanned = {tables.get(match.group(1), match.group(1)) for match in map(FULL_SCAN.match, steps) if match}
+    return (scanned & GUARDED_TABLES) - EXPECTED_SCANS.get(name, set())
+
+
+def query_plans(path):
+    plans = {}
+    with feedback_db.connection(path) as conn:
+        for name, (sql, params) in HOT_QUERIES.items():
+            plans[name] = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--output", help="write the recorded plans to this JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "plans.db")
+        seed(path, args.rows)
+        plans = query_plans(path)
+        feedback_db.close_pools()
+
+    failures = []
+    for name, steps in plans.items():
+        print(name)
+        for step in steps:
+            print("    " + step)
+        scans = full_scans(name, HOT_QUERIES[name][0], steps)
+        if scans:
+            failures.append(f"{name} ({', '.join(sorted(scans))})")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(plans, fh, indent=2)
+
+    if failures:
+        print("\nFull table scan on hot path: " + ", ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
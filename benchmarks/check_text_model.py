@@ -0,0 +1,61 @@
+"""Check that a topic model fitted from the command line loads in the app.
+
+Generates a scratch database, runs ``python feedback_enrich.py fit`` in a
+separate process, as an admin would, then loads the stored model here
+through ``feedback_enrich.load_model`` (as the app and API do) and analyses
+a few submissions with it. Exits with status 1 if the stored model refers
+to ``__main__`` or cannot be loaded and used. Needs scikit-learn.
+
+    python benchmarks/check_text_model.py [--rows 3000]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import feedback_db  # noqa: E402
+import feedback_enrich  # noqa: E402
+import feedback_import  # noqa: E402
+from feedback_generator import generate_submissions  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=3000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "text_model.db")
+        feedback_import.bulk_import(generate_submissions(args.rows, seed=0), path)
+        subprocess.run([sys.executable, os.path.join(ROOT, "feedback_enrich.py"), "fit", "--db", path, "--topics", "4"],
+                       check=True)
+
+        failures = []
+        with feedback_db.connection(path) as conn:
+            blob = conn.execute(feedback_enrich.MODEL_SQL).fetchone()[1]
+            if b"__main__" in blob:
+                failures.append("the stored model refers to __main__")
+            try:
+                model = feedback_enrich.load_model(conn)
+                rows = conn.execute("SELECT id, category, feedback_text FROM feedback_submissions LIMIT 20").fetchall()
+                results = model.analyse([tuple(row) for row in rows])
+            except Exception as e:
+                failures.append(f"loading or using the model failed: {e!r}")
+            else:
+                if len(results) != len(rows):
+                    failures.append(f"analysed {len(results)} of {len(rows)} submissions")
+                print(f"Loaded model and analysed {len(results)} submissions, e.g. {results[0]}")
+        feedback_db.close_pools()
+
+    if failures:
+        print("\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Load-test the JSON API and report requests per second and latency percentiles.
+
+Runs ``--concurrency`` clients, each with its own keep-alive connection, for
+``--duration`` seconds against a running instance, mixing creates, lookups
+by id, filtered list pages and admin updates (``--mix``). Each create comes
+from a new student, so rate limits are charged but never refuse. With
+``--spawn`` it starts its own uvicorn instance on a copy of a seeded
+database (the same fixed-seed databases as bench_pages.py).
+
+    uvicorn feedback_api:app --port 8000 &
+    python benchmarks/load_test_api.py --url http://127.0.0.1:8000 --concurrency 32
+    python benchmarks/load_test_api.py --spawn --rows 100000
+"""
+
+import argparse
+import base64
+import http.client
+import itertools
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_pages import SAMPLE  # noqa: E402
+
+ADMIN_AUTH = "Basic " + base64.b64encode(b"admin:admin123").decode()
+DEFAULT_MIX = "create=20,get=50,list=20,update=10"
+
+
+def new_student(numbers=itertools.count()):
+    """SAMPLE as sent by a new student each time, so rate limits never refuse it."""
+    n = next(numbers)
+    return dict(SAMPLE, student_id=f"LT{n:07d}", email=f"loadtest{n}@caleb.edu.ng")
+
+
+def _parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+class Client:
+    def __init__(self, host, port, max_id, seed):
+        self.host, self.port = host, port
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+        self.rng = random.Random(seed)
+        self.max_id = max_id
+
+    def request(self, method, path, body=None, admin=False):
+        headers = {"Content-Type": "application/json"}
+        if admin:
+            headers["Authorization"] = ADMIN_AUTH
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.conn.request(method, path, payload, headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            return 0, b""
+        return response.status, data
+
+    def create(self):
+        status, data = self.request("POST", "/submissions", new_student())
+        if status == 201:
+            self.max_id = max(self.max_id, json.loads(data)["id"])
+        return status
+
+    def get(self):
+        return self.request("GET", f"/submissions/{self.rng.randint(1, self.max_id)}", admin=True)[0]
+
+    def list(self):
+        query = urllib.parse.urlencode({"status": self.rng.choice(["Pending", "In Progress"]), "limit": 50})
+        return self.request("GET", f"/submissions?{query}", admin=True)[0]
+
+    def update(self):
+        body = {"status": "In Progress", "admin_response": "Looking into it."}
+        return self.request("PATCH", f"/submissions/{self.rng.randint(1, self.max_id)}", body, admin=True)[0]
+
+
+def run(url, concurrency, duration, mix):
+    parsed = urllib.parse.urlsplit(url)
+    host, port = parsed.hostname, parsed.port or 80
+    probe = Client(host, port, 1, 0)
+    status, data = probe.request("GET", "/submissions?limit=1", admin=True)
+    if status != 200:
+        raise SystemExit(f"API not reachable at {url} (status {status}).")
+    rows = json.loads(data)["submissions"]
+    max_id = rows[0]["id"] if rows else 1
+
+    names, weights = list(mix), list(mix.values())
+    latencies = {name: [] for name in names}
+    statuses = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed):
+        client = Client(host, port, max_id, seed)
+        local = {name: [] for name in names}
+        local_statuses = {}
+        while time.perf_counter() < deadline:
+            name = client.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            status = getattr(client, name)()
+            local[name].append((time.perf_counter() - started) * 1000)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            for name, values in local.items():
+                latencies[name].extend(values)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return latencies, statuses, elapsed
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn(rows, tmp):
+    from bench_pages import seeded_database
+
+    db = os.path.join(tmp, "api.db")
+    shutil.copyfile(seeded_database(rows), db)
+    port = _free_port()
+    env = dict(os.environ, FEEDBACK_DB_PATH=db)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "feedback_api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    for _ in range(100):
+        try:
+            http.client.HTTPConnection("127.0.0.1", port, timeout=1).request("GET", "/health")
+            break
+        except OSError:
+            time.sleep(0.1)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weights per request kind (default: %(default)s)")
+    parser.add_argument("--spawn", action="store_true", help="start a local uvicorn instance on a seeded database")
+    parser.add_argument("--rows", type=int, default=100000, help="seeded rows for --spawn")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        url = args.url
+        if args.spawn:
+            server, url = spawn(args.rows, tmp)
+        try:
+            latencies, statuses, elapsed = run(url, args.concurrency, args.duration, _parse_mix(args.mix))
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{url}: {args.concurrency} clients, {elapsed:.1f}s, {total:,} requests, {total / elapsed:,.0f} req/s")
+    print(f"{'request':10}{'count':>9}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    everything = []
+    for name, values in latencies.items():
+        everything.extend(values)
+        if values:
+            print(f"{name:10}{len(values):>9,}{len(values) / elapsed:>9,.0f}{statistics.median(values):>9.1f}"
+                  f"{_percentile(values, 0.99):>9.1f}{max(values):>9.1f}")
+    print(f"{'all':10}{total:>9,}{total / elapsed:>9,.0f}{statistics.median(everything) if everything else 0:>9.1f}"
+          f"{_percentile(everything, 0.99):>9.1f}{max(everything, default=0):>9.1f}")
+    print("status codes:", ", ".join(f"{code}: {count:,}" for code, count in sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,641 +1,667 @@
-import streamlit as st
-import pandas as pd
-import sqlite3
-import datetime
-import plotly.express as px
-import plotly.graph_objects as go
-
-# Page configuration
-st.set_page_config(
-    page_title="Caleb University Feedback System",
-    page_icon="🎓",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Custom CSS for beautiful styling
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 3rem;
-        color: #1f4e79;
-        text-align: center;
-        margin-bottom: 2rem;
-        font-weight: bold;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-    }
-    
-    .sub-header {
-        font-size: 1.8rem;
-        color: #2c5aa0;
-        margin-bottom: 1.5rem;
-        font-weight: 600;
-    }
-    
-    .welcome-text {
-        font-size: 1.2rem;
-        color: #333;
-        line-height: 1.6;
-        text-align: center;
-        margin: 2rem 0;
-    }
-    
-    .info-box, .feature-card, .success-box, .admin-section, .footer {
-        color: #1a1a1a !important;
-        background: #e9ecef !important;
-    }
-    
-    .info-box *, .feature-card *, .success-box *, .admin-section *, .footer * {
-        color: #1a1a1a !important;
-    }
-    
-    .main-header, .sub-header {
-        color: #1f4e79;
-    }
-    
-    .metric-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 1.5rem;
-        border-radius: 1rem;
-        text-align: center;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-    }
-    
-    .metric-value {
-        font-size: 2.5rem;
-        font-weight: bold;
-        margin-bottom: 0.5rem;
-    }
-    
-    .metric-label {
-        font-size: 1rem;
-        opacity: 0.9;
-    }
-    
-    .feature-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 1rem;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
-        margin: 1rem 0;
-        border: 1px solid #e9ecef;
-        transition: transform 0.3s ease;
-    }
-    
-    .feature-card:hover {
-        transform: translateY(-5px);
-    }
-    
-    .admin-section {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        margin: 1rem 0;
-    }
-    
-    .footer {
-        text-align: center;
-        color: #666;
-        margin-top: 3rem;
-        padding: 2rem;
-        border-top: 1px solid #e9ecef;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# Initialize database
-def init_database():
-    conn = sqlite3.connect('feedback_database.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS feedback_submissions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id TEXT NOT NULL,
-            student_name TEXT NOT NULL,
-            email TEXT NOT NULL,
-            department TEXT NOT NULL,
-            course_code TEXT,
-            feedback_type TEXT NOT NULL,
-            category TEXT NOT NULL,
-            priority TEXT NOT NULL,
-            feedback_text TEXT NOT NULL,
-            submission_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            status TEXT DEFAULT 'Pending',
-            admin_response TEXT,
-            response_date TIMESTAMP
-        )
-    ''')
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS admin_users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            role TEXT NOT NULL,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    cursor.execute('''
-        INSERT OR IGNORE INTO admin_users (username, password_hash, role)
-        VALUES ('admin', 'admin123', 'super_admin')
-    ''')
-    
-    conn.commit()
-    conn.close()
-
-init_database()
-
-# Session state
-if 'admin_logged_in' not in st.session_state:
-    st.session_state.admin_logged_in = False
-if st.session_state.get('show_success'):
-    st.markdown("""
-    <div class="success-box" style="background-color: #e8f5e9; border-left: 6px solid #4CAF50; color: #155724; font-size: 1.15rem;">
-        <strong>✅ Feedback Submitted Successfully!</strong><br>
-        Your feedback has been recorded and will be reviewed by the appropriate department. 
-        You will receive a confirmation email shortly.
-    </div>
-    """, unsafe_allow_html=True)
-    st.session_state['show_success'] = False
-if st.session_state.get('show_admin_success'):
-    st.markdown("""
-    <div class="success-box" style="background-color: #e3f2fd; border-left: 6px solid #1976d2; color: #0d2a4d; font-size: 1.1rem;">
-        <strong>✅ Submission updated successfully!</strong><br>
-        The feedback status and response have been updated.
-    </div>
-    """, unsafe_allow_html=True)
-    st.session_state['show_admin_success'] = False
-
-# Sidebar
-st.sidebar.markdown("""
-<div style='text-align: center; padding: 1rem;'>
-    <h2 style='color: white; margin-bottom: 0.5rem;'>🎓 Caleb University</h2>
-    <p style='color: #e0e0e0; font-size: 0.9rem; margin: 0;'>Feedback & Grievance System</p>
-</div>
-""", unsafe_allow_html=True)
-
-# Replace this:
-# page = st.sidebar.selectbox(
-#     "Select Page",
-#     ["🏠 Welcome", "📝 Submit Feedback", "⚙️ Admin Panel", "❓ Help & Support"]
-# )
-
-# With radio buttons for navigation:
-page = st.sidebar.radio(
-    "Navigation",
-    ["🏠 Welcome", "📝 Submit Feedback", "⚙️ Admin Panel", "❓ Help & Support"],
-    index=0,
-    key="main_nav_radio"
-)
-
-# Main content
-if page == "🏠 Welcome":
-    st.markdown('<h1 class="main-header">🎓 Caleb University</h1>', unsafe_allow_html=True)
-    st.markdown('<h2 class="sub-header" style="text-align: center;">Feedback & Grievance Redressal System</h2>', unsafe_allow_html=True)
-    
-    st.markdown("""
-    <div class="welcome-text">
-        Welcome to Caleb University's comprehensive feedback and grievance redressal system. 
-        This platform is designed to provide students with a seamless way to submit feedback, 
-        report grievances, and contribute to the continuous improvement of our academic community.
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Feature cards
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("""
-        <div class="feature-card">
-            <h3 style="color: #1f4e79; margin-bottom: 1rem;">📝 Easy Submission</h3>
-            <p>Submit feedback and grievances through our user-friendly interface with comprehensive form validation.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="feature-card">
-            <h3 style="color: #1f4e79; margin-bottom: 1rem;">🔒 Confidential & Secure</h3>
-            <p>All submissions are treated with strict confidentiality and stored securely in our database.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class="feature-card">
-            <h3 style="color: #1f4e79; margin-bottom: 1rem;">📊 Real-time Analytics</h3>
-            <p>Access comprehensive analytics and insights to understand feedback patterns and trends.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Quick stats
-    try:
-        conn = sqlite3.connect('feedback_database.db')
-        df = pd.read_sql_query("SELECT * FROM feedback_submissions", conn)
-        conn.close()
-        
-        if not df.empty:
-            st.markdown('<h3 class="sub-header" style="text-align: center; margin-top: 3rem;">📈 System Statistics</h3>', unsafe_allow_html=True)
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value">{len(df)}</div>
-                    <div class="metric-label">Total Submissions</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                pending_count = len(df[df['status'] == 'Pending'])
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value">{pending_count}</div>
-                    <div class="metric-label">Pending Review</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                high_priority = len(df[df['priority'].isin(['High', 'Urgent'])])
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value">{high_priority}</div>
-                    <div class="metric-label">High Priority</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col4:
-                dept_count = df['department'].nunique()
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div class="metric-value">{dept_count}</div>
-                    <div class="metric-label">Departments</div>
-                </div>
-                """, unsafe_allow_html=True)
-    except:
-        pass
-
-elif page == "📝 Submit Feedback":
-    st.markdown('<h1 class="main-header">📝 Submit Feedback</h1>', unsafe_allow_html=True)
-    
-    st.markdown("""
-    <div style="
-        background: #f5f7fa;
-        border-left: 6px solid #1f4e79;
-        padding: 1.2rem 1.5rem;
-        border-radius: 0.7rem;
-        margin-bottom: 1.5rem;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.04);
-        color: #1a1a1a;
-    ">
-        <span style="font-size:1.2rem;font-weight:bold;color:#1f4e79;">📋 Important Information:</span>
-        <ul style="margin-top:0.7rem;">
-            <li>All submissions are confidential and will be reviewed by the appropriate department.</li>
-            <li>Please provide accurate and constructive feedback.</li>
-            <li>For urgent matters, contact your department head directly.</li>
-            <li>You will receive a confirmation email once your submission is processed.</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    with st.container():
-        st.markdown('<div class="form-container">', unsafe_allow_html=True)
-        st.markdown('<h2 class="sub-header">📝 Submit Your Feedback or Grievance</h2>', unsafe_allow_html=True)
-        
-        with st.form("feedback_form"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                student_id = st.text_input("Student ID *", placeholder="e.g., CU2023001")
-                student_name = st.text_input("Full Name *", placeholder="Enter your full name")
-                email = st.text_input("Email Address *", placeholder="your.email@caleb.edu.ng")
-                department = st.selectbox(
-                    "Department *",
-                    ["Select Department", "Computer Science", "Engineering", "Business Administration", 
-                     "Arts & Humanities", "Natural Sciences", "Social Sciences", "Education", "Law", "Medicine"]
-                )
-            
-            with col2:
-                course_code = st.text_input("Course Code (Optional)", placeholder="e.g., CSC101")
-                feedback_type = st.selectbox(
-                    "Type of Submission *",
-                    ["Select Type", "Feedback", "Grievance", "Suggestion", "Complaint", "Appreciation"]
-                )
-                category = st.selectbox(
-                    "Category *",
-                    ["Select Category", "Academic", "Administrative", "Facilities", "Student Services", 
-                     "Faculty", "Financial", "Technology", "Other"]
-                )
-                priority = st.selectbox(
-                    "Priority Level *",
-                    ["Select Priority", "Low", "Medium", "High", "Urgent"]
-                )
-            
-            feedback_text = st.text_area(
-                "Detailed Feedback/Grievance *",
-                placeholder="Please provide a detailed description of your feedback or grievance. Be specific and constructive.",
-                height=150
-            )
-            
-            submitted = st.form_submit_button("Submit Feedback", type="primary")
-            
-            if submitted:
-                if (student_id and student_name and email and department != "Select Department" and 
-                    feedback_type != "Select Type" and category != "Select Category" and 
-                    priority != "Select Priority" and feedback_text):
-                    
-                    if "@" in email and "." in email:
-                        try:
-                            conn = sqlite3.connect('feedback_database.db')
-                            cursor = conn.cursor()
-                            
-                            cursor.execute('''
-                                INSERT INTO feedback_submissions 
-                                (student_id, student_name, email, department, course_code, 
-                                 feedback_type, category, priority, feedback_text)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            ''', (student_id, student_name, email, department, course_code,
-                                  feedback_type, category, priority, feedback_text))
-                            
-                            conn.commit()
-                            conn.close()
-                            
-                            st.session_state['show_success'] = True
-                            st.rerun()
-                            
-                        except Exception as e:
-                            st.error(f"An error occurred while saving your feedback: {str(e)}")
-                    else:
-                        st.error("Please enter a valid email address.")
-                else:
-                    st.error("Please fill in all required fields marked with *.")
-
-elif page == "⚙️ Admin Panel":
-    if not st.session_state.admin_logged_in:
-        st.markdown('<h1 class="main-header">⚙️ Admin Login</h1>', unsafe_allow_html=True)
-        
-        with st.form("admin_login"):
-            username = st.text_input("Username")
-            password = st.text_input("Password", type="password")
-            login_submitted = st.form_submit_button("Login")
-            
-            if login_submitted:
-                if username == "admin" and password == "admin123":
-                    st.session_state.admin_logged_in = True
-                    st.success("Login successful!")
-                    st.rerun()
-                else:
-                    st.error("Invalid username or password")
-    else:
-        admin_tab = st.selectbox(
-            "Admin Section",
-            ["Dashboard", "Analytics", "Manage Submissions"]
-        )
-        if admin_tab == "Dashboard":
-            st.markdown('<h1 class="main-header">📊 Feedback Dashboard</h1>', unsafe_allow_html=True)
-            try:
-                conn = sqlite3.connect('feedback_database.db')
-                df = pd.read_sql_query("SELECT * FROM feedback_submissions", conn)
-                conn.close()
-                if not df.empty:
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-value">{len(df)}</div>
-                            <div class="metric-label">Total Submissions</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with col2:
-                        pending_count = len(df[df['status'] == 'Pending'])
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-value">{pending_count}</div>
-                            <div class="metric-label">Pending Review</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with col3:
-                        high_priority = len(df[df['priority'].isin(['High', 'Urgent'])])
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-value">{high_priority}</div>
-                            <div class="metric-label">High Priority</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with col4:
-                        recent_submissions = len(df[pd.to_datetime(df['submission_date']) >= (datetime.datetime.now() - datetime.timedelta(days=7))])
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-value">{recent_submissions}</div>
-                            <div class="metric-label">This Week</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    st.markdown('<h2 class="sub-header">📋 Recent Submissions</h2>', unsafe_allow_html=True)
-                    recent_df = df.head(10)[['student_id', 'feedback_type', 'category', 'priority', 'status', 'submission_date']]
-                    st.dataframe(recent_df, use_container_width=True)
-                else:
-                    st.markdown("""
-                    <div class="info-box">
-                        <h3 style="text-align: center;">No feedback submissions found</h3>
-                        <p style="text-align: center;">Submit your first feedback using the form!</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-            except Exception as e:
-                st.error(f"Error loading dashboard data: {str(e)}")
-        elif admin_tab == "Analytics":
-            st.markdown('<h1 class="main-header">📈 Feedback Analytics</h1>', unsafe_allow_html=True)
-            try:
-                conn = sqlite3.connect('feedback_database.db')
-                df = pd.read_sql_query("SELECT * FROM feedback_submissions", conn)
-                conn.close()
-                if not df.empty:
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.subheader("📊 Feedback by Category")
-                        category_counts = df['category'].value_counts()
-                        fig = px.pie(values=category_counts.values, names=category_counts.index, title="Feedback Distribution by Category")
-                        st.plotly_chart(fig, use_container_width=True)
-                    with col2:
-                        st.subheader("📊 Feedback by Priority")
-                        priority_counts = df['priority'].value_counts()
-                        fig = px.bar(x=priority_counts.index, y=priority_counts.values, title="Feedback Distribution by Priority")
-                        st.plotly_chart(fig, use_container_width=True)
-                    col3, col4 = st.columns(2)
-                    with col3:
-                        st.subheader("📊 Feedback by Type")
-                        type_counts = df['feedback_type'].value_counts()
-                        fig = px.bar(x=type_counts.index, y=type_counts.values, title="Feedback Distribution by Type")
-                        st.plotly_chart(fig, use_container_width=True)
-                    with col4:
-                        st.subheader("📊 Feedback by Department")
-                        dept_counts = df['department'].value_counts()
-                        fig = px.bar(x=dept_counts.index, y=dept_counts.values, title="Feedback Distribution by Department")
-                        st.plotly_chart(fig, use_container_width=True)
-                    st.subheader("📊 Submission Status Distribution")
-                    status_counts = df['status'].value_counts()
-                    fig = px.pie(values=status_counts.values, names=status_counts.index, title="Submission Status Distribution")
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.markdown("""
-                    <div class="info-box">
-                        <h3 style="text-align: center;">No data available for analytics</h3>
-                        <p style="text-align: center;">Submit some feedback first!</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-            except Exception as e:
-                st.error(f"Error loading analytics data: {str(e)}")
-        elif admin_tab == "Manage Submissions":
-            conn = sqlite3.connect('feedback_database.db')
-            df = pd.read_sql_query("SELECT * FROM feedback_submissions", conn)
-            conn.close()
-            if not df.empty:
-                st.markdown('<h2 class="sub-header">📋 Manage Submissions</h2>', unsafe_allow_html=True)
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    status_filter = st.selectbox("Filter by Status", ["All"] + list(df['status'].unique()))
-                with col2:
-                    priority_filter = st.selectbox("Filter by Priority", ["All"] + list(df['priority'].unique()))
-                with col3:
-                    category_filter = st.selectbox("Filter by Category", ["All"] + list(df['category'].unique()))
-                filtered_df = df.copy()
-                if status_filter != "All":
-                    filtered_df = filtered_df[filtered_df['status'] == status_filter]
-                if priority_filter != "All":
-                    filtered_df = filtered_df[filtered_df['priority'] == priority_filter]
-                if category_filter != "All":
-                    filtered_df = filtered_df[filtered_df['category'] == category_filter]
-                st.dataframe(filtered_df, use_container_width=True)
-                st.markdown('<h2 class="sub-header">✍️ Respond to Submissions</h2>', unsafe_allow_html=True)
-                submission_id = st.selectbox("Select Submission ID", filtered_df['id'].tolist())
-                if submission_id:
-                    submission = filtered_df[filtered_df['id'] == submission_id].iloc[0]
-                    st.markdown(f"""
-                    <div style="
-                        background: #f0f4f8;
-                        border-left: 6px solid #1f4e79;
-                        padding: 1.2rem 1.5rem;
-                        border-radius: 0.7rem;
-                        margin-bottom: 1.5rem;
-                        box-shadow: 0 2px 8px rgba(0,0,0,0.04);
-                        color: #1a1a1a;
-                    ">
-                        <h3 style="font-size:1.5rem;font-weight:bold;margin-top:0;color:#1a1a1a;">Submission Details:</h3>
-                        <p style="color:#1a1a1a;"><strong>Student:</strong> {submission['student_name']} ({submission['student_id']})</p>
-                        <p style="color:#1a1a1a;"><strong>Department:</strong> {submission['department']}</p>
-                        <p style="color:#1a1a1a;"><strong>Category:</strong> {submission['category']}</p>
-                        <p style="color:#1a1a1a;"><strong>Priority:</strong> {submission['priority']}</p>
-                        <p style="color:#1a1a1a;"><strong>Feedback:</strong> {submission['feedback_text']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    with st.form("admin_response"):
-                        new_status = st.selectbox("Update Status", ["Pending", "In Progress", "Completed", "Rejected"])
-                        admin_response = st.text_area("Admin Response", placeholder="Enter your response to the student...")
-                        response_submitted = st.form_submit_button("Update Submission")
-                        if response_submitted:
-                            conn = sqlite3.connect('feedback_database.db')
-                            cursor = conn.cursor()
-                            cursor.execute('''
-                                UPDATE feedback_submissions 
-                                SET status = ?, admin_response = ?, response_date = CURRENT_TIMESTAMP
-                                WHERE id = ?
-                            ''', (new_status, admin_response, submission_id))
-                            conn.commit()
-                            conn.close()
-                            st.session_state['show_admin_success'] = True
-                            st.rerun()
-            else:
-                st.markdown("""
-                <div class="info-box">
-                    <h3 style="text-align: center;">No submissions to manage</h3>
-                    <p style="text-align: center;">No feedback submissions found in the system.</p>
-                </div>
-                """, unsafe_allow_html=True)
-
-elif page == "❓ Help & Support":
-    st.markdown('<h1 class="main-header">❓ Help & Support</h1>', unsafe_allow_html=True)
-    
-    st.markdown("""
-    <div style="
-        background: #f5f7fa;
-        border-left: 6px solid #d63384;
-        padding: 1.2rem 1.5rem;
-        border-radius: 0.7rem;
-        margin-bottom: 1.5rem;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.04);
-        color: #1a1a1a;
-    ">
-        <span style="font-size:1.2rem;font-weight:bold;color:#d63384;">☎️ Need Help?</span>
-        <p style="margin-top:0.7rem;">
-            If you need assistance with the feedback system or have questions, please contact:
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
-        <div class="feature-card">
-            <h3 style="color: #1f4e79; margin-bottom: 1rem;">📧 Contact Information</h3>
-            <p><strong>IT Support:</strong><br>
-            Email: itsupport@calebuniversity.edu.ng<br>
-            Phone: +234-803-123-4567</p>
-            <p><strong>Student Affairs:</strong><br>
-            Email: studentaffairs@calebuniversity.edu.ng<br>
-            Phone: +234-802-234-5678</p>
-            <p><strong>Academic Affairs:</strong><br>
-            Email: academics@calebuniversity.edu.ng<br>
-            Phone: +234-701-345-6789</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="feature-card">
-            <h3 style="color: #1f4e79; margin-bottom: 1rem;">📋 FAQ</h3>
-            <details>
-                <summary><strong>How do I submit feedback?</strong></summary>
-                <p>Use the 'Submit Feedback' page to fill out the form with your details and feedback.</p>
-            </details>
-            <details>
-                <summary><strong>How long does it take to get a response?</strong></summary>
-                <p>Responses are typically provided within 3-5 business days for regular submissions, and within 24 hours for urgent matters.</p>
-            </details>
-            <details>
-                <summary><strong>Is my feedback confidential?</strong></summary>
-                <p>Yes, all feedback submissions are treated with strict confidentiality. Only authorized personnel have access to the submissions.</p>
-            </details>
-            <details>
-                <summary><strong>Can I track my submission status?</strong></summary>
-                <p>Currently, you can view recent submissions in the Dashboard. We're working on individual tracking features.</p>
-            </details>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("""
-    <div class="feature-card">
-        <h3 style="color: #1f4e79; margin-bottom: 1rem;">📚 Guidelines for Effective Feedback</h3>
-        <ul>
-            <li><strong>Be Specific:</strong> Provide concrete examples and details</li>
-            <li><strong>Be Constructive:</strong> Suggest solutions when possible</li>
-            <li><strong>Be Respectful:</strong> Use professional and courteous language</li>
-            <li><strong>Be Timely:</strong> Submit feedback as close to the event as possible</li>
-            <li><strong>Be Honest:</strong> Provide accurate and truthful information</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
-
-# Footer
-st.markdown("""
-<div class="footer">
-    <p>© 2024 Caleb University Feedback System | Developed for Academic Excellence</p>
-    <p style="font-size: 0.9rem; margin-top: 0.5rem;">
-        🎓 Empowering Students, Enhancing Education
-    </p>
-</div>
-""", unsafe_allow_html=True) 
\ No newline at end of file
+import os
+import uuid
+
+import streamlit as st
+
+import feedback_cache
+import feedback_db
+import feedback_enrich
+import feedback_export
+import feedback_profiler
+import feedback_ratelimit
+import feedback_replica
+import feedback_sync
+import feedback_triage
+import feedback_ui
+import feedback_validation
+import feedback_writer
+
+_rerun_started = feedback_profiler.start_rerun()
+
+SLA_WINDOWS = {"Last 30 days": 30, "Last 90 days": 90, "Last 12 months": 365, "All time": None}
+
+# Page configuration
+st.set_page_config(
+    page_title="Caleb University Feedback System",
+    page_icon="🎓",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS for beautiful styling
+st.markdown(feedback_ui.PAGE_CSS, unsafe_allow_html=True)
+
+# Initialize database (once per process)
+feedback_db.ensure_database()
+
+# Session state
+if 'admin_logged_in' not in st.session_state:
+    st.session_state.admin_logged_in = False
+if st.session_state.get('show_success'):
+    st.markdown(feedback_ui.SUBMIT_SUCCESS_BANNER, unsafe_allow_html=True)
+    st.session_state['show_success'] = False
+if st.session_state.get('show_admin_success'):
+    st.markdown(feedback_ui.ADMIN_SUCCESS_BANNER, unsafe_allow_html=True)
+    st.session_state['show_admin_success'] = False
+
+# Sidebar
+st.sidebar.markdown(feedback_ui.SIDEBAR_HEADER, unsafe_allow_html=True)
+
+# Replace this:
+# page = st.sidebar.selectbox(
+#     "Select Page",
+#     ["🏠 Welcome", "📝 Submit Feedback", "⚙️ Admin Panel", "❓ Help & Support"]
+# )
+
+# With radio buttons for navigation:
+page = st.sidebar.radio(
+    "Navigation",
+    ["🏠 Welcome", "📝 Submit Feedback", "🔎 Track My Submission", "⚙️ Admin Panel", "❓ Help & Support"],
+    index=0,
+    key="main_nav_radio"
+)
+# Admin sections are timed separately.
+rerun_page = page
+
+# Main content
+if page == "🏠 Welcome":
+    st.markdown('<h1 class="main-header">🎓 Caleb University</h1>', unsafe_allow_html=True)
+    st.markdown('<h2 class="sub-header" style="text-align: center;">Feedback & Grievance Redressal System</h2>', unsafe_allow_html=True)
+    
+    st.markdown(feedback_ui.WELCOME_TEXT, unsafe_allow_html=True)
+    
+    # Feature cards
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown(feedback_ui.FEATURE_EASY_SUBMISSION, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(feedback_ui.FEATURE_CONFIDENTIAL, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(feedback_ui.FEATURE_ANALYTICS, unsafe_allow_html=True)
+    
+    # Quick stats
+    try:
+        metrics = feedback_db.submission_metrics()
+        
+        if metrics["total"]:
+            st.markdown('<h3 class="sub-header" style="text-align: center; margin-top: 3rem;">📈 System Statistics</h3>', unsafe_allow_html=True)
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.markdown(feedback_ui.metric_card(metrics['total'], "Total Submissions"), unsafe_allow_html=True)
+            
+            with col2:
+                st.markdown(feedback_ui.metric_card(metrics['pending'], "Pending Review"), unsafe_allow_html=True)
+            
+            with col3:
+                st.markdown(feedback_ui.metric_card(metrics['high_priority'], "High Priority"), unsafe_allow_html=True)
+            
+            with col4:
+                st.markdown(feedback_ui.metric_card(metrics['departments'], "Departments"), unsafe_allow_html=True)
+    except:
+        pass
+
+elif page == "📝 Submit Feedback":
+    st.markdown('<h1 class="main-header">📝 Submit Feedback</h1>', unsafe_allow_html=True)
+    
+    st.markdown(feedback_ui.SUBMIT_INFO, unsafe_allow_html=True)
+    
+    with st.container():
+        st.markdown('<div class="form-container">', unsafe_allow_html=True)
+        st.markdown('<h2 class="sub-header">📝 Submit Your Feedback or Grievance</h2>', unsafe_allow_html=True)
+        
+        with st.form("feedback_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                student_id = st.text_input("Student ID *", placeholder="e.g., CU2023001")
+                student_name = st.text_input("Full Name *", placeholder="Enter your full name")
+                email = st.text_input("Email Address *", placeholder="your.email@caleb.edu.ng")
+                department = st.selectbox("Department *", ["Select Department"] + feedback_validation.DEPARTMENTS)
+            
+            with col2:
+                course_code = st.text_input("Course Code (Optional)", placeholder="e.g., CSC101")
+                feedback_type = st.selectbox("Type of Submission *", ["Select Type"] + feedback_validation.FEEDBACK_TYPES)
+                category = st.selectbox("Category *", ["Select Category"] + feedback_validation.CATEGORIES)
+                priority = st.selectbox("Priority Level *", ["Select Priority"] + feedback_validation.PRIORITIES)
+            
+            feedback_text = st.text_area(
+                "Detailed Feedback/Grievance *",
+                placeholder="Please provide a detailed description of your feedback or grievance. Be specific and constructive.",
+                height=150
+            )
+            
+            submitted = st.form_submit_button("Submit Feedback", type="primary")
+            
+            if submitted:
+                submission = {
+                    "student_id": student_id,
+                    "student_name": student_name,
+                    "email": email,
+                    "department": department,
+                    "course_code": course_code,
+                    "feedback_type": feedback_type,
+                    "category": category,
+                    "priority": priority,
+                    "feedback_text": feedback_text,
+                }
+                error = feedback_validation.submission_error(submission)
+                if error:
+                    st.error(error)
+                else:
+                    try:
+                        # One rate limit bucket per browser session, besides the student ID and email ones.
+                        session = st.session_state.setdefault('rate_limit_session', uuid.uuid4().hex)
+                        feedback_writer.submit_feedback(submission, session=session)
+                        
+                        st.session_state['show_success'] = True
+                        st.rerun()
+                        
+                    except feedback_ratelimit.RateLimited as limited:
+                        st.warning(f"You have sent several submissions in a short time. Please wait about "
+                                   f"{max(1, round(limited.retry_after / 60))} minutes before submitting again.")
+                    except feedback_writer.WriteQueueFull:
+                        st.warning("The system is receiving a lot of submissions right now. Please try again in a moment.")
+                    except Exception as e:
+                        st.error(f"An error occurred while saving your feedback: {str(e)}")
+
+elif page == "🔎 Track My Submission":
+    st.markdown('<h1 class="main-header">🔎 Track My Submission</h1>', unsafe_allow_html=True)
+    st.caption(feedback_ui.TRACK_INFO.format(ttl=feedback_cache.student_cache.ttl))
+    
+    with st.form("track_form"):
+        col1, col2 = st.columns(2)
+        with col1:
+            track_student_id = st.text_input("Student ID", placeholder="e.g., CU2023001")
+        with col2:
+            track_email = st.text_input("Email Address", placeholder="your.email@caleb.edu.ng")
+        if st.form_submit_button("Find my submissions", type="primary"):
+            if track_student_id.strip() and track_email.strip():
+                # Cursors of the pages visited so far; a new lookup starts over.
+                st.session_state['track_lookup'] = (track_student_id, track_email)
+                st.session_state['track_cursors'] = [None]
+            else:
+                st.error("Please enter both your Student ID and email address.")
+    
+    if st.session_state.get('track_lookup'):
+        track_student_id, track_email = st.session_state['track_lookup']
+        cursors = st.session_state['track_cursors']
+        try:
+            rows, next_cursor = feedback_db.student_submissions(track_student_id, track_email, after=cursors[-1])
+        except Exception as e:
+            st.error(f"Could not load your submissions: {str(e)}")
+            rows, next_cursor = [], None
+        else:
+            if not rows and len(cursors) == 1:
+                st.markdown(feedback_ui.NO_TRACKED_SUBMISSIONS, unsafe_allow_html=True)
+            for row in rows:
+                title = f"#{row['id']} · {row['category']} · {row['status']} · {row['submission_date']}"
+                with st.expander(title, expanded=len(rows) == 1):
+                    st.write(f"**Type:** {row['feedback_type']}  |  **Priority:** {row['priority']}"
+                             + (f"  |  **Course:** {row['course_code']}" if row['course_code'] else ""))
+                    st.write(f"**Your feedback:** {row['feedback_text']}")
+                    if row['admin_response']:
+                        st.write(f"**Response ({row['response_date']}):** {row['admin_response']}")
+                    else:
+                        st.write("**Response:** No response yet.")
+        if rows or len(cursors) > 1:
+            st.caption(f"Page {len(cursors)}")
+            nav1, nav2 = st.columns(2)
+            with nav1:
+                if st.button("◀ Newer", disabled=len(cursors) == 1):
+                    cursors.pop()
+                    st.rerun()
+            with nav2:
+                if st.button("Older ▶", disabled=next_cursor is None):
+                    cursors.append(next_cursor)
+                    st.rerun()
+
+elif page == "⚙️ Admin Panel":
+    if not st.session_state.admin_logged_in:
+        st.markdown('<h1 class="main-header">⚙️ Admin Login</h1>', unsafe_allow_html=True)
+        
+        with st.form("admin_login"):
+            username = st.text_input("Username")
+            password = st.text_input("Password", type="password")
+            login_submitted = st.form_submit_button("Login")
+            
+            if login_submitted:
+                if feedback_db.check_admin(username, password):
+                    st.session_state.admin_logged_in = True
+                    st.session_state.admin_username = username
+                    st.success("Login successful!")
+                    st.rerun()
+                else:
+                    st.error("Invalid username or password")
+    else:
+        admin_tab = st.selectbox(
+            "Admin Section",
+            ["Dashboard", "Analytics", "Manage Submissions", "Performance"]
+        )
+        rerun_page = f"{page} · {admin_tab}"
+        if admin_tab == "Dashboard":
+            st.markdown('<h1 class="main-header">📊 Feedback Dashboard</h1>', unsafe_allow_html=True)
+            try:
+                metrics = feedback_db.submission_metrics()
+                if metrics["total"]:
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.markdown(feedback_ui.metric_card(metrics['total'], "Total Submissions"), unsafe_allow_html=True)
+                    with col2:
+                        st.markdown(feedback_ui.metric_card(metrics['pending'], "Pending Review"), unsafe_allow_html=True)
+                    with col3:
+                        st.markdown(feedback_ui.metric_card(metrics['high_priority'], "High Priority"), unsafe_allow_html=True)
+                    with col4:
+                        st.markdown(feedback_ui.metric_card(metrics['this_week'], "This Week"), unsafe_allow_html=True)
+                    st.markdown('<h2 class="sub-header">📋 Recent Submissions</h2>', unsafe_allow_html=True)
+                    recent_df = feedback_db.recent_submissions(10)
+                    feedback_profiler.record_frame("dashboard_recent", recent_df)
+                    st.dataframe(recent_df, use_container_width=True)
+
+                    st.markdown('<h2 class="sub-header">📥 Open Submissions</h2>', unsafe_allow_html=True)
+                    auto_refresh = st.toggle(f"Auto-refresh every {feedback_sync.POLL_SECONDS:g}s", key="open_auto_refresh")
+
+                    # Only this block reruns on each poll, and each poll reads only what changed.
+                    @st.fragment(run_every=feedback_sync.POLL_SECONDS if auto_refresh else None)
+                    def open_submissions():
+                        view = st.session_state.setdefault('open_submissions', feedback_sync.SyncedView())
+                        changed = view.refresh()
+                        st.caption(f"{len(view):,} pending or in progress · {changed:,} rows changed since the last refresh")
+                        feedback_profiler.record_frame("dashboard_open", view.frame)
+                        st.dataframe(view.frame, use_container_width=True)
+
+                    open_submissions()
+                else:
+                    st.markdown(feedback_ui.NO_DASHBOARD_DATA, unsafe_allow_html=True)
+            except Exception as e:
+                st.error(f"Error loading dashboard data: {str(e)}")
+        elif admin_tab == "Analytics":
+            st.markdown('<h1 class="main-header">📈 Feedback Analytics</h1>', unsafe_allow_html=True)
+            try:
+                # Analytics reads the snapshot replica so its scans stay off the live file.
+                analytics_db = feedback_replica.read_path()
+                stale = feedback_replica.staleness()
+                if stale:
+                    st.caption(f"Figures as of {stale:,.0f}s ago; they are never more than "
+                               f"{feedback_replica.MAX_STALENESS_SECONDS / 60:.0f} min behind.")
+                counts = feedback_db.analytics_counts(path=analytics_db)
+                if counts['category'][0]:
+                    px = feedback_profiler.lazy_import("plotly.express")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.subheader("📊 Feedback by Category")
+                        with feedback_profiler.span("analytics: category chart"):
+                            names, values = counts['category']
+                            fig = px.pie(values=values, names=names, title="Feedback Distribution by Category")
+                            st.plotly_chart(fig, use_container_width=True)
+                    with col2:
+                        st.subheader("📊 Feedback by Priority")
+                        with feedback_profiler.span("analytics: priority chart"):
+                            names, values = counts['priority']
+                            fig = px.bar(x=names, y=values, title="Feedback Distribution by Priority")
+                            st.plotly_chart(fig, use_container_width=True)
+                    col3, col4 = st.columns(2)
+                    with col3:
+                        st.subheader("📊 Feedback by Type")
+                        with feedback_profiler.span("analytics: type chart"):
+                            names, values = counts['feedback_type']
+                            fig = px.bar(x=names, y=values, title="Feedback Distribution by Type")
+                            st.plotly_chart(fig, use_container_width=True)
+                    with col4:
+                        st.subheader("📊 Feedback by Department")
+                        with feedback_profiler.span("analytics: department chart"):
+                            names, values = counts['department']
+                            fig = px.bar(x=names, y=values, title="Feedback Distribution by Department")
+                            st.plotly_chart(fig, use_container_width=True)
+                    st.subheader("📊 Submission Status Distribution")
+                    with feedback_profiler.span("analytics: status chart"):
+                        names, values = counts['status']
+                        fig = px.pie(values=values, names=names, title="Submission Status Distribution")
+                        st.plotly_chart(fig, use_container_width=True)
+
+                    st.markdown('<h2 class="sub-header">⏱️ Response Times & SLA</h2>', unsafe_allow_html=True)
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        window = st.selectbox("Period", list(SLA_WINDOWS), index=2)
+                    with col2:
+                        period = st.radio("Group by", ["day", "week"], index=1, horizontal=True,
+                                          format_func=str.title)
+                    days = SLA_WINDOWS[window]
+                    with feedback_profiler.span("analytics: sla summary"):
+                        by_priority = feedback_db.sla_summary("priority", days, path=analytics_db)
+                        by_department = feedback_db.sla_summary("department", days, path=analytics_db)
+                    responded = sum(row['responded'] for row in by_priority)
+                    breached = sum(row['breached'] for row in by_priority)
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.markdown(feedback_ui.metric_card(sum(row['submitted'] for row in by_priority), "Submitted"), unsafe_allow_html=True)
+                    with col2:
+                        on_time = f"{(responded - breached) / responded:.0%}" if responded else "–"
+                        st.markdown(feedback_ui.metric_card(on_time, "Answered Within SLA"), unsafe_allow_html=True)
+                    with col3:
+                        st.markdown(feedback_ui.metric_card(breached, "Answered Late"), unsafe_allow_html=True)
+                    with col4:
+                        st.markdown(feedback_ui.metric_card(sum(row['open_breaches'] for row in by_priority), "Overdue, Unanswered"), unsafe_allow_html=True)
+
+                    with feedback_profiler.span("analytics: volume chart"):
+                        volume = feedback_db.submission_volume(period, days, path=analytics_db)
+                        feedback_profiler.record_frame("analytics_volume", volume)
+                        fig = px.line(volume, x="period", y=["submitted", "responded", "breached"],
+                                      title=f"Submissions per {period}")
+                        st.plotly_chart(fig, use_container_width=True)
+
+                    st.caption(feedback_ui.SLA_NOTE)
+                    for breakdown, rows in (("priority", by_priority), ("department", by_department)):
+                        st.subheader(f"⏱️ Time to Response by {breakdown.title()}")
+                        with feedback_profiler.span(f"analytics: sla table by {breakdown}"):
+                            st.dataframe(
+                                [{key: round(value, 1) if isinstance(value, float) else value
+                                  for key, value in row.items()} for row in rows],
+                                use_container_width=True,
+                            )
+
+                    st.markdown('<h2 class="sub-header">💬 Sentiment & Topics</h2>', unsafe_allow_html=True)
+                    # New submissions are analysed by a background thread, not here.
+                    if feedback_enrich.start_background().error:
+                        st.caption("New submissions are not analysed: scikit-learn is not installed.")
+                    text = feedback_db.text_analytics(path=analytics_db)
+                    if text['analysed']:
+                        with feedback_profiler.span("analytics: sentiment chart"):
+                            rows = text['sentiment']
+                            fig = px.bar(x=[row['category'] for row in rows], y=[row['submissions'] for row in rows],
+                                         color=[row['sentiment_label'] for row in rows],
+                                         labels={"x": "Category", "y": "Submissions", "color": "Sentiment"},
+                                         title="Sentiment by Category",
+                                         color_discrete_map={"Negative": "#d9534f", "Neutral": "#9e9e9e",
+                                                             "Positive": "#5cb85c"})
+                            st.plotly_chart(fig, use_container_width=True)
+                        st.subheader("🗂️ Topics")
+                        st.dataframe([{"topic": row['terms'], "submissions": row['submissions'],
+                                       "mean_sentiment": round(row['mean_sentiment'] or 0.0, 2)}
+                                      for row in text['topics']], use_container_width=True)
+                        st.caption(feedback_ui.TEXT_ANALYTICS_NOTE)
+                    else:
+                        st.info(feedback_ui.NO_TEXT_ANALYTICS)
+                else:
+                    st.markdown(feedback_ui.NO_ANALYTICS_DATA, unsafe_allow_html=True)
+            except Exception as e:
+                st.error(f"Error loading analytics data: {str(e)}")
+        elif admin_tab == "Manage Submissions":
+            if feedback_db.has_submissions():
+                st.markdown('<h2 class="sub-header">📋 Manage Submissions</h2>', unsafe_allow_html=True)
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    status_filter = st.selectbox("Filter by Status", ["All"] + feedback_db.filter_options('status'))
+                with col2:
+                    priority_filter = st.selectbox("Filter by Priority", ["All"] + feedback_db.filter_options('priority'))
+                with col3:
+                    category_filter = st.selectbox("Filter by Category", ["All"] + feedback_db.filter_options('category'))
+                filters = {"status": status_filter, "priority": priority_filter, "category": category_filter}
+                search_col, size_col = st.columns([3, 1])
+                with search_col:
+                    search_text = st.text_input("🔍 Search feedback and responses", placeholder="e.g. hostel generator")
+                with size_col:
+                    page_sizes = sorted({25, 50, 100, 200, feedback_db.MANAGE_PAGE_SIZE})
+                    page_size = st.selectbox("Rows per page", page_sizes, index=page_sizes.index(feedback_db.MANAGE_PAGE_SIZE))
+                searching = bool(feedback_db.fts_query(search_text))
+                # Cursors of the pages visited so far; start over whenever the filters or search change.
+                page_key = (status_filter, priority_filter, category_filter, page_size, search_text)
+                if st.session_state.get('manage_page_key') != page_key:
+                    st.session_state['manage_page_key'] = page_key
+                    st.session_state['manage_cursors'] = [None]
+                    st.session_state.pop('bulk_results', None)
+                cursors = st.session_state['manage_cursors']
+                if searching:
+                    page_df, next_cursor = feedback_db.search_submissions(search_text, filters, after=cursors[-1], page_size=page_size)
+                    feedback_profiler.record_frame("manage_search", page_df)
+                    st.caption(f"Page {len(cursors)} · {feedback_db.count_search_results(search_text, filters)} matching submissions, best match first")
+                    for hit in page_df.itertuples():
+                        st.markdown(f"""
+                        <div style="border-left: 4px solid #2c5aa0; padding: 0.4rem 0.8rem; margin-bottom: 0.6rem; color: #1a1a1a;">
+                            <strong>#{hit.id}</strong> · {hit.category} · {hit.priority} · {hit.status} · {hit.submission_date}<br>
+                            {hit.snippet}
+                        </div>
+                        """, unsafe_allow_html=True)
+                else:
+                    page_df, next_cursor = feedback_db.submission_page(filters, after=cursors[-1], page_size=page_size)
+                    feedback_profiler.record_frame("manage_page", page_df)
+                    archived = feedback_db.archived_count()
+                    st.caption(f"Page {len(cursors)} · {feedback_db.count_submissions(filters)} matching submissions"
+                               + (f" · {archived:,} older resolved submissions archived" if archived else ""))
+                    st.dataframe(page_df, use_container_width=True)
+                nav1, nav2 = st.columns(2)
+                with nav1:
+                    if st.button("◀ Previous page", disabled=len(cursors) == 1):
+                        cursors.pop()
+                        st.rerun()
+                with nav2:
+                    if st.button("Next page ▶", disabled=next_cursor is None):
+                        cursors.append(next_cursor)
+                        st.rerun()
+                admin_username = st.session_state.get('admin_username', "admin")
+                my_claims = feedback_db.claimed_submissions(admin_username)
+                with st.expander(f"🚦 Triage queue ({len(my_claims)} claimed by you)"):
+                    st.caption(f"{feedback_db.queue_depth():,} unclaimed pending submissions, Urgent first, then oldest. "
+                               f"Claims expire after {feedback_triage.LEASE_MINUTES} minutes.")
+                    claim_col, release_col = st.columns(2)
+                    with claim_col:
+                        claim_count = st.number_input("Items to claim", min_value=1, max_value=50, value=5)
+                        if st.button(f"Claim next {claim_count}"):
+                            feedback_db.claim_next(admin_username, int(claim_count))
+                            st.rerun()
+                    with release_col:
+                        if st.button("Release my claims", disabled=not my_claims):
+                            feedback_db.release_claims(admin_username)
+                            st.rerun()
+                    if my_claims:
+                        st.dataframe(my_claims, use_container_width=True)
+                    else:
+                        st.dataframe(feedback_db.triage_queue(10), use_container_width=True)
+                with st.expander("🧰 Bulk update"):
+                    scope = st.radio("Apply to", ["Selected submissions", "Everything matching the filters and search",
+                                                  "A group of near-duplicates"], horizontal=True)
+                    if scope == "Selected submissions":
+                        bulk_ids = st.multiselect("Submissions", page_df['id'].tolist())
+                    elif scope == "A group of near-duplicates":
+                        clusters = {cluster['cluster_id']: cluster for cluster in feedback_db.duplicate_clusters(filters)}
+                        cluster_id = st.selectbox(
+                            "Group", list(clusters),
+                            format_func=lambda key: f"{clusters[key]['submissions']} × {clusters[key]['sample_text'][:80]}",
+                        )
+                        bulk_ids = feedback_db.cluster_submission_ids(cluster_id, filters) if cluster_id else []
+                        if cluster_id:
+                            cluster = clusters[cluster_id]
+                            st.caption(f"{len(bulk_ids):,} similar submissions matching the filters, "
+                                       f"{cluster['first_date']} to {cluster['last_date']}.")
+                        else:
+                            st.caption(f"No near-duplicate groups in the last {feedback_db.DUPLICATE_WINDOW_DAYS} days.")
+                    else:
+                        bulk_ids = feedback_db.matching_submission_ids(filters, search_text)
+                        st.caption(f"{len(bulk_ids):,} submissions match.")
+                    bulk_status = st.selectbox("New status", feedback_validation.STATUSES, key="bulk_status")
+                    canned = st.selectbox("Canned response", ["None"] + list(feedback_ui.CANNED_RESPONSES))
+                    bulk_response = st.text_area("Response to send", feedback_ui.CANNED_RESPONSES.get(canned, ""))
+                    confirmed = scope == "Selected submissions" or st.checkbox(f"Yes, update all {len(bulk_ids):,} submissions")
+                    if st.button("Apply", disabled=not bulk_ids or not confirmed):
+                        progress = st.progress(0.0)
+                        results = feedback_db.bulk_update_submissions(
+                            bulk_ids, bulk_status, bulk_response, filters=filters,
+                            on_progress=lambda done, total: progress.progress(done / total, text=f"{done:,} / {total:,}"),
+                        )
+                        st.session_state['bulk_results'] = (bulk_status, results)
+                        st.rerun()
+                    if st.session_state.get('bulk_results'):
+                        bulk_status, results = st.session_state['bulk_results']
+                        updated = sum(result == "updated" for result in results.values())
+                        st.success(f"Set {updated:,} of {len(results):,} submissions to {bulk_status}.")
+                        st.dataframe([{"id": submission_id, "result": result} for submission_id, result in results.items()],
+                                     use_container_width=True)
+                with st.expander("📤 Export submissions matching the filters"):
+                    export_format = st.selectbox("Format", feedback_export.FORMATS)
+                    include_archived = st.checkbox("Include archived submissions", value=False)
+                    if feedback_replica.staleness():
+                        st.caption(f"Exports read the analytics snapshot, up to "
+                                   f"{feedback_replica.MAX_STALENESS_SECONDS / 60:.0f} min behind the list above.")
+                    if st.button("Prepare export"):
+                        previous = st.session_state.pop('export_file', None)
+                        if previous:
+                            feedback_export.remove_export_file(previous[0])
+                        export_path = feedback_export.new_export_file(export_format)
+                        try:
+                            stats = feedback_export.export_submissions(export_format, export_path, filters,
+                                                                     path=feedback_replica.read_path(),
+                                                                     include_archived=include_archived)
+                            st.session_state['export_file'] = (export_path, export_format, stats['rows'])
+                        except ImportError:
+                            feedback_export.remove_export_file(export_path)
+                            st.error("Parquet export needs the pyarrow package.")
+                    if st.session_state.get('export_file'):
+                        export_path, export_format, export_rows = st.session_state['export_file']
+                        try:
+                            export_size = os.path.getsize(export_path)
+                        except OSError:
+                            export_size = None
+                        if export_size is None:
+                            st.session_state.pop('export_file')
+                            st.info("That export has expired. Prepare it again to download it.")
+                        elif export_size > feedback_export.DOWNLOAD_MAX_BYTES:
+                            # A download is held in server memory; large ones stream from the CLI instead.
+                            st.session_state.pop('export_file')
+                            feedback_export.remove_export_file(export_path)
+                            st.warning(f"This export is {export_size / 2**20:,.0f} MB, too large to download here. "
+                                       f"Run `python feedback_export.py --format {export_format} --output "
+                                       f"submissions.{export_format} --replica"
+                                       + (" --include-archived" if include_archived else "")
+                                       + "` with the same filters on the server.")
+                        else:
+                            with open(export_path, "rb") as export_fh:
+                                st.download_button(f"Download {export_rows:,} rows ({export_format})", export_fh,
+                                                   file_name=f"feedback_submissions.{export_format}")
+                st.markdown('<h2 class="sub-header">✍️ Respond to Submissions</h2>', unsafe_allow_html=True)
+                # Claimed items come first so an admin works through their own queue.
+                submission_options = list(dict.fromkeys([claim['id'] for claim in my_claims] + page_df['id'].tolist()))
+                submission_id = st.selectbox("Select Submission ID", submission_options)
+                if submission_id:
+                    submission = feedback_db.get_submission(int(submission_id))
+                    st.markdown(f"""
+                    <div style="
+                        background: #f0f4f8;
+                        border-left: 6px solid #1f4e79;
+                        padding: 1.2rem 1.5rem;
+                        border-radius: 0.7rem;
+                        margin-bottom: 1.5rem;
+                        box-shadow: 0 2px 8px rgba(0,0,0,0.04);
+                        color: #1a1a1a;
+                    ">
+                        <h3 style="font-size:1.5rem;font-weight:bold;margin-top:0;color:#1a1a1a;">Submission Details:</h3>
+                        <p style="color:#1a1a1a;"><strong>Student:</strong> {submission['student_name']} ({submission['student_id']})</p>
+                        <p style="color:#1a1a1a;"><strong>Department:</strong> {submission['department']}</p>
+                        <p style="color:#1a1a1a;"><strong>Category:</strong> {submission['category']}</p>
+                        <p style="color:#1a1a1a;"><strong>Priority:</strong> {submission['priority']}</p>
+                        <p style="color:#1a1a1a;"><strong>Feedback:</strong> {submission['feedback_text']}</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    features = feedback_db.text_features(int(submission_id))
+                    if features:
+                        st.caption(f"Sentiment: {features['sentiment_label']} ({features['sentiment']:+.2f}) · "
+                                   f"Keywords: {features['keywords'] or '–'}")
+                    with st.form("admin_response"):
+                        new_status = st.selectbox("Update Status", feedback_validation.STATUSES)
+                        admin_response = st.text_area("Admin Response", placeholder="Enter your response to the student...")
+                        response_submitted = st.form_submit_button("Update Submission")
+                        if response_submitted:
+                            # The version shown before this submit, so a change made meanwhile is a conflict.
+                            seen_version = st.session_state.get('seen_versions', {}).get(int(submission_id), submission['version'])
+                            try:
+                                feedback_db.update_submission(int(submission_id), new_status, admin_response,
+                                                              version=seen_version)
+                                st.session_state['show_admin_success'] = True
+                                st.rerun()
+                            except feedback_db.UpdateConflict as conflict:
+                                st.error(f"Someone else updated this submission to {conflict.current['status']} "
+                                         f"in the meantime; review the current response below and submit again.")
+                                st.info(conflict.current['admin_response'] or "(no response)")
+                    st.session_state.setdefault('seen_versions', {})[int(submission_id)] = submission['version']
+            else:
+                st.markdown(feedback_ui.NO_SUBMISSIONS, unsafe_allow_html=True)
+        elif admin_tab == "Performance":
+            st.markdown('<h1 class="main-header">⏱️ Performance</h1>', unsafe_allow_html=True)
+            if not feedback_profiler.ENABLED:
+                st.info("Only page reruns and overall cache hits are collected. Run the app with FEEDBACK_PROFILE=1 "
+                        "to also time every query, chart and cached read.")
+            cache = feedback_cache.query_cache.stats()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(feedback_ui.metric_card(f"{cache['hit_rate']:.0%}", "Cache Hit Rate"), unsafe_allow_html=True)
+            with col2:
+                st.markdown(feedback_ui.metric_card(f"{cache['entries']:,}", "Cached Results"), unsafe_allow_html=True)
+            with col3:
+                st.markdown(feedback_ui.metric_card(f"{cache['bytes'] / 2**20:.1f} MiB", "Cache Memory"), unsafe_allow_html=True)
+
+            def timing_rows(label, summary):
+                return [{label: name, **{key: round(value, 1) for key, value in stats.items()}}
+                        for name, stats in sorted(summary.items(), key=lambda item: -item[1]["p95_ms"])]
+
+            st.subheader("📄 Page reruns")
+            st.dataframe(timing_rows("page", feedback_profiler.rerun_summary()), use_container_width=True)
+            if feedback_profiler.ENABLED:
+                st.subheader("🐢 Slowest queries (by p95)")
+                st.dataframe([{key: round(value, 2) if isinstance(value, float) else value for key, value in row.items()}
+                              for row in feedback_profiler.query_summary(20)], use_container_width=True)
+                st.subheader("📊 Charts and sections")
+                st.dataframe(timing_rows("span", feedback_profiler.span_summary()), use_container_width=True)
+                st.subheader("🗄️ Cache hits per read")
+                st.dataframe([{"read": name, "hits": stats["hits"], "misses": stats["misses"],
+                               "hit_rate": round(stats["hit_rate"], 3)}
+                              for name, stats in sorted(feedback_profiler.cache_summary().items())],
+                             use_container_width=True)
+
+            st.subheader("🚦 Refused submissions")
+            writer = feedback_writer.get_writer().stats()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(feedback_ui.metric_card(f"{writer['throttled']:,}", "Rate Limited (this process)"), unsafe_allow_html=True)
+            with col2:
+                st.markdown(feedback_ui.metric_card(f"{writer['shed'] + writer['rejected']:,}", "Shed Under Load (this process)"), unsafe_allow_html=True)
+            with col3:
+                st.markdown(feedback_ui.metric_card(f"{writer['queue_depth']:,}/{writer['queue_capacity']:,}", "Write Queue"), unsafe_allow_html=True)
+            counts = feedback_db.throttle_counts()
+            if counts:
+                st.dataframe([dict(row) for row in counts], use_container_width=True)
+            st.caption(feedback_ui.THROTTLE_NOTE.format(burst=feedback_ratelimit.BURST, per_hour=feedback_ratelimit.PER_HOUR,
+                                                        queue=feedback_ratelimit.SHED_QUEUE_DEPTH,
+                                                        lock_wait=feedback_ratelimit.SHED_LOCK_WAIT_MS))
+
+elif page == "❓ Help & Support":
+    st.markdown('<h1 class="main-header">❓ Help & Support</h1>', unsafe_allow_html=True)
+    
+    st.markdown(feedback_ui.HELP_INTRO, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(feedback_ui.HELP_CONTACTS, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(feedback_ui.HELP_FAQ, unsafe_allow_html=True)
+    
+    st.markdown(feedback_ui.HELP_GUIDELINES, unsafe_allow_html=True)
+
+# Footer
+st.markdown(feedback_ui.FOOTER, unsafe_allow_html=True)
+
+feedback_profiler.finish_rerun(rerun_page, _rerun_started)
+if feedback_profiler.ENABLED:
+    with st.sidebar.expander("⏱️ Profiler"):
+        st.caption("First import (ms)")
+        st.json({name: round(seconds * 1000, 1) for name, seconds in feedback_profiler.import_times.items()})
+        st.caption("Script reruns per page")
+        st.json({name: {key: round(value, 1) for key, value in stats.items()}
+                 for name, stats in feedback_profiler.rerun_summary().items()})
+        st.caption("DataFrame memory per view")
+        st.json({view: {key: round(value, 1) for key, value in stats.items()}
+                 for view, stats in feedback_profiler.frame_summary().items()})
@@ -0,0 +1,203 @@
+"""JSON API for feedback submissions, served alongside the Streamlit UI.
+
+    uvicorn feedback_api:app --host 0.0.0.0 --port 8000
+
+Endpoints:
+
+    POST  /submissions        create a submission (same rules as the submit form)
+    GET   /submissions/{id}   one submission: in full for an admin, or its status and response
+                              with ?student_id= and ?email= of its author
+    GET   /submissions        admin: newest first, ?status= ?priority= ?category= ?limit= ?cursor=
+    PATCH /submissions/{id}   admin: {"status": ..., "admin_response": ..., "version": ...}
+    GET   /health             write queue statistics
+
+Admin endpoints take HTTP Basic credentials checked against admin_users.
+A PATCH carrying the ``version`` it last read is rejected with 409 and the
+current row if someone else updated the submission in between.
+The service uses the same database (FEEDBACK_DB_PATH) and schema as the app.
+SQLite work runs on a bounded thread pool (FEEDBACK_API_WORKERS, default the
+connection pool size) so the event loop never blocks on the database.
+Creates go through the coalescing writer and are awaited without holding a
+worker; when its queue is full the API answers 503 at once instead of
+queueing more work.
+Creates are rate limited per student ID and email like the submit form's
+(feedback_ratelimit) and answered 429 with Retry-After. There is no per-client
+bucket: an LMS, gateway or proxy sends many students' submissions from one
+address.
+"""
+
+import asyncio
+import base64
+import binascii
+import contextlib
+import functools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import feedback_db
+import feedback_ratelimit
+import feedback_validation
+import feedback_writer
+
+API_WORKERS = int(os.environ.get("FEEDBACK_API_WORKERS", str(feedback_db.POOL_SIZE)))
+MAX_PAGE_SIZE = 200
+
+_executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix="feedback-api")
+
+
+async def _db(fn, *args, **kwargs):
+    """Run a blocking feedback_db call on the bounded pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+def _error(status_code, message, headers=None):
+    return JSONResponse({"error": message}, status_code=status_code, headers=headers)
+
+
+def _unauthorized():
+    return _error(401, "Admin credentials required.", {"WWW-Authenticate": 'Basic realm="feedback"'})
+
+
+async def _is_admin(request):
+    scheme, _, encoded = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "basic":
+        return False
+    try:
+        username, _, password = base64.b64decode(encoded).decode().partition(":")
+    except (binascii.Error, UnicodeDecodeError):
+        return False
+    return await _db(feedback_db.check_admin, username, password)
+
+
+async def _json_body(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+def _encode_cursor(cursor):
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(cursor)).encode()).decode()
+
+
+def _decode_cursor(token):
+    """Inverse of ``_encode_cursor``; raises ValueError on a malformed token."""
+    if not token:
+        return None
+    submission_date, submission_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+    if not isinstance(submission_date, str) or not isinstance(submission_id, int):
+        raise ValueError("bad cursor")
+    return submission_date, submission_id
+
+
+async def create_submission(request):
+    body = await _json_body(request)
+    if body is None:
+        return _error(400, "Request body must be a JSON object.")
+    submission = {field: body.get(field) for field in feedback_db.SUBMISSION_FIELDS}
+    if any(value is not None and not isinstance(value, str) for value in submission.values()):
+        return _error(422, "All fields must be strings.")
+    error = feedback_validation.submission_error(submission)
+    if error:
+        return _error(422, error)
+    keys = feedback_ratelimit.limit_keys(submission)
+    try:
+        future = feedback_writer.get_writer().submit(submission, timeout=0, keys=keys)
+        submission_id = await asyncio.wrap_future(future)
+    except feedback_writer.WriteQueueFull:
+        return _error(503, "Too many submissions right now; retry shortly.", {"Retry-After": "1"})
+    except feedback_ratelimit.RateLimited as limited:
+        return _error(429, str(limited), {"Retry-After": str(max(1, round(limited.retry_after)))})
+    return JSONResponse({"id": submission_id, "status": "Pending"}, status_code=201,
+                        headers={"Location": f"/submissions/{submission_id}"})
+
+
+def _is_author(row, student_id, email):
+    """Both must match the submission's, ignoring case and spacing as the Track My Submission page does."""
+    given = feedback_validation.student_key(student_id, email)
+    return bool(student_id and email) and given == feedback_validation.student_key(row["student_id"], row["email"])
+
+
+async def get_submission(request):
+    row = await _db(feedback_db.get_submission, request.path_params["submission_id"])
+    if row is not None and "authorization" in request.headers and await _is_admin(request):
+        return JSONResponse(dict(row))
+    params = request.query_params
+    # Unknown ids and other students' submissions look the same.
+    if row is None or not _is_author(row, params.get("student_id"), params.get("email")):
+        return _error(404, "Submission not found.")
+    return JSONResponse({column: row[column] for column in feedback_db.STUDENT_COLUMNS})
+
+
+async def list_submissions(request):
+    if not await _is_admin(request):
+        return _unauthorized()
+    params = request.query_params
+    filters = {column: params.get(column) for column in feedback_db.FILTER_COLUMNS}
+    try:
+        limit = int(params.get("limit", feedback_db.MANAGE_PAGE_SIZE))
+        after = _decode_cursor(params.get("cursor"))
+    except (ValueError, TypeError):
+        return _error(400, "Invalid limit or cursor.")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return _error(400, f"limit must be between 1 and {MAX_PAGE_SIZE}.")
+    rows, cursor = await _db(feedback_db.list_submissions, filters, after=after, page_size=limit)
+    return JSONResponse({"submissions": rows, "next_cursor": _encode_cursor(cursor)})
+
+
+async def update_submission(request):
+    if not await _is_admin(request):
+        return _unauthorized()
+    body = await _json_body(request)
+    if body is None:
+        return _error(400, "Request body must be a JSON object.")
+    status = body.get("status")
+    admin_response = body.get("admin_response")
+    if status not in feedback_validation.STATUSES:
+        return _error(422, f"status must be one of {', '.join(feedback_validation.STATUSES)}.")
+    if admin_response is not None and not isinstance(admin_response, str):
+        return _error(422, "admin_response must be a string.")
+    version = body.get("version")
+    if version is not None and (not isinstance(version, int) or isinstance(version, bool)):
+        return _error(422, "version must be an integer.")
+    submission_id = request.path_params["submission_id"]
+    try:
+        updated = await _db(feedback_db.update_submission, submission_id, status, admin_response, version)
+    except feedback_db.UpdateConflict as conflict:
+        return JSONResponse({"error": "Submission was updated by someone else.", "current": dict(conflict.current)},
+                            status_code=409)
+    if not updated:
+        return _error(404, "Submission not found.")
+    return JSONResponse(dict(await _db(feedback_db.get_submission, submission_id)))
+
+
+async def health(request):
+    return JSONResponse({"status": "ok", "write_queue": feedback_writer.get_writer().stats()})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    await _db(feedback_db.ensure_database)
+    yield
+    feedback_db.close_pools()
+
+
+app = Starlette(
+    routes=[
+        Route("/submissions", create_submission, methods=["POST"]),
+        Route("/submissions", list_submissions, methods=["GET"]),
+        Route("/submissions/{submission_id:int}", get_submission, methods=["GET"]),
+        Route("/submissions/{submission_id:int}", update_submission, methods=["PATCH"]),
+        Route("/health", health, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
@@ -0,0 +1,229 @@
+"""Hot/cold archiving of resolved submissions.
+
+Completed and Rejected submissions older than ``ARCHIVE_AFTER_DAYS`` are
+moved from ``feedback_submissions`` to ``feedback_archive`` in batches of
+``ARCHIVE_BATCH_SIZE``, one short write transaction each, so the hot table
+and its indexes only hold what admins still work on. The move is an INSERT
+into the archive followed by a DELETE from the hot table; the rollup and SLA
+delete triggers skip rows that are already in the archive, so Dashboard and
+Analytics totals stay all-time. ``feedback_all_submissions`` is a read-through
+view over both tables for queries that need every submission.
+
+Freed pages are returned to the file system with ``PRAGMA incremental_vacuum``
+when the database uses incremental auto-vacuum (new databases do); ``vacuum
+--convert`` switches an older file over with one full VACUUM.
+
+    python feedback_archive.py archive   # move old resolved submissions, then reclaim space
+    python feedback_archive.py vacuum --convert
+    python feedback_archive.py status
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get("FEEDBACK_ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("FEEDBACK_ARCHIVE_BATCH_SIZE", "1000"))
+VACUUM_STEP_PAGES = 2000
+
+RESOLVED_STATUSES = ("Completed", "Rejected")
+
+ARCHIVE_TABLE = "feedback_archive"
+ALL_SUBMISSIONS = "feedback_all_submissions"
+
+# Everything but the triage claim columns, which mean nothing once resolved.
+ARCHIVED_COLUMNS = (
+    "id", "student_id", "student_name", "email", "department", "course_code",
+    "feedback_type", "category", "priority", "feedback_text", "submission_date",
+    "status", "admin_response", "response_date", "version",
+)
+
+# For AFTER DELETE triggers on feedback_submissions that must ignore the move.
+NOT_ARCHIVED = f"WHEN NOT EXISTS (SELECT 1 FROM {ARCHIVE_TABLE} WHERE id = OLD.id)"
+
+_COLUMNS = ", ".join(ARCHIVED_COLUMNS)
+
+# The (status, submission_date) index serves this as one range per status.
+ARCHIVE_BATCH_SQL = f'''
+    INSERT INTO {ARCHIVE_TABLE} ({_COLUMNS}, archived_date)
+    SELECT {_COLUMNS}, CURRENT_TIMESTAMP FROM feedback_submissions
+    WHERE status IN ({", ".join("?" * len(RESOLVED_STATUSES))}) AND submission_date < ?
+    LIMIT ?
+    RETURNING id
+'''
+
+GET_ARCHIVED_SQL = f"SELECT * FROM {ARCHIVE_TABLE} WHERE id = ?"
+
+
+def create_archive(conn):
+    """Create the archive table and the read-through view (used by a migration)."""
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS {ARCHIVE_TABLE} (
+            id INTEGER PRIMARY KEY,
+            student_id TEXT NOT NULL,
+            student_name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            department TEXT NOT NULL,
+            course_code TEXT,
+            feedback_type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            feedback_text TEXT NOT NULL,
+            submission_date TIMESTAMP,
+            status TEXT,
+            admin_response TEXT,
+            response_date TIMESTAMP,
+            version INTEGER NOT NULL DEFAULT 0,
+            archived_date TIMESTAMP NOT NULL
+        )
+    ''')
+    conn.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_feedback_archive_date
+        ON {ARCHIVE_TABLE} (submission_date)
+    ''')
+    conn.execute(f'''
+        CREATE VIEW IF NOT EXISTS {ALL_SUBMISSIONS} AS
+        SELECT {_COLUMNS}, NULL AS archived_date FROM feedback_submissions
+        UNION ALL
+        SELECT {_COLUMNS}, archived_date FROM {ARCHIVE_TABLE}
+    ''')
+
+
+def archive_batch(conn, cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move up to ``batch_size`` resolved submissions dated before ``cutoff``; returns how many.
+
+    Call inside a write transaction: the rows must never be in both tables
+    or in neither as seen by another connection.
+    """
+    ids = [row[0] for row in conn.execute(ARCHIVE_BATCH_SQL, RESOLVED_STATUSES + (cutoff, batch_size))]
+    conn.executemany("DELETE FROM feedback_submissions WHERE id = ?", [(i,) for i in ids])
+    return len(ids)
+
+
+def cutoff_for(days):
+    """``submission_date`` text of ``days`` days ago, UTC like CURRENT_TIMESTAMP."""
+    return (datetime.datetime.utcnow() - datetime.timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def archive_resolved(path=None, days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE,
+                     max_batches=None, pause=0.0, on_progress=None):
+    """Archive every resolved submission older than ``days`` days, one transaction per batch.
+
+    ``pause`` seconds are slept between batches to leave the write lock to
+    the app. ``on_progress(archived, seconds)`` is called after each batch.
+    Afterwards drops change-feed tombstones past their retention (see
+    feedback_sync), so archiving does not leave one row per move behind.
+    Returns ``{"archived", "batches", "tombstones_pruned", "seconds"}``.
+    """
+    import feedback_db
+    import feedback_sync
+
+    cutoff = cutoff_for(days)
+    started = time.perf_counter()
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        with feedback_db.transaction(path) as conn:
+            moved = archive_batch(conn, cutoff, batch_size)
+        if not moved:
+            break
+        archived += moved
+        batches += 1
+        if on_progress:
+            on_progress(archived, time.perf_counter() - started)
+        if pause:
+            time.sleep(pause)
+    if archived:
+        feedback_db.invalidate_cache(path)
+    pruned = feedback_sync.prune_tombstones(path)
+    return {"archived": archived, "batches": batches, "tombstones_pruned": pruned,
+            "seconds": time.perf_counter() - started}
+
+
+def space_stats(conn):
+    """``auto_vacuum``, ``page_size``, ``page_count`` and ``freelist_count`` of the main database."""
+    return {
+        pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        for pragma in ("auto_vacuum", "page_size", "page_count", "freelist_count")
+    }
+
+
+def reclaim_space(path=None, step_pages=VACUUM_STEP_PAGES, convert=False):
+    """Return free pages to the file system; returns the number of pages released.
+
+    With incremental auto-vacuum the free list is released ``step_pages``
+    at a time, each step its own short write transaction. Otherwise nothing
+    happens unless ``convert`` is set, which switches the file to incremental
+    auto-vacuum with a full VACUUM (it rewrites the whole file and blocks
+    writers while it runs).
+    """
+    import feedback_db
+
+    with feedback_db.connection(path) as conn:
+        before = space_stats(conn)
+        if before["auto_vacuum"] != 2:
+            if not convert:
+                return 0
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            free = before["freelist_count"]
+            while free:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(f"PRAGMA incremental_vacuum({step_pages})").fetchall()
+                except BaseException:
+                    conn.rollback()
+                    raise
+                conn.commit()
+                remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if remaining >= free:
+                    break
+                free = remaining
+        after = space_stats(conn)
+    return max(0, before["page_count"] - after["page_count"])
+
+
+def main(argv=None):
+    import feedback_db
+
+    parser = argparse.ArgumentParser(description="Archive old resolved submissions and reclaim the space.")
+    parser.add_argument("command", choices=["archive", "vacuum", "status"])
+    parser.add_argument("--db", default=feedback_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help="archive resolved submissions older than this (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to wait between batches")
+    parser.add_argument("--convert", action="store_true",
+                        help="switch the file to incremental auto-vacuum with one full VACUUM")
+    args = parser.parse_args(argv)
+
+    feedback_db.init_database(args.db)
+    if args.command == "archive":
+        stats = archive_resolved(args.db, args.days, args.batch_size, pause=args.pause)
+        print(f"Archived {stats['archived']:,} submissions in {stats['batches']:,} batches "
+              f"({stats['seconds']:.1f}s); pruned {stats['tombstones_pruned']:,} expired tombstones.")
+    if args.command in ("archive", "vacuum"):
+        released = reclaim_space(args.db, convert=args.convert)
+        with feedback_db.connection(args.db) as conn:
+            stats = space_stats(conn)
+        if stats["auto_vacuum"] != 2:
+            print("Database does not use incremental auto-vacuum; run with vacuum --convert to reclaim space.")
+        else:
+            print(f"Released {released:,} pages ({released * stats['page_size'] / 2**20:.1f} MiB).")
+        return 0
+
+    with feedback_db.connection(args.db) as conn:
+        hot = conn.execute("SELECT COUNT(*) FROM feedback_submissions").fetchone()[0]
+        cold = conn.execute(f"SELECT COUNT(*) FROM {ARCHIVE_TABLE}").fetchone()[0]
+        stats = space_stats(conn)
+    mode = {0: "none", 1: "full", 2: "incremental"}[stats["auto_vacuum"]]
+    print(f"{hot:,} hot and {cold:,} archived submissions.")
+    print(f"{stats['page_count'] * stats['page_size'] / 2**20:.1f} MiB, "
+          f"{stats['freelist_count'] * stats['page_size'] / 2**20:.1f} MiB free, auto-vacuum {mode}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Process-wide LRU cache for read query results.
+
+Entries are stored with the database change token that was current when
+they were loaded (see ``feedback_db.change_token``). A lookup only hits if
+the token still matches, so any committed write, from this process or
+another, makes older results unreachable without an explicit flush.
+
+``student_cache`` instead keeps a student's own submission lookups for
+``FEEDBACK_STUDENT_CACHE_SECONDS`` (default 30), since on a busy database
+the change token would rarely let them hit.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+MAX_BYTES = int(float(os.environ.get("FEEDBACK_QUERY_CACHE_MB", "64")) * 1024 * 1024)
+
+
+def estimate_size(value):
+    """Rough in-memory size of a cached result, in bytes."""
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, token):
+        """Return ``(True, value)`` on a hit for ``token``, else ``(False, None)``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == token:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, token, value):
+        size = estimate_size(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (token, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key, token, loader):
+        hit, value = self.get(key, token)
+        if not hit:
+            value = loader()
+            self.put(key, token, value)
+        return value
+
+    def invalidate(self, prefix=None):
+        """Drop every entry, or only those whose key starts with ``prefix``."""
+        with self._lock:
+            for key in list(self._entries):
+                if prefix is None or key[0] == prefix:
+                    self._discard(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+
+class TTLCache:
+    """A small LRU cache whose entries expire ``ttl`` seconds after they were stored.
+
+    For per-user results that tolerate being a little stale but would rarely
+    survive the change token of a busy database.
+    """
+
+    def __init__(self, ttl, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return ``(True, value)`` for an entry younger than ``ttl``, else ``(False, None)``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, prefix):
+        """Drop every entry whose key tuple starts with ``prefix``."""
+        with self._lock:
+            for key in [key for key in self._entries if key[:len(prefix)] == prefix]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+query_cache = QueryCache()
+student_cache = TTLCache(float(os.environ.get("FEEDBACK_STUDENT_CACHE_SECONDS", "30")))
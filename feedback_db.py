@@ -0,0 +1,1081 @@
+"""Shared SQLite data-access layer for the Caleb University Feedback System.
+
+Every page of ``caleb_enhanced_app.py`` goes through this module instead of
+calling ``sqlite3.connect`` itself. Connections come from a per-process pool
+and are opened once with WAL journaling, a busy timeout and tuned pragmas, so
+a Streamlit rerun no longer pays connection setup and concurrent sessions
+wait for the lock instead of failing with "database is locked".
+"""
+
+import datetime
+import functools
+import hmac
+import html
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import feedback_archive
+import feedback_dedup
+import feedback_migrations
+import feedback_profiler
+import feedback_rollups
+import feedback_sla
+import feedback_triage
+import feedback_validation
+from feedback_cache import query_cache, student_cache
+
+DB_PATH = os.environ.get("FEEDBACK_DB_PATH", "feedback_database.db")
+
+POOL_SIZE = int(os.environ.get("FEEDBACK_DB_POOL_SIZE", "8"))
+POOL_TIMEOUT_SECONDS = int(os.environ.get("FEEDBACK_DB_POOL_TIMEOUT", "10"))
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KIB = 16384
+STATEMENT_CACHE_SIZE = 256
+
+# The SQL text is kept in module constants so every call passes the exact
+# same string and hits each connection's prepared-statement cache.
+INSERT_SUBMISSION_SQL = '''
+    INSERT INTO feedback_submissions
+    (student_id, student_name, email, department, course_code,
+     feedback_type, category, priority, feedback_text)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Answering a submission bumps its version and ends any claim on it. With a
+# NULL expected version the update is unconditional.
+UPDATE_SUBMISSION_SQL = '''
+    UPDATE feedback_submissions
+    SET status = ?, admin_response = ?, response_date = CURRENT_TIMESTAMP,
+        version = version + 1, claimed_by = NULL, claim_expires = NULL
+    WHERE id = ? AND (? IS NULL OR version = ?)
+'''
+
+SUBMISSION_FIELDS = (
+    "student_id", "student_name", "email", "department", "course_code",
+    "feedback_type", "category", "priority", "feedback_text",
+)
+
+
+_statement_listeners = []
+
+
+def add_statement_listener(callback):
+    """Call ``callback(sql)`` for every statement the data layer executes."""
+    _statement_listeners.append(callback)
+
+
+def remove_statement_listener(callback):
+    _statement_listeners.remove(callback)
+
+
+def _notify_statement(sql):
+    for listener in list(_statement_listeners):
+        listener(sql)
+
+
+def _trace(conn):
+    # Only install the trace hook while someone listens; it costs a Python
+    # call per statement.
+    conn.set_trace_callback(_notify_statement if _statement_listeners else None)
+
+
+if feedback_profiler.ENABLED:
+    add_statement_listener(feedback_profiler.trace_statement)
+
+
+def _configure(conn):
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+
+def open_connection(path=None):
+    """Open a tuned connection outside the pool (scripts, migrations)."""
+    conn = sqlite3.connect(
+        path or DB_PATH,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    _configure(conn)
+    _trace(conn)
+    return conn
+
+
+class DatabaseBusy(Exception):
+    """Raised when no pooled connection comes free in time, or a bulk import cannot lock the database."""
+
+
+class ConnectionPool:
+    """A bounded pool of tuned connections to one database file.
+
+    Connections run in autocommit mode; use ``transaction()`` for writes so
+    they take the write lock up front with ``BEGIN IMMEDIATE``. A discarded
+    connection frees its slot, so a waiting caller opens a replacement.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = []
+        self._created = 0
+        self._available = threading.Condition()
+
+    def acquire(self, timeout=POOL_TIMEOUT_SECONDS):
+        """Return an idle connection, open a new one if below ``size``, or wait.
+
+        Raises DatabaseBusy if none comes free within ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DatabaseBusy(f"No database connection came free within {timeout} seconds "
+                                       f"(FEEDBACK_DB_POOL_SIZE={self.size}).")
+                self._available.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return open_connection(self.path)
+        except BaseException:
+            self._free_slot()
+            raise
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self.discard(conn)
+            return
+        with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    def discard(self, conn):
+        conn.close()
+        self._free_slot()
+
+    def _free_slot(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def close(self):
+        with self._available:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self.discard(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path=None):
+    """Return this process's pool for ``path``, creating it on first use."""
+    key = (os.getpid(), os.path.abspath(path or DB_PATH))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(key[1])
+    return pool
+
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+@contextmanager
+def connection(path=None):
+    """Borrow a pooled connection for the duration of the ``with`` block."""
+    pool = get_pool(path)
+    conn = pool.acquire()
+    _trace(conn)
+    statements = feedback_profiler.begin_statements(conn) if feedback_profiler.ENABLED else None
+    try:
+        yield conn
+    finally:
+        if statements is not None:
+            feedback_profiler.end_statements(statements)
+        pool.release(conn)
+
+
+@contextmanager
+def transaction(path=None):
+    """Run the block in a single ``BEGIN IMMEDIATE`` write transaction."""
+    with connection(path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def fetch_all(sql, params=(), path=None):
+    with connection(path) as conn:
+        cursor = conn.execute(sql, params)
+        cursor.row_factory = sqlite3.Row
+        rows = cursor.fetchall()
+        if feedback_profiler.ENABLED:
+            feedback_profiler.record_rows(len(rows))
+        return rows
+
+
+def fetch_one(sql, params=(), path=None):
+    with connection(path) as conn:
+        cursor = conn.execute(sql, params)
+        cursor.row_factory = sqlite3.Row
+        row = cursor.fetchone()
+        if feedback_profiler.ENABLED:
+            feedback_profiler.record_rows(int(row is not None))
+        return row
+
+
+def read_dataframe(sql, params=(), path=None):
+    import pandas as pd
+
+    with connection(path) as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+        if feedback_profiler.ENABLED:
+            feedback_profiler.record_rows(len(df))
+        return df
+
+
+# Low-cardinality columns become Categoricals, with the form's choices first
+# so frames from different queries share one category order.
+CATEGORICAL_COLUMNS = {
+    "status": feedback_validation.STATUSES,
+    "priority": feedback_validation.PRIORITIES,
+    "category": feedback_validation.CATEGORIES,
+    "feedback_type": feedback_validation.FEEDBACK_TYPES,
+    "department": feedback_validation.DEPARTMENTS,
+}
+DATE_COLUMNS = ("submission_date", "response_date")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def typed_frame(df, dates=DATE_COLUMNS):
+    """Return ``df`` with compact dtypes: Categoricals and parsed ``datetime64`` dates."""
+    import pandas as pd
+
+    converted = {}
+    for column, choices in CATEGORICAL_COLUMNS.items():
+        if column in df:
+            extra = sorted(set(df[column].dropna()) - set(choices))
+            converted[column] = df[column].astype(pd.CategoricalDtype(list(choices) + extra))
+    for column in dates:
+        if column in df:
+            try:
+                converted[column] = pd.to_datetime(df[column], format=TIMESTAMP_FORMAT)
+            except ValueError:
+                converted[column] = pd.to_datetime(df[column])
+    return df.assign(**converted)
+
+
+def read_frame(sql, params=(), path=None, dates=DATE_COLUMNS):
+    """``read_dataframe`` followed by ``typed_frame``."""
+    return typed_frame(read_dataframe(sql, params, path=path), dates)
+
+
+def frame_memory(df):
+    """Bytes held by ``df``, including the strings in object columns."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+CHANGE_TOKEN_SQL = "SELECT seq FROM feedback_changes WHERE id = 1"
+
+
+def change_token(path=None):
+    """Counter bumped by triggers on every write to feedback_submissions."""
+    return fetch_one(CHANGE_TOKEN_SQL, path=path)[0]
+
+
+def cached_read(fn):
+    """Serve ``fn``'s result from the shared query cache while the data is unchanged.
+
+    Cached values are shared across sessions and must not be mutated.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, path=None, **kwargs):
+        db = os.path.abspath(path or DB_PATH)
+        key = (db, fn.__name__, repr(args), repr(sorted(kwargs.items())))
+        # Read the token before the data: a write in between can only make
+        # the stored entry look stale, never make stale data look fresh.
+        token = change_token(path)
+        hit, value = query_cache.get(key, token)
+        if feedback_profiler.ENABLED:
+            feedback_profiler.record_cache(fn.__name__, hit)
+        if not hit:
+            value = fn(*args, path=path, **kwargs)
+            query_cache.put(key, token, value)
+        return value
+    return wrapper
+
+
+def invalidate_cache(path=None):
+    query_cache.invalidate(os.path.abspath(path or DB_PATH))
+
+
+def insert_submission(submission, path=None):
+    """Insert one submission (a mapping of SUBMISSION_FIELDS) and return its id."""
+    values = tuple(submission.get(field) for field in SUBMISSION_FIELDS)
+    with transaction(path) as conn:
+        submission_id = conn.execute(INSERT_SUBMISSION_SQL, values).lastrowid
+        feedback_dedup.index_new_submissions(conn)
+    invalidate_cache(path)
+    return submission_id
+
+
+class UpdateConflict(Exception):
+    """Raised when a submission changed since the version the caller read."""
+
+    def __init__(self, current):
+        super().__init__(f"Submission {current['id']} is at version {current['version']}.")
+        self.current = current
+
+
+def update_submission(submission_id, status, admin_response, version=None, path=None):
+    """Set the status and admin response of one submission; False if it does not exist.
+
+    With ``version`` the update only applies if the row is still at that
+    version; otherwise UpdateConflict is raised carrying the current row.
+    """
+    with transaction(path) as conn:
+        params = (status, admin_response, submission_id, version, version)
+        updated = conn.execute(UPDATE_SUBMISSION_SQL, params).rowcount
+        current = None
+        if not updated and version is not None:
+            cursor = conn.execute(GET_SUBMISSION_SQL, (submission_id,))
+            cursor.row_factory = sqlite3.Row
+            current = cursor.fetchone()
+    invalidate_cache(path)
+    if current is not None:
+        raise UpdateConflict(current)
+    return updated > 0
+
+
+ADMIN_PASSWORD_SQL = "SELECT password_hash FROM admin_users WHERE username = ?"
+
+
+def check_admin(username, password, path=None):
+    """True if ``username``/``password`` match a row of admin_users."""
+    row = fetch_one(ADMIN_PASSWORD_SQL, (username,), path=path)
+    return row is not None and hmac.compare_digest(row[0].encode(), password.encode())
+
+
+def init_database(path=None):
+    """Create or upgrade the schema to the latest migration version."""
+    with connection(path) as conn:
+        return feedback_migrations.migrate(conn)
+
+
+_initialized = set()
+_initialized_lock = threading.Lock()
+
+
+def ensure_database(path=None):
+    """Run ``init_database`` once per process per database file.
+
+    The app calls this on every Streamlit rerun; only the first call pays
+    for the migration check.
+    """
+    key = (os.getpid(), os.path.abspath(path or DB_PATH))
+    if key in _initialized:
+        return
+    with _initialized_lock:
+        if key not in _initialized:
+            init_database(path)
+            _initialized.add(key)
+
+
+# All-time totals come from the rollups, which keep counting archived rows;
+# only the recent count reads rows, through the hot-and-archive view.
+SUBMISSION_METRICS_SQL = f'''
+    SELECT
+        (SELECT COALESCE(SUM(count), 0) FROM feedback_rollups WHERE dimension = 'priority') AS total,
+        (SELECT COALESCE(SUM(count), 0) FROM feedback_rollups
+         WHERE dimension = 'status' AND value = 'Pending') AS pending,
+        (SELECT COALESCE(SUM(count), 0) FROM feedback_rollups
+         WHERE dimension = 'priority' AND value IN ('High', 'Urgent')) AS high_priority,
+        (SELECT COUNT(*) FROM {feedback_archive.ALL_SUBMISSIONS} WHERE submission_date >= ?) AS this_week,
+        (SELECT COUNT(*) FROM feedback_rollups WHERE dimension = 'department' AND count > 0) AS departments
+'''
+
+RECENT_SUBMISSIONS_SQL = '''
+    SELECT student_id, feedback_type, category, priority, status, submission_date
+    FROM feedback_submissions
+    ORDER BY submission_date DESC, id DESC
+    LIMIT ?
+'''
+
+
+def submission_metrics(days=7, path=None):
+    """Return the Welcome/Dashboard card numbers from one aggregate query.
+
+    Keys: total, pending, high_priority, this_week (submitted in the last
+    ``days`` days) and departments.
+    """
+    # The cutoff is truncated to the minute so cached results stay
+    # reusable within a minute; timestamps are UTC like CURRENT_TIMESTAMP.
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+    return _submission_metrics(since.strftime("%Y-%m-%d %H:%M:00"), path=path)
+
+
+@cached_read
+def _submission_metrics(since, path=None):
+    return dict(fetch_one(SUBMISSION_METRICS_SQL, (since,), path=path))
+
+
+@cached_read
+def recent_submissions(limit=10, path=None):
+    return read_frame(RECENT_SUBMISSIONS_SQL, (limit,), path=path)
+
+
+ROLLUP_COUNTS_SQL = '''
+    SELECT dimension, value, count
+    FROM feedback_rollups
+    WHERE count > 0
+    ORDER BY dimension, count DESC, value
+'''
+
+
+@cached_read
+def analytics_counts(path=None):
+    """Return ``{dimension: (values, counts)}`` for every Analytics chart.
+
+    Read from the trigger-maintained rollups, largest count first, like
+    ``value_counts()``.
+    """
+    counts = {dimension: ([], []) for dimension in feedback_rollups.DIMENSIONS}
+    for dimension, value, count in fetch_all(ROLLUP_COUNTS_SQL, path=path):
+        values, totals = counts.setdefault(dimension, ([], []))
+        values.append(value)
+        totals.append(count)
+    return counts
+
+
+SLA_BREAKDOWNS = ("priority", "department")
+SLA_PERIODS = {"day": "day", "week": "date(day, 'weekday 0', '-6 days')"}
+
+SLA_VOLUME_SQL = '''
+    SELECT {period} AS period, SUM(submitted) AS submitted,
+           SUM(responded) AS responded, SUM(breached) AS breached
+    FROM feedback_sla_daily
+    WHERE day >= ?
+    GROUP BY period
+    ORDER BY period
+'''
+
+# Grouped by both breakdowns at once; sla_summary folds the result per
+# priority or per department, so the two tables share one rollup pass.
+SLA_TOTALS_SQL = f'''
+    SELECT priority, department, SUM(submitted), SUM(responded), SUM(breached), SUM(response_hours),
+           {", ".join(f"SUM({column})" for column in feedback_sla.BUCKET_COLUMNS)}
+    FROM feedback_sla_daily
+    WHERE day >= ?
+    GROUP BY priority, department
+'''
+
+# Still unanswered and already past their deadline; served from the partial
+# idx_feedback_unanswered index, which only holds the open backlog.
+OPEN_BREACHES_SQL = f'''
+    SELECT priority, department, COUNT(*)
+    FROM feedback_submissions s
+    WHERE response_date IS NULL AND submission_date >= ?
+      AND submission_date < datetime(?, '-' || {feedback_sla.sla_expression("s")} || ' hours')
+    GROUP BY priority, department
+'''
+
+
+def _sla_since(days):
+    if days is None:
+        return ""
+    return (datetime.datetime.utcnow().date() - datetime.timedelta(days=days)).isoformat()
+
+
+def submission_volume(period="day", days=365, path=None):
+    """Submissions, responses and breaches per day or week (by submission day).
+
+    Returns a DataFrame with period, submitted, responded and breached, read
+    from the SLA daily rollups. ``days=None`` covers all time.
+    """
+    return _submission_volume(period, _sla_since(days), path=path)
+
+
+@cached_read
+def _submission_volume(period, since, path=None):
+    return read_frame(SLA_VOLUME_SQL.format(period=SLA_PERIODS[period]), (since,), path=path, dates=("period",))
+
+
+def sla_summary(by="priority", days=365, path=None):
+    """Response-time and SLA figures per priority or department.
+
+    Returns one dict per value with submitted, responded, mean/median/p90/p99
+    hours to a response (percentiles estimated from the rollup histogram),
+    breached (answered late) and open_breaches (unanswered past deadline),
+    covering submissions from the last ``days`` days (``None`` for all time).
+    """
+    if by not in SLA_BREAKDOWNS:
+        raise ValueError(f"Unknown SLA breakdown {by!r}")
+    # Truncated to the minute, like submission_metrics, so results cache.
+    now = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:00")
+    since = _sla_since(days)
+    position = SLA_BREAKDOWNS.index(by)
+
+    groups = {}
+    for row in _sla_totals(since, path=path):
+        totals = groups.setdefault(row[position], [0] * (len(row) - 2))
+        for i, value in enumerate(row[2:]):
+            totals[i] += value
+    open_breaches = {}
+    for row in _open_breaches(since, now, path=path):
+        open_breaches[row[position]] = open_breaches.get(row[position], 0) + row[2]
+
+    rows = []
+    for value, (submitted, responded, breached, hours, *histogram) in sorted(groups.items()):
+        if not submitted:
+            continue
+        rows.append({
+            by: value,
+            "submitted": submitted,
+            "responded": responded,
+            "mean_hours": hours / responded if responded else None,
+            "median_hours": feedback_sla.percentile(histogram, 0.5),
+            "p90_hours": feedback_sla.percentile(histogram, 0.9),
+            "p99_hours": feedback_sla.percentile(histogram, 0.99),
+            "breached": breached,
+            "open_breaches": open_breaches.get(value, 0),
+        })
+    return rows
+
+
+@cached_read
+def _sla_totals(since, path=None):
+    return [tuple(row) for row in fetch_all(SLA_TOTALS_SQL, (since,), path=path)]
+
+
+@cached_read
+def _open_breaches(since, now, path=None):
+    return [tuple(row) for row in fetch_all(OPEN_BREACHES_SQL, (since, now), path=path)]
+
+
+TEXT_SENTIMENT_SQL = '''
+    SELECT category, sentiment_label, COUNT(*) AS submissions, AVG(sentiment) AS mean_sentiment
+    FROM feedback_text_features
+    GROUP BY category, sentiment_label
+'''
+
+TEXT_TOPICS_SQL = '''
+    SELECT t.topic, t.terms, COUNT(f.id) AS submissions, AVG(f.sentiment) AS mean_sentiment
+    FROM feedback_topics AS t
+    LEFT JOIN feedback_text_features AS f ON f.topic = t.topic
+    GROUP BY t.topic
+    ORDER BY submissions DESC, t.topic
+'''
+
+TEXT_FEATURES_SQL = "SELECT sentiment, sentiment_label, topic, keywords FROM feedback_text_features WHERE id = ?"
+
+
+@cached_read
+def text_analytics(path=None):
+    """Sentiment per category and the topics, from the precomputed text features.
+
+    Returns ``{"analysed", "sentiment", "topics"}``; the last two are lists
+    of dicts.
+    """
+    sentiment = [dict(row) for row in fetch_all(TEXT_SENTIMENT_SQL, path=path)]
+    return {
+        "analysed": sum(row["submissions"] for row in sentiment),
+        "sentiment": sentiment,
+        "topics": [dict(row) for row in fetch_all(TEXT_TOPICS_SQL, path=path)],
+    }
+
+
+def text_features(submission_id, path=None):
+    """Sentiment, topic and keywords of one submission, or None before it is analysed."""
+    return fetch_one(TEXT_FEATURES_SQL, (submission_id,), path=path)
+
+
+THROTTLE_COUNTS_SQL = '''
+    SELECT day, reason, count FROM feedback_throttle_counts
+    WHERE day >= date('now', ?)
+    ORDER BY day DESC, reason
+'''
+
+
+def throttle_counts(days=14, path=None):
+    """Refused submissions per day and reason (a rate limit kind or a load shedding cause)."""
+    return fetch_all(THROTTLE_COUNTS_SQL, (f"-{days} days",), path=path)
+
+
+MANAGE_PAGE_SIZE = int(os.environ.get("FEEDBACK_MANAGE_PAGE_SIZE", "50"))
+FILTER_COLUMNS = ("status", "priority", "category")
+
+FILTER_OPTIONS_SQL = '''
+    SELECT value FROM feedback_rollups
+    WHERE dimension = ? AND count > 0
+    ORDER BY value
+'''
+
+GET_SUBMISSION_SQL = "SELECT * FROM feedback_submissions WHERE id = ?"
+
+# The Manage Submissions table leaves out the long text columns and email;
+# the response panel loads the full row of the one selected submission.
+MANAGE_COLUMNS = (
+    "id", "student_id", "student_name", "department", "course_code", "feedback_type",
+    "category", "priority", "status", "submission_date", "response_date",
+)
+
+
+@cached_read
+def filter_options(column, path=None):
+    """Distinct values of a filter column, read from the rollup index."""
+    return [row["value"] for row in fetch_all(FILTER_OPTIONS_SQL, (column,), path=path)]
+
+
+def has_submissions(path=None):
+    return bool(fetch_one("SELECT EXISTS (SELECT 1 FROM feedback_submissions)", path=path)[0])
+
+
+def filter_clause(filters):
+    """Turn ``{column: value}`` into a parameterized WHERE clause.
+
+    Columns outside FILTER_COLUMNS and values of None or "All" are ignored.
+    """
+    conditions, params = [], []
+    for column in FILTER_COLUMNS:
+        value = (filters or {}).get(column)
+        if value is not None and value != "All":
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    return conditions, params
+
+
+@cached_read
+def count_submissions(filters=None, path=None):
+    conditions, params = filter_clause(filters)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return fetch_one(f"SELECT COUNT(*) FROM feedback_submissions {where}", params, path=path)[0]
+
+
+def _page_query(filters, after, page_size):
+    conditions, params = filter_clause(filters)
+    if after is not None:
+        conditions.append("(submission_date, id) < (?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f'''
+        SELECT {", ".join(MANAGE_COLUMNS)} FROM feedback_submissions
+        {where}
+        ORDER BY submission_date DESC, id DESC
+        LIMIT ?
+    ''', params + [page_size + 1]
+
+
+@cached_read
+def submission_page(filters=None, after=None, page_size=MANAGE_PAGE_SIZE, path=None):
+    """Return one page of submissions, newest first, and the next-page cursor.
+
+    Pages are keyset-paginated on ``(submission_date, id)``: pass the cursor
+    returned for one page as ``after`` to fetch the next. The cursor is None
+    on the last page.
+    """
+    df = read_dataframe(*_page_query(filters, after, page_size), path=path)
+    if len(df) <= page_size:
+        return typed_frame(df), None
+    df = df.iloc[:page_size]
+    # The cursor keeps the stored timestamp text so the keyset comparison
+    # matches exactly.
+    last = df.iloc[-1]
+    return typed_frame(df), (last["submission_date"], int(last["id"]))
+
+
+@cached_read
+def list_submissions(filters=None, after=None, page_size=MANAGE_PAGE_SIZE, path=None):
+    """``submission_page`` as a list of dicts, for callers without pandas."""
+    rows = [dict(row) for row in fetch_all(*_page_query(filters, after, page_size), path=path)]
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, (rows[-1]["submission_date"], rows[-1]["id"])
+
+
+def get_submission(submission_id, path=None):
+    """The full row of one submission, from the archive if it has been moved there."""
+    row = fetch_one(GET_SUBMISSION_SQL, (submission_id,), path=path)
+    if row is None:
+        row = fetch_one(feedback_archive.GET_ARCHIVED_SQL, (submission_id,), path=path)
+    return row
+
+
+STUDENT_PAGE_SIZE = 10
+
+STUDENT_COLUMNS = (
+    "id", "course_code", "feedback_type", "category", "priority", "feedback_text",
+    "submission_date", "status", "admin_response", "response_date",
+)
+
+
+def _student_page_query(after, page_size):
+    # Each table's own index range is limited before the union, so a page
+    # never reads more than twice its size.
+    cursor = "AND (submission_date, id) < (:date, :id)" if after is not None else ""
+    branch = f'''
+        SELECT * FROM (
+            SELECT {", ".join(STUDENT_COLUMNS)} FROM {{table}}
+            WHERE {feedback_validation.STUDENT_ID_KEY_SQL} = :student
+            AND {feedback_validation.EMAIL_KEY_SQL} = :email {cursor}
+            ORDER BY submission_date DESC, id DESC
+            LIMIT :limit
+        )
+    '''
+    return f'''
+        {branch.format(table="feedback_submissions")}
+        UNION ALL
+        {branch.format(table=feedback_archive.ARCHIVE_TABLE)}
+        ORDER BY submission_date DESC, id DESC
+        LIMIT :limit
+    '''
+
+
+def _student_key(student_id, email, path=None):
+    return (os.path.abspath(path or DB_PATH),) + feedback_validation.student_key(student_id, email)
+
+
+def student_submissions(student_id, email, after=None, page_size=STUDENT_PAGE_SIZE, path=None):
+    """One page of the submissions made with this student ID and email, newest first, and the next-page cursor.
+
+    Both must match, ignoring case and surrounding whitespace on either
+    side. Archived submissions are included.
+    Results are kept in ``student_cache`` for a short while;
+    ``forget_student`` drops them after the student submits again.
+    """
+    key = _student_key(student_id, email, path) + (after, page_size)
+    hit, value = student_cache.get(key)
+    if feedback_profiler.ENABLED:
+        feedback_profiler.record_cache("student_submissions", hit)
+    if hit:
+        return value
+    params = {"student": key[1], "email": key[2], "limit": page_size + 1}
+    if after is not None:
+        params["date"], params["id"] = after
+    rows = [dict(row) for row in fetch_all(_student_page_query(after, page_size), params, path=path)]
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]["submission_date"], rows[-1]["id"])
+    student_cache.put(key, (rows, next_cursor))
+    return rows, next_cursor
+
+
+def forget_student(student_id, email, path=None):
+    student_cache.invalidate(_student_key(student_id, email, path))
+
+
+@cached_read
+def archived_count(path=None):
+    return fetch_one(f"SELECT COUNT(*) FROM {feedback_archive.ARCHIVE_TABLE}", path=path)[0]
+
+
+# Control characters that cannot appear in form input mark FTS matches, so
+# the snippet can be HTML-escaped before the <mark> tags go in.
+_MATCH_START, _MATCH_END = "\x02", "\x03"
+
+SEARCH_SQL = '''
+    SELECT s.id, s.student_id, s.department, s.category, s.priority, s.status,
+           s.submission_date,
+           snippet(feedback_fts, -1, ?, ?, '…', 24) AS snippet,
+           bm25(feedback_fts) AS score
+    FROM feedback_fts
+    JOIN feedback_submissions AS s ON s.id = feedback_fts.rowid
+    WHERE {where}
+    ORDER BY score, s.id DESC
+    LIMIT ? OFFSET ?
+'''
+
+
+def fts_query(text):
+    """Quote each word of free-text input so it is a valid FTS5 AND query."""
+    return " ".join(f'"{term}"' for term in re.findall(r"\w+", text))
+
+
+def _search_conditions(text, filters):
+    conditions, params = filter_clause(filters)
+    conditions = [f"s.{condition}" for condition in conditions]
+    return ["feedback_fts MATCH ?"] + conditions, [fts_query(text)] + params
+
+
+def highlight_snippet(snippet):
+    return (html.escape(snippet or "")
+            .replace(_MATCH_START, "<mark>")
+            .replace(_MATCH_END, "</mark>"))
+
+
+@cached_read
+def search_submissions(text, filters=None, after=None, page_size=MANAGE_PAGE_SIZE, path=None):
+    """BM25-ranked full-text search over feedback_text and admin_response.
+
+    Returns one page of hits with an HTML-safe highlighted ``snippet`` column,
+    combined with the Manage Submissions filters, and the offset of the next
+    page (None on the last page).
+    """
+    offset = after or 0
+    conditions, params = _search_conditions(text, filters)
+    df = read_dataframe(
+        SEARCH_SQL.format(where=" AND ".join(conditions)),
+        [_MATCH_START, _MATCH_END] + params + [page_size + 1, offset],
+        path=path,
+    )
+    df["snippet"] = df["snippet"].map(highlight_snippet)
+    if len(df) <= page_size:
+        return typed_frame(df), None
+    return typed_frame(df.iloc[:page_size]), offset + page_size
+
+
+@cached_read
+def count_search_results(text, filters=None, path=None):
+    conditions, params = _search_conditions(text, filters)
+    return fetch_one(f'''
+        SELECT COUNT(*) FROM feedback_fts
+        JOIN feedback_submissions AS s ON s.id = feedback_fts.rowid
+        WHERE {" AND ".join(conditions)}
+    ''', params, path=path)[0]
+
+
+BULK_CHUNK_SIZE = 500
+
+BULK_UPDATE_SQL = '''
+    UPDATE feedback_submissions
+    SET status = ?, admin_response = ?, response_date = CURRENT_TIMESTAMP,
+        version = version + 1, claimed_by = NULL, claim_expires = NULL
+    WHERE id IN ({ids}){conditions}
+    RETURNING id
+'''
+
+
+@cached_read
+def matching_submission_ids(filters=None, search_text=None, path=None):
+    """Ids of every submission matching the Manage filters (and search, if any), newest first."""
+    if fts_query(search_text or ""):
+        conditions, params = _search_conditions(search_text, filters)
+        sql = f'''
+            SELECT s.id FROM feedback_fts
+            JOIN feedback_submissions AS s ON s.id = feedback_fts.rowid
+            WHERE {" AND ".join(conditions)}
+            ORDER BY s.submission_date DESC, s.id DESC
+        '''
+    else:
+        conditions, params = filter_clause(filters)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT id FROM feedback_submissions {where} ORDER BY submission_date DESC, id DESC"
+    with connection(path) as conn:
+        return [row[0] for row in conn.execute(sql, params)]
+
+
+def bulk_update_submissions(submission_ids, status, admin_response, filters=None, path=None,
+                            chunk_size=BULK_CHUNK_SIZE, on_progress=None):
+    """Give many submissions one status and response in a single transaction.
+
+    Rows are updated with one set-based UPDATE per ``chunk_size`` ids, and
+    ``on_progress(done, total)`` is called after each chunk. If ``filters``
+    are given they are checked again inside the transaction, so a row that
+    stopped matching since the ids were collected is left alone. Returns
+    ``{id: "updated" | "no longer matches" | "not found"}``.
+    """
+    ids = list(dict.fromkeys(int(submission_id) for submission_id in submission_ids))
+    conditions, params = filter_clause(filters)
+    extra = "".join(f" AND {condition}" for condition in conditions)
+    results = {}
+    with transaction(path) as conn:
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            updated = {row[0] for row in conn.execute(
+                BULK_UPDATE_SQL.format(ids=", ".join("?" * len(chunk)), conditions=extra),
+                [status, admin_response, *chunk, *params],
+            )}
+            missed = [submission_id for submission_id in chunk if submission_id not in updated]
+            existing = set()
+            if missed and conditions:
+                existing = {row[0] for row in conn.execute(
+                    f"SELECT id FROM feedback_submissions WHERE id IN ({', '.join('?' * len(missed))})", missed)}
+            for submission_id in chunk:
+                if submission_id in updated:
+                    results[submission_id] = "updated"
+                else:
+                    results[submission_id] = "no longer matches" if submission_id in existing else "not found"
+            if on_progress:
+                on_progress(start + len(chunk), len(ids))
+    invalidate_cache(path)
+    return results
+
+
+DUPLICATE_WINDOW_DAYS = 30
+
+DUPLICATE_CLUSTERS_SQL = '''
+    SELECT d.cluster_id, COUNT(*) AS submissions, MIN(s.id) AS first_id,
+           MIN(s.submission_date) AS first_date, MAX(s.submission_date) AS last_date
+    FROM feedback_submissions AS s
+    JOIN feedback_duplicates AS d ON d.submission_id = s.id
+    WHERE {where}
+    GROUP BY d.cluster_id
+    HAVING COUNT(*) > 1
+    ORDER BY submissions DESC, last_date DESC
+    LIMIT ?
+'''
+
+# CROSS JOIN keeps feedback_duplicates as the outer loop, so members are
+# found through the cluster index rather than a date range scan.
+CLUSTER_MEMBERS_SQL = '''
+    SELECT s.id FROM feedback_duplicates AS d
+    CROSS JOIN feedback_submissions AS s ON s.id = d.submission_id
+    WHERE {where}
+    ORDER BY s.submission_date DESC, s.id DESC
+'''
+
+
+def _duplicate_conditions(filters, days):
+    conditions, params = filter_clause(filters)
+    conditions = [f"s.{condition}" for condition in conditions]
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+    return ["s.submission_date >= ?"] + conditions, [since.strftime("%Y-%m-%d %H:%M:00")] + params
+
+
+@cached_read
+def duplicate_clusters(filters=None, days=DUPLICATE_WINDOW_DAYS, limit=20, path=None):
+    """The largest groups of near-duplicate submissions from the last ``days`` days.
+
+    Only submissions matching the Manage filters are counted. Returns dicts
+    with cluster_id, submissions, first_date, last_date and sample_text (the
+    text of the group's oldest matching submission), biggest group first.
+    """
+    conditions, params = _duplicate_conditions(filters, days)
+    clusters = [dict(row) for row in fetch_all(
+        DUPLICATE_CLUSTERS_SQL.format(where=" AND ".join(conditions)), params + [limit], path=path)]
+    if clusters:
+        ids = [cluster["first_id"] for cluster in clusters]
+        texts = dict(fetch_all(
+            f"SELECT id, feedback_text FROM feedback_submissions WHERE id IN ({', '.join('?' * len(ids))})",
+            ids, path=path))
+        for cluster in clusters:
+            cluster["sample_text"] = texts.get(cluster.pop("first_id"), "")
+    return clusters
+
+
+@cached_read
+def cluster_submission_ids(cluster_id, filters=None, days=DUPLICATE_WINDOW_DAYS, path=None):
+    """Ids of the submissions ``duplicate_clusters`` counted for one group, newest first."""
+    conditions, params = _duplicate_conditions(filters, days)
+    with connection(path) as conn:
+        return [row[0] for row in conn.execute(
+            CLUSTER_MEMBERS_SQL.format(where=" AND ".join(["d.cluster_id = ?"] + conditions)),
+            [cluster_id] + params)]
+
+
+TRIAGE_COLUMNS = (
+    "id", "student_id", "department", "category", "priority", "feedback_type",
+    "submission_date", "claimed_by", "claim_expires", "version",
+)
+
+TRIAGE_QUEUE_SQL = f'''
+    SELECT {", ".join(TRIAGE_COLUMNS)} FROM feedback_submissions
+    WHERE status = 'Pending' AND (claim_expires IS NULL OR claim_expires <= ?)
+    ORDER BY {feedback_triage.RANK_SQL}, submission_date, id
+    LIMIT ?
+'''
+
+QUEUE_DEPTH_SQL = '''
+    SELECT COUNT(*) FROM feedback_submissions
+    WHERE status = 'Pending' AND (claim_expires IS NULL OR claim_expires <= ?)
+'''
+
+CLAIMED_SQL = f'''
+    SELECT {", ".join(TRIAGE_COLUMNS)} FROM feedback_submissions
+    WHERE claimed_by = ? AND claim_expires > ? AND status = 'Pending'
+    ORDER BY {feedback_triage.RANK_SQL}, submission_date, id
+'''
+
+
+def _now():
+    # Truncated to the minute so cached queue reads stay reusable within a minute.
+    return datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:00")
+
+
+def triage_queue(limit=20, path=None):
+    """The next ``limit`` unclaimed Pending submissions, Urgent first and oldest first."""
+    return _triage_queue(limit, _now(), path=path)
+
+
+@cached_read
+def _triage_queue(limit, now, path=None):
+    return [dict(row) for row in fetch_all(TRIAGE_QUEUE_SQL, (now, limit), path=path)]
+
+
+def queue_depth(path=None):
+    """Number of Pending submissions nobody holds a live claim on."""
+    return _queue_depth(_now(), path=path)
+
+
+@cached_read
+def _queue_depth(now, path=None):
+    return fetch_one(QUEUE_DEPTH_SQL, (now,), path=path)[0]
+
+
+def claimed_submissions(admin, path=None):
+    """Submissions ``admin`` holds a live claim on, in queue order."""
+    return _claimed_submissions(admin, _now(), path=path)
+
+
+@cached_read
+def _claimed_submissions(admin, now, path=None):
+    return [dict(row) for row in fetch_all(CLAIMED_SQL, (admin, now), path=path)]
+
+
+def claim_next(admin, count, lease_minutes=None, path=None):
+    """Atomically claim the next ``count`` queue items for ``admin``; returns their ids in queue order.
+
+    Each claimed item leaves the queue for ``lease_minutes`` (default
+    feedback_triage.LEASE_MINUTES) or until it is answered or released.
+    Two admins claiming at once always get disjoint items.
+    """
+    with transaction(path) as conn:
+        ids = [row[0] for row in conn.execute(
+            feedback_triage.CLAIM_SQL, (admin, feedback_triage.lease_modifier(lease_minutes), count))]
+        order = {}
+        if ids:
+            order = {row[0]: row[1:] for row in conn.execute(f'''
+                SELECT id, {feedback_triage.RANK_SQL}, submission_date FROM feedback_submissions
+                WHERE id IN ({", ".join("?" * len(ids))})
+            ''', ids)}
+    invalidate_cache(path)
+    return sorted(ids, key=lambda submission_id: (*order[submission_id], submission_id))
+
+
+def release_claims(admin, submission_ids=None, path=None):
+    """Return ``admin``'s claimed items (or just ``submission_ids``) to the queue; returns how many."""
+    sql = "UPDATE feedback_submissions SET claimed_by = NULL, claim_expires = NULL WHERE claimed_by = ?"
+    params = [admin]
+    if submission_ids is not None:
+        ids = [int(submission_id) for submission_id in submission_ids]
+        sql += f" AND id IN ({', '.join('?' * len(ids))})"
+        params.extend(ids)
+    with transaction(path) as conn:
+        released = conn.execute(sql, params).rowcount
+    invalidate_cache(path)
+    return released
@@ -0,0 +1,384 @@
+"""Near-duplicate detection over submission text with MinHash and LSH.
+
+Every submission is reduced to a MinHash signature of its word bigrams. The
+first submission of a group becomes the cluster's representative: its
+hashed bigrams are stored in ``feedback_duplicate_clusters`` and its
+signature is split into ``BANDS`` bands, each hashed to a bucket in
+``feedback_lsh_buckets``. A new submission only probes its own ``BANDS``
+buckets, computes the exact Jaccard similarity of its bigrams with the
+representatives found there and joins the closest one that reaches
+``THRESHOLD`` (the biggest cluster on ties); otherwise it starts a cluster
+of its own. The lookup cost depends on bucket sizes, not on the table size, and
+only representatives are indexed, so bursts of near-identical complaints
+add one membership row each to ``feedback_duplicates``.
+
+Assignment happens in Python inside the transaction that inserted the rows
+(``index_new_submissions``); a trigger drops the membership of deleted rows.
+Submissions that predate the index (up to ``backfill_to`` in
+``feedback_dedup_backfill``) are left to ``backfill``, which clusters them
+``BACKFILL_BATCH_SIZE`` at a time in short transactions so upgrading a large
+database does not hold the write lock for minutes.
+
+    python feedback_dedup.py backfill  # cluster submissions older than the index
+    python feedback_dedup.py rebuild   # recluster everything from scratch
+    python feedback_dedup.py check     # report unindexed rows and size drift
+"""
+
+import argparse
+import array
+import collections
+import functools
+import json
+import os
+import random
+import re
+import sys
+import zlib
+
+NUM_PERM = 72
+BANDS = 24
+ROWS_PER_BAND = NUM_PERM // BANDS
+# Jaccard similarity of word bigrams needed to join a cluster.
+# With 24 bands of 3 rows a pair at 0.5 shares a bucket ~96% of the time.
+THRESHOLD = 0.5
+SEED = 20240917
+
+_PRIME = (1 << 61) - 1
+_MASK = 0xFFFFFFFF
+_rng = random.Random(SEED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+BACKFILL_BATCH_SIZE = int(os.environ.get("FEEDBACK_DEDUP_BACKFILL_BATCH", "2000"))
+
+NEXT_ROWS_SQL = '''
+    SELECT id, feedback_text FROM feedback_submissions
+    WHERE id > ? ORDER BY id LIMIT ?
+'''
+
+BACKFILL_ROWS_SQL = '''
+    SELECT id, feedback_text FROM feedback_submissions
+    WHERE id > ? AND id <= ? ORDER BY id LIMIT ?
+'''
+
+# Incremental indexing starts above both the newest member and the rows
+# left to the backfill.
+LAST_INDEXED_SQL = '''
+    SELECT MAX(COALESCE((SELECT MAX(submission_id) FROM feedback_duplicates), 0),
+               COALESCE((SELECT backfill_to FROM feedback_dedup_backfill WHERE id = 1), 0))
+'''
+
+# Representatives sharing the most bands are the likeliest matches, so only
+# the top MAX_CANDIDATES are compared bigram by bigram.
+MAX_CANDIDATES = 16
+
+# A batch looks up the clusters in all of its buckets at once (the distinct
+# keys are passed as a JSON array) and assigns its rows against them in
+# memory. CROSS JOIN keeps the keys as the outer loop.
+BUCKET_HITS_SQL = '''
+    SELECT b.bucket, b.cluster_id
+    FROM json_each(?) AS k CROSS JOIN feedback_lsh_buckets AS b ON b.bucket = k.value
+'''
+
+CLUSTERS_SQL = '''
+    SELECT c.cluster_id, c.size, c.shingles
+    FROM json_each(?) AS k CROSS JOIN feedback_duplicate_clusters AS c ON c.cluster_id = k.value
+'''
+
+
+def shingles(text):
+    """Word bigrams of the lower-cased text (the single word for one-word texts)."""
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) < 2:
+        return set(words)
+    return {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+
+def hashed_shingles(text):
+    """``shingles`` of the text as a set of 32-bit hashes."""
+    return {zlib.crc32(shingle.encode()) for shingle in shingles(text)}
+
+
+@functools.lru_cache(maxsize=16384)
+def _permuted(h):
+    # Common bigrams recur across submissions, so their NUM_PERM hash values
+    # are kept rather than recomputed.
+    return array.array("I", [(a * h + b) % _PRIME & _MASK for a, b in _PERMUTATIONS])
+
+
+def signature(hashes):
+    """MinHash signature (NUM_PERM 32-bit values) of a set of shingle hashes; empty for an empty set."""
+    if not hashes:
+        return []
+    return list(map(min, zip(*map(_permuted, hashes))))
+
+
+def similarity(first, second):
+    """Jaccard similarity of two sets of shingle hashes."""
+    return len(first & second) / len(first | second) if first or second else 0.0
+
+
+def buckets(sig):
+    """One LSH bucket key per band; the band number is kept in the high bits."""
+    data = array.array("I", sig).tobytes()
+    width = 4 * ROWS_PER_BAND
+    return [(band << 32) | zlib.crc32(data[band * width:(band + 1) * width]) for band in range(BANDS)]
+
+
+def create_duplicate_index(conn):
+    """Create the cluster tables and the delete trigger (used by a migration)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_duplicate_clusters (
+            cluster_id INTEGER PRIMARY KEY,
+            shingles BLOB NOT NULL,
+            size INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_lsh_buckets (
+            bucket INTEGER NOT NULL,
+            cluster_id INTEGER NOT NULL,
+            PRIMARY KEY (bucket, cluster_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_duplicates (
+            submission_id INTEGER PRIMARY KEY,
+            cluster_id INTEGER NOT NULL,
+            similarity REAL NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_duplicates_cluster
+        ON feedback_duplicates (cluster_id)
+    ''')
+    # A deleted representative keeps its bigrams and buckets, so later
+    # duplicates still land in the same cluster.
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_duplicates_delete
+        AFTER DELETE ON feedback_submissions
+        BEGIN
+            UPDATE feedback_duplicate_clusters SET size = size - 1
+            WHERE cluster_id = (SELECT cluster_id FROM feedback_duplicates WHERE submission_id = OLD.id);
+            DELETE FROM feedback_duplicates WHERE submission_id = OLD.id;
+        END
+    ''')
+
+
+def create_backfill_state(conn, backfill_to=0):
+    """Record that submissions up to ``backfill_to`` still await ``backfill`` (used by migrations)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_dedup_backfill (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            done_to INTEGER NOT NULL,
+            backfill_to INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO feedback_dedup_backfill (id, done_to, backfill_to) VALUES (1, 0, ?)",
+                 (backfill_to,))
+
+
+def _nearest(hashes, keys, members, clusters):
+    """``(cluster_id, similarity)`` of the closest representative at or above THRESHOLD, or ``(None, 1.0)``.
+
+    ``members`` maps bucket keys to cluster ids and ``clusters`` cluster ids
+    to ``[size, bigrams]``. Ties go to the biggest, then the oldest cluster,
+    so a group of equally similar submissions keeps joining the same one.
+    """
+    shared = collections.Counter(cluster_id for key in keys for cluster_id in members.get(key, ()))
+    best = (THRESHOLD, 0, 0)
+    for cluster_id in sorted(shared, key=lambda c: (-shared[c], -clusters[c][0], c))[:MAX_CANDIDATES]:
+        size, stored = clusters[cluster_id]
+        if not isinstance(stored, set):
+            stored = clusters[cluster_id][1] = set(array.array("I", stored))
+        best = max(best, (similarity(hashes, stored), size, -cluster_id))
+    score, _, cluster_id = best
+    return (-cluster_id, score) if cluster_id else (None, 1.0)
+
+
+def _bucket_members(conn, keys):
+    """``(members, clusters)`` for ``_nearest``, covering the stored clusters in any of ``keys``."""
+    found = conn.execute(BUCKET_HITS_SQL, (json.dumps(sorted(keys)),)).fetchall()
+    clusters = {
+        cluster_id: [size, stored]
+        for cluster_id, size, stored in conn.execute(
+            CLUSTERS_SQL, (json.dumps(sorted({cluster_id for _, cluster_id in found})),))
+    }
+    members = {}
+    for key, cluster_id in found:
+        if cluster_id in clusters:
+            members.setdefault(key, []).append(cluster_id)
+    return members, clusters
+
+
+def index_submissions(conn, rows):
+    """Assign each ``(id, feedback_text)`` of ``rows`` to a cluster, in order.
+
+    Call inside the write transaction that inserted the rows. The stored
+    clusters in the rows' buckets are read once for the whole batch, and
+    clusters started by earlier rows of the batch are tracked alongside
+    them. Returns the number of rows that joined an existing cluster.
+    """
+    sketches = []
+    for submission_id, text in rows:
+        hashes = hashed_shingles(text)
+        sketches.append((submission_id, hashes, buckets(signature(hashes)) if hashes else []))
+    members, clusters = _bucket_members(conn, {key for _, _, keys in sketches for key in keys})
+
+    started, grown, memberships = [], collections.Counter(), []
+    for submission_id, hashes, keys in sketches:
+        cluster_id, score = None, 1.0
+        if hashes:
+            cluster_id, score = _nearest(hashes, keys, members, clusters)
+            if cluster_id is None:
+                clusters[submission_id] = [1, hashes]
+                started.append((submission_id, keys))
+                for key in keys:
+                    members.setdefault(key, []).append(submission_id)
+            else:
+                clusters[cluster_id][0] += 1
+                grown[cluster_id] += 1
+        # Texts without words are clusters of one that nothing can join.
+        memberships.append((submission_id, submission_id if cluster_id is None else cluster_id, score))
+
+    conn.executemany(
+        "INSERT INTO feedback_duplicate_clusters (cluster_id, shingles, size) VALUES (?, ?, ?)",
+        [(cluster_id, array.array("I", sorted(clusters[cluster_id][1])).tobytes(), clusters[cluster_id][0])
+         for cluster_id, _ in started],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO feedback_lsh_buckets (bucket, cluster_id) VALUES (?, ?)",
+        [(key, cluster_id) for cluster_id, keys in started for key in keys],
+    )
+    new = {cluster_id for cluster_id, _ in started}
+    conn.executemany(
+        "UPDATE feedback_duplicate_clusters SET size = size + ? WHERE cluster_id = ?",
+        [(count, cluster_id) for cluster_id, count in grown.items() if cluster_id not in new],
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO feedback_duplicates (submission_id, cluster_id, similarity) VALUES (?, ?, ?)",
+        memberships,
+    )
+    return sum(grown.values())
+
+
+def index_new_submissions(conn, batch_size=5000):
+    """Cluster every submission newer than the last indexed one; returns how many."""
+    last = conn.execute(LAST_INDEXED_SQL).fetchone()[0]
+    indexed = 0
+    while True:
+        rows = conn.execute(NEXT_ROWS_SQL, (last, batch_size)).fetchall()
+        if not rows:
+            return indexed
+        index_submissions(conn, rows)
+        indexed += len(rows)
+        last = rows[-1][0]
+
+
+def rebuild_duplicate_index(conn):
+    """Recluster every submission in id order.
+
+    Call inside a write transaction so readers never see a half-built index.
+    """
+    conn.execute("DELETE FROM feedback_duplicates")
+    conn.execute("DELETE FROM feedback_lsh_buckets")
+    conn.execute("DELETE FROM feedback_duplicate_clusters")
+    conn.execute("UPDATE feedback_dedup_backfill SET done_to = 0, backfill_to = 0")
+    return index_new_submissions(conn)
+
+
+def backfill_pending(conn):
+    """How many submissions still await ``backfill``."""
+    return conn.execute('''
+        SELECT COUNT(*) FROM feedback_submissions, feedback_dedup_backfill AS b
+        WHERE b.id = 1 AND feedback_submissions.id > b.done_to AND feedback_submissions.id <= b.backfill_to
+    ''').fetchone()[0]
+
+
+def backfill(path=None, batch_size=BACKFILL_BATCH_SIZE, on_progress=None):
+    """Cluster the submissions that predate the index, one short write transaction per batch.
+
+    Later submissions are indexed meanwhile by their own inserts, so an
+    older row may join a cluster a newer one started; ``rebuild`` reclusters
+    strictly in id order. Returns the number of rows clustered.
+    """
+    import feedback_db
+
+    indexed = 0
+    while True:
+        with feedback_db.transaction(path) as conn:
+            done_to, backfill_to = conn.execute(
+                "SELECT done_to, backfill_to FROM feedback_dedup_backfill WHERE id = 1").fetchone()
+            rows = conn.execute(BACKFILL_ROWS_SQL, (done_to, backfill_to, batch_size)).fetchall()
+            if rows:
+                index_submissions(conn, rows)
+                conn.execute("UPDATE feedback_dedup_backfill SET done_to = ?", (rows[-1][0],))
+            else:
+                conn.execute("UPDATE feedback_dedup_backfill SET done_to = 0, backfill_to = 0")
+        if not rows:
+            return indexed
+        indexed += len(rows)
+        if on_progress:
+            on_progress(indexed)
+
+
+def check_duplicate_index(conn):
+    """Return ``(problem, count)`` for every inconsistency found."""
+    checks = {
+        "submissions without a cluster": '''
+            SELECT COUNT(*) FROM feedback_submissions AS s, feedback_dedup_backfill AS b
+            WHERE b.id = 1 AND NOT (s.id > b.done_to AND s.id <= b.backfill_to)
+            AND NOT EXISTS (SELECT 1 FROM feedback_duplicates AS d WHERE d.submission_id = s.id)
+        ''',
+        "memberships of deleted submissions": '''
+            SELECT COUNT(*) FROM feedback_duplicates AS d
+            WHERE NOT EXISTS (SELECT 1 FROM feedback_submissions AS s WHERE s.id = d.submission_id)
+        ''',
+        "clusters with a wrong size": '''
+            SELECT COUNT(*) FROM feedback_duplicate_clusters AS c
+            WHERE c.size != (SELECT COUNT(*) FROM feedback_duplicates AS d WHERE d.cluster_id = c.cluster_id)
+        ''',
+    }
+    problems = []
+    for problem, sql in checks.items():
+        count = conn.execute(sql).fetchone()[0]
+        if count:
+            problems.append((problem, count))
+    return problems
+
+
+def main(argv=None):
+    import feedback_db
+
+    parser = argparse.ArgumentParser(description="Rebuild or verify the near-duplicate index.")
+    parser.add_argument("command", choices=["backfill", "rebuild", "check"])
+    parser.add_argument("--db", default=feedback_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    feedback_db.init_database(args.db)
+    if args.command == "backfill":
+        indexed = backfill(args.db, args.batch_size,
+                           on_progress=lambda done: print(f"\r{done:,} clustered", end="", file=sys.stderr))
+        feedback_db.invalidate_cache(args.db)
+        print(f"\nClustered {indexed:,} older submissions.")
+        return 0
+    if args.command == "rebuild":
+        with feedback_db.transaction(args.db) as conn:
+            indexed = rebuild_duplicate_index(conn)
+        feedback_db.invalidate_cache(args.db)
+        print(f"Near-duplicate index rebuilt over {indexed:,} submissions.")
+        return 0
+
+    with feedback_db.connection(args.db) as conn:
+        problems = check_duplicate_index(conn)
+        pending = backfill_pending(conn)
+    if pending:
+        print(f"{pending:,} older submissions await `python feedback_dedup.py backfill`.")
+    for problem, count in problems:
+        print(f"{count:,} {problem}")
+    print("Near-duplicate index consistent." if not problems else f"{len(problems)} problems found.")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,494 @@
+"""Precomputed sentiment, keywords and topics for every submission.
+
+The text of each submission is analysed once and the results are kept in
+``feedback_text_features``, which the Analytics tab charts directly:
+
+- sentiment: the mean polarity of the words of ``SENTIMENT_LEXICON`` found
+  in the text (-1 to 1; negation is not handled) and a Negative / Neutral /
+  Positive label,
+- keywords: the ``KEYWORDS`` terms with the highest TF-IDF weight,
+- topic: the nearest of ``TOPICS`` mini-batch k-means centroids over the
+  TF-IDF vectors, each labelled with its top terms in ``feedback_topics``.
+
+``fit`` learns the TF-IDF vocabulary and the topic centroids from a sample of
+up to ``FIT_SAMPLE`` submissions and stores them in ``feedback_text_model``;
+refitting clears the stored results. ``backfill`` then analyses every
+submission (hot and archived) without results, in id order, in batches of
+``BATCH_SIZE`` spread over a process pool. A background thread in each app
+and API process (``start_background``, started with the submission writer
+and by the Analytics tab) runs ``enrich_new`` every ``POLL_SECONDS`` for the
+submissions newer than the model's ``backfill_to`` (the newest one when it
+was fitted), so only the few added since are analysed in-process, no page
+render waits for scikit-learn and a refit leaves the history to
+``backfill``. ``FEEDBACK_TEXT_BACKGROUND=0`` turns the thread off.
+
+The analysis needs scikit-learn (and numpy); everything else, including the
+charts over stored results, works without it.
+
+    python feedback_enrich.py fit --topics 8
+    python feedback_enrich.py backfill --workers 4
+    python feedback_enrich.py status
+"""
+
+import argparse
+import concurrent.futures
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+
+import feedback_archive
+
+TOPICS = int(os.environ.get("FEEDBACK_TEXT_TOPICS", "8"))
+FIT_SAMPLE = int(os.environ.get("FEEDBACK_TEXT_FIT_SAMPLE", "50000"))
+BATCH_SIZE = int(os.environ.get("FEEDBACK_TEXT_BATCH_SIZE", "5000"))
+BACKGROUND = os.environ.get("FEEDBACK_TEXT_BACKGROUND", "1") != "0"
+POLL_SECONDS = float(os.environ.get("FEEDBACK_TEXT_POLL_SECONDS", "10"))
+MAX_TERMS = 20000
+KEYWORDS = 5
+TOPIC_TERMS = 4
+SEED = 20240917
+
+# Polarity of common words in student feedback; a small fixed lexicon keeps
+# sentiment one sparse matrix product and needs no corpus downloads.
+SENTIMENT_LEXICON = {
+    "excellent": 1.0, "amazing": 1.0, "outstanding": 1.0, "fantastic": 1.0, "love": 0.9, "great": 0.8,
+    "engaging": 0.7, "helpful": 0.7, "good": 0.6, "clear": 0.5, "useful": 0.6, "interesting": 0.5,
+    "friendly": 0.6, "supportive": 0.7, "improved": 0.5, "enjoy": 0.6, "enjoyed": 0.6, "thank": 0.5,
+    "thanks": 0.5, "appreciate": 0.6, "organized": 0.5, "responsive": 0.5, "comfortable": 0.5, "fast": 0.4,
+    "terrible": -1.0, "awful": -1.0, "horrible": -1.0, "worst": -1.0, "unacceptable": -0.9, "hate": -0.9,
+    "poor": -0.7, "bad": -0.7, "broken": -0.7, "dirty": -0.6, "slow": -0.5, "late": -0.4, "unfair": -0.7,
+    "confusing": -0.6, "difficult": -0.4, "noisy": -0.5, "crowded": -0.4, "missing": -0.5, "rude": -0.8,
+    "unhelpful": -0.7, "frustrating": -0.8, "disappointed": -0.7, "problem": -0.5, "problems": -0.5,
+    "issue": -0.4, "issues": -0.4, "complaint": -0.5, "fails": -0.6, "failed": -0.6, "not": -0.2,
+    "never": -0.3, "outdated": -0.5, "expensive": -0.4, "unsafe": -0.8, "leaking": -0.6, "hot": -0.2,
+}
+NEGATIVE_BELOW = -0.1
+POSITIVE_ABOVE = 0.1
+
+# Each branch is limited before the union, so a batch never sorts more than
+# twice its size however far the backfill has got.
+NEXT_ROWS_SQL = f'''
+    SELECT * FROM (
+        SELECT id, category, feedback_text FROM feedback_submissions WHERE id > :after ORDER BY id LIMIT :limit
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT id, category, feedback_text FROM {feedback_archive.ARCHIVE_TABLE}
+        WHERE id > :after ORDER BY id LIMIT :limit
+    )
+    ORDER BY id LIMIT :limit
+'''
+
+# Every stride-th id, spread over the whole history.
+SAMPLE_SQL = f'''
+    SELECT feedback_text FROM {feedback_archive.ALL_SUBMISSIONS}
+    WHERE id % :stride = 0 LIMIT :limit
+'''
+
+# Rows deleted while their batch was being analysed are skipped.
+STORE_FEATURES_SQL = f'''
+    INSERT OR REPLACE INTO feedback_text_features (id, category, sentiment, sentiment_label, topic, keywords)
+    SELECT ?, ?, ?, ?, ?, ?
+    WHERE EXISTS (SELECT 1 FROM {feedback_archive.ALL_SUBMISSIONS} WHERE id = ?)
+'''
+
+# Where enrich_new resumes; no row before ``fit``. Submissions up to
+# backfill_to are left to ``backfill``.
+ENRICH_AFTER_SQL = '''
+    SELECT MAX(COALESCE((SELECT MAX(id) FROM feedback_text_features), 0), backfill_to)
+    FROM feedback_text_model WHERE id = 1
+'''
+
+# NEXT_ROWS_SQL less the submissions that already have results.
+MISSING_ROWS_SQL = f'''
+    SELECT * FROM (
+        SELECT id, category, feedback_text FROM feedback_submissions AS s
+        WHERE id > :after AND NOT EXISTS (SELECT 1 FROM feedback_text_features AS f WHERE f.id = s.id)
+        ORDER BY id LIMIT :limit
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT id, category, feedback_text FROM {feedback_archive.ARCHIVE_TABLE} AS a
+        WHERE id > :after AND NOT EXISTS (SELECT 1 FROM feedback_text_features AS f WHERE f.id = a.id)
+        ORDER BY id LIMIT :limit
+    )
+    ORDER BY id LIMIT :limit
+'''
+
+MODEL_SQL = "SELECT version, model FROM feedback_text_model WHERE id = 1"
+
+
+def create_text_features(conn):
+    """Create the results, topic and model tables (used by a migration)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_text_features (
+            id INTEGER PRIMARY KEY,
+            category TEXT NOT NULL,
+            sentiment REAL NOT NULL,
+            sentiment_label TEXT NOT NULL,
+            topic INTEGER,
+            keywords TEXT NOT NULL
+        )
+    ''')
+    # Covers the sentiment-by-category chart and the per-topic totals.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_text_category
+        ON feedback_text_features (category, sentiment_label, sentiment)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_text_topic
+        ON feedback_text_features (topic, sentiment)
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_topics (
+            topic INTEGER PRIMARY KEY,
+            terms TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_text_model (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            fitted_at TIMESTAMP NOT NULL,
+            sample_rows INTEGER NOT NULL,
+            model BLOB NOT NULL
+        )
+    ''')
+    # Archived submissions keep their results; Analytics counts them too.
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_text_delete
+        AFTER DELETE ON feedback_submissions
+        {feedback_archive.NOT_ARCHIVED}
+        BEGIN
+            DELETE FROM feedback_text_features WHERE id = OLD.id;
+        END
+    ''')
+
+
+class TextModel:
+    """The fitted TF-IDF vectorizer, topic centroids and sentiment lexicon."""
+
+    def __init__(self, vectorizer, topics):
+        self.vectorizer = vectorizer
+        self.topics = topics
+        self._lexicon = None
+        self._terms = None
+
+    def dumps(self):
+        """Pickle only the fitted scikit-learn objects.
+
+        Pickling the TextModel itself would record it as ``__main__.TextModel``
+        when fitted from this script, which the app and API cannot load.
+        """
+        return pickle.dumps({"vectorizer": self.vectorizer, "topics": self.topics}, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def loads(cls, blob):
+        return cls(**pickle.loads(blob))
+
+    @classmethod
+    def fit(cls, texts, n_topics=TOPICS):
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        import numpy as np
+
+        if not texts:
+            raise ValueError("There are no submissions to fit on.")
+        # Terms seen only once are noise in a large sample but all there is in a small one.
+        vectorizer = TfidfVectorizer(stop_words="english", max_features=MAX_TERMS,
+                                     min_df=2 if len(texts) >= 1000 else 1, sublinear_tf=True, dtype=np.float32)
+        vectors = vectorizer.fit_transform(texts)
+        topics = MiniBatchKMeans(n_clusters=min(n_topics, vectors.shape[0]), batch_size=2048,
+                                 n_init=3, random_state=SEED)
+        topics.fit(vectors)
+        return cls(vectorizer, topics)
+
+    def topic_terms(self):
+        """``{topic: "term, term, ..."}`` from the heaviest terms of each centroid."""
+        terms = self.vectorizer.get_feature_names_out()
+        return {topic: ", ".join(terms[i] for i in centroid.argsort()[::-1][:TOPIC_TERMS])
+                for topic, centroid in enumerate(self.topics.cluster_centers_)}
+
+    def _sentiment(self, texts):
+        import numpy as np
+
+        if self._lexicon is None:
+            from sklearn.feature_extraction.text import CountVectorizer
+
+            self._lexicon = (CountVectorizer(vocabulary=list(SENTIMENT_LEXICON)),
+                             np.array(list(SENTIMENT_LEXICON.values()), dtype=np.float32))
+        counter, weights = self._lexicon
+        hits = counter.transform(texts)
+        found = np.asarray(hits.sum(axis=1)).ravel()
+        return (hits @ weights) / np.maximum(found, 1)
+
+    def analyse(self, rows):
+        """``(id, category, sentiment, label, topic, keywords)`` for each ``(id, category, text)``."""
+        texts = [text or "" for _, _, text in rows]
+        vectors = self.vectorizer.transform(texts)
+        topics = self.topics.predict(vectors)
+        sentiment = self._sentiment(texts)
+        if self._terms is None:
+            self._terms = self.vectorizer.get_feature_names_out()
+        terms = self._terms
+        results = []
+        for n, (submission_id, category, _) in enumerate(rows):
+            start, end = vectors.indptr[n], vectors.indptr[n + 1]
+            heaviest = vectors.indices[start:end][vectors.data[start:end].argsort()[::-1][:KEYWORDS]]
+            score = float(sentiment[n])
+            label = "Negative" if score < NEGATIVE_BELOW else "Positive" if score > POSITIVE_ABOVE else "Neutral"
+            # Texts without a known term have no topic.
+            topic = int(topics[n]) if end > start else None
+            results.append((submission_id, category, round(score, 3), label, topic,
+                            ", ".join(terms[i] for i in heaviest)))
+        return results
+
+
+_models = {}
+
+
+def load_model(conn):
+    """The stored model (cached per process by version), or None before ``fit``."""
+    row = conn.execute(MODEL_SQL).fetchone()
+    if row is None:
+        return None
+    version, blob = row
+    if version not in _models:
+        _models.clear()
+        _models[version] = TextModel.loads(blob)
+    return _models[version]
+
+
+def store_results(conn, results):
+    conn.executemany(STORE_FEATURES_SQL, [result + (result[0],) for result in results])
+
+
+def fit(path=None, n_topics=TOPICS, sample=FIT_SAMPLE):
+    """Fit and store a new model; stored results are cleared. Returns the sample size.
+
+    The existing submissions are left to ``backfill``; the background thread
+    only analyses newer ones.
+    """
+    import feedback_db
+
+    total = feedback_db.fetch_one(f"SELECT COUNT(*) FROM {feedback_archive.ALL_SUBMISSIONS}", path=path)[0]
+    stride = max(1, total // sample)
+    texts = [row[0] for row in feedback_db.fetch_all(SAMPLE_SQL, {"stride": stride, "limit": sample}, path=path)]
+    model = TextModel.fit(texts, n_topics)
+    blob = model.dumps()
+    with feedback_db.transaction(path) as conn:
+        version = conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM feedback_text_model").fetchone()[0]
+        conn.execute("DELETE FROM feedback_text_features")
+        conn.execute("DELETE FROM feedback_topics")
+        conn.executemany("INSERT INTO feedback_topics (topic, terms) VALUES (?, ?)", model.topic_terms().items())
+        conn.execute(f'''
+            INSERT OR REPLACE INTO feedback_text_model (id, version, fitted_at, sample_rows, model, backfill_to)
+            VALUES (1, ?, CURRENT_TIMESTAMP, ?, ?,
+                    (SELECT COALESCE(MAX(id), 0) FROM {feedback_archive.ALL_SUBMISSIONS}))
+        ''', (version, len(texts), blob))
+    feedback_db.invalidate_cache(path)
+    return len(texts)
+
+
+def enrich_new(path=None, limit=BATCH_SIZE):
+    """Analyse up to ``limit`` submissions added since the last run; returns how many.
+
+    Only submissions newer than the model are taken. Does nothing (and
+    imports nothing) before ``fit`` has run or when all of those are
+    already analysed.
+    """
+    import feedback_db
+
+    with feedback_db.connection(path) as conn:
+        after = conn.execute(ENRICH_AFTER_SQL).fetchone()
+        if after is None:
+            return 0
+        rows = conn.execute(NEXT_ROWS_SQL, {"after": after[0], "limit": limit}).fetchall()
+        if not rows:
+            return 0
+        model = load_model(conn)
+    results = model.analyse(rows)
+    with feedback_db.transaction(path) as conn:
+        store_results(conn, results)
+    feedback_db.invalidate_cache(path)
+    return len(results)
+
+
+class Enricher:
+    """Analyses the new submissions of one database from a background thread."""
+
+    def __init__(self, path, poll_seconds=POLL_SECONDS):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.analysed = 0
+        self.last_run_ms = 0.0
+        self.error = None
+
+    def run_once(self):
+        """Analyse everything added since the last run; returns how many."""
+        started = time.perf_counter()
+        done = 0
+        while True:
+            analysed = enrich_new(self.path)
+            done += analysed
+            if analysed < BATCH_SIZE:
+                break
+        if done:
+            self.analysed += done
+            self.last_run_ms = (time.perf_counter() - started) * 1000
+        return done
+
+    def _ensure_started(self):
+        if self.error is None and (self._thread is None or not self._thread.is_alive()):
+            with self._thread_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="feedback-enrich", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.run_once()
+            except ImportError as e:
+                # Nothing changes without scikit-learn; stop until restarted.
+                self.error = str(e)
+                return
+            except sqlite3.Error:
+                # Retried on the next poll.
+                pass
+            time.sleep(self.poll_seconds)
+
+
+_enrichers = {}
+_enrichers_lock = threading.Lock()
+
+
+def get_enricher(path=None):
+    """Return this process's enricher for ``path``, creating it on first use."""
+    import feedback_db
+
+    key = (os.getpid(), os.path.abspath(path or feedback_db.DB_PATH))
+    enricher = _enrichers.get(key)
+    if enricher is None:
+        with _enrichers_lock:
+            enricher = _enrichers.get(key)
+            if enricher is None:
+                enricher = _enrichers[key] = Enricher(key[1])
+    return enricher
+
+
+def start_background(path=None):
+    """Start the enrichment thread for ``path`` in this process (unless turned off); returns its Enricher."""
+    enricher = get_enricher(path)
+    if BACKGROUND:
+        enricher._ensure_started()
+    return enricher
+
+
+_worker_model = None
+
+
+def _init_worker(blob):
+    global _worker_model
+    _worker_model = TextModel.loads(blob)
+
+
+def _analyse_batch(rows):
+    return _worker_model.analyse(rows)
+
+
+def backfill(path=None, workers=None, batch_size=BATCH_SIZE, on_progress=None):
+    """Analyse every submission without stored results, fitting a model first if there is none.
+
+    Batches are read in id order and analysed by ``workers`` processes (all
+    CPUs by default), with at most two batches per worker in flight; the
+    results are written in one short transaction per batch.
+    ``on_progress(done, seconds)`` is called after each batch. Returns
+    ``{"rows", "seconds"}``.
+    """
+    import feedback_db
+
+    started = time.perf_counter()
+    with feedback_db.connection(path) as conn:
+        stored = conn.execute(MODEL_SQL).fetchone()
+    if stored is None:
+        fit(path)
+        with feedback_db.connection(path) as conn:
+            stored = conn.execute(MODEL_SQL).fetchone()
+    after = 0
+    done = 0
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(stored[1],)) as pool:
+        pending = []
+        while True:
+            while len(pending) < 2 * workers:
+                rows = feedback_db.fetch_all(MISSING_ROWS_SQL, {"after": after, "limit": batch_size}, path=path)
+                if not rows:
+                    break
+                after = rows[-1][0]
+                pending.append(pool.submit(_analyse_batch, [tuple(row) for row in rows]))
+            if not pending:
+                break
+            results = pending.pop(0).result()
+            with feedback_db.transaction(path) as conn:
+                store_results(conn, results)
+            done += len(results)
+            if on_progress:
+                on_progress(done, time.perf_counter() - started)
+    if done:
+        feedback_db.invalidate_cache(path)
+    return {"rows": done, "seconds": time.perf_counter() - started}
+
+
+def main(argv=None):
+    import feedback_db
+
+    parser = argparse.ArgumentParser(description="Fit, backfill or inspect the text analytics.")
+    parser.add_argument("command", choices=["fit", "backfill", "status"])
+    parser.add_argument("--db", default=feedback_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--topics", type=int, default=TOPICS)
+    parser.add_argument("--sample", type=int, default=FIT_SAMPLE, help="submissions to fit on (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="backfill processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    feedback_db.init_database(args.db)
+    try:
+        if args.command == "fit":
+            sampled = fit(args.db, args.topics, args.sample)
+            print(f"Fitted {args.topics} topics on {sampled:,} submissions; run backfill to analyse them all.")
+            return 0
+        if args.command == "backfill":
+            stats = backfill(args.db, args.workers, args.batch_size,
+                             on_progress=lambda done, seconds: print(f"\r{done:,} analysed ({seconds:.0f}s)",
+                                                                     end="", file=sys.stderr))
+            print(f"\nAnalysed {stats['rows']:,} submissions in {stats['seconds']:.1f}s.")
+            return 0
+    except ImportError as e:
+        print(f"Text analytics need scikit-learn and numpy ({e}).", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    with feedback_db.connection(args.db) as conn:
+        analysed = conn.execute("SELECT COUNT(*) FROM feedback_text_features").fetchone()[0]
+        total = conn.execute(f"SELECT COUNT(*) FROM {feedback_archive.ALL_SUBMISSIONS}").fetchone()[0]
+        model = conn.execute("SELECT version, fitted_at, sample_rows FROM feedback_text_model").fetchone()
+        topics = conn.execute("SELECT topic, terms FROM feedback_topics ORDER BY topic").fetchall()
+    if model is None:
+        print("No model fitted yet; run fit or backfill.")
+        return 1
+    print(f"Model v{model[0]} fitted {model[1]} on {model[2]:,} submissions; {analysed:,} of {total:,} analysed.")
+    for topic, terms in topics:
+        print(f"  topic {topic}: {terms}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Streaming export of submissions to CSV, JSON lines or Parquet.
+
+Rows are read from a single cursor with ``fetchmany`` and written chunk by
+chunk, so memory stays flat however many rows match. Parquet output needs
+pyarrow and writes one row group per chunk.
+
+The app writes its exports to ``EXPORT_DIR`` and only offers files up to
+``FEEDBACK_EXPORT_DOWNLOAD_MB`` (default 50) for download, since Streamlit
+holds a download in server memory; larger exports go through this script.
+Only the hot set is exported unless ``--include-archived``; Dashboard and
+Analytics totals count archived submissions too.
+
+    python feedback_export.py --format csv --output pending.csv --status Pending
+    python feedback_export.py --format parquet --output all.parquet
+    python feedback_export.py --format csv --output all.csv --replica
+    python feedback_export.py --format csv --output history.csv --include-archived
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+import feedback_archive
+import feedback_db
+import feedback_replica
+
+FORMATS = ("csv", "jsonl", "parquet")
+CHUNK_SIZE = 10000
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "feedback_exports")
+DOWNLOAD_MAX_BYTES = int(float(os.environ.get("FEEDBACK_EXPORT_DOWNLOAD_MB", "50")) * 1024 * 1024)
+# App exports older than this belong to finished sessions.
+EXPORT_MAX_AGE_SECONDS = 3600
+
+EXPORT_COLUMNS = (
+    "id", "student_id", "student_name", "email", "department", "course_code",
+    "feedback_type", "category", "priority", "feedback_text", "submission_date",
+    "status", "admin_response", "response_date",
+)
+
+
+def iter_chunks(filters=None, chunk_size=CHUNK_SIZE, path=None, include_archived=False):
+    """Yield lists of row tuples (in EXPORT_COLUMNS order) matching ``filters``.
+
+    Only the hot set unless ``include_archived``; then archived submissions
+    are merged in by id.
+    """
+    conditions, params = feedback_db.filter_clause(filters)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    tables = ("feedback_submissions", feedback_archive.ARCHIVE_TABLE) if include_archived else ("feedback_submissions",)
+    # A compound ORDER BY merges the two id-ordered scans instead of sorting the union.
+    sql = " UNION ALL ".join(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM {table} {where}" for table in tables)
+    with feedback_db.connection(path) as conn:
+        cursor = conn.execute(f"{sql} ORDER BY id", params * len(tables))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+
+
+def _write_csv(chunks, output):
+    with open(output, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in chunks:
+            writer.writerows(rows)
+            yield len(rows)
+
+
+def _write_jsonl(chunks, output):
+    with open(output, "w", encoding="utf-8") as fh:
+        for rows in chunks:
+            fh.write("".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows))
+            yield len(rows)
+
+
+def _write_parquet(chunks, output):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [pa.field("id", pa.int64())] + [pa.field(column, pa.string()) for column in EXPORT_COLUMNS[1:]]
+    )
+    with pq.ParquetWriter(output, schema) as writer:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            yield len(rows)
+
+
+_WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def export_submissions(fmt, output, filters=None, chunk_size=CHUNK_SIZE, path=None, include_archived=False):
+    """Write the submissions matching ``filters`` to ``output``.
+
+    Returns a dict with rows, seconds and rows_per_sec.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+    started = time.perf_counter()
+    rows = sum(_WRITERS[fmt](iter_chunks(filters, chunk_size, path, include_archived), output))
+    seconds = time.perf_counter() - started
+    return {"rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds if seconds else 0.0}
+
+
+def new_export_file(fmt):
+    """Create an empty file in EXPORT_DIR for an app export, removing ones left by old sessions."""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    cutoff = time.time() - EXPORT_MAX_AGE_SECONDS
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
+    fd, output = tempfile.mkstemp(suffix=f".{fmt}", prefix="feedback_export_", dir=EXPORT_DIR)
+    os.close(fd)
+    return output
+
+
+def remove_export_file(output):
+    try:
+        os.remove(output)
+    except FileNotFoundError:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export feedback submissions.")
+    parser.add_argument("--db", default=feedback_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    for column in feedback_db.FILTER_COLUMNS:
+        parser.add_argument(f"--{column}", help=f"only export rows with this {column}")
+    parser.add_argument("--include-archived", action="store_true",
+                        help="also export submissions moved to the archive (see feedback_archive.py)")
+    parser.add_argument("--replica", action="store_true",
+                        help="read the analytics replica while it is fresh enough (see feedback_replica.py)")
+    args = parser.parse_args(argv)
+
+    feedback_db.ensure_database(args.db)
+    filters = {column: getattr(args, column) for column in feedback_db.FILTER_COLUMNS}
+    source = feedback_replica.read_path(args.db, start=False) if args.replica else args.db
+    stats = export_submissions(args.format, args.output, filters, args.chunk_size, source, args.include_archived)
+    print(f"Exported {stats['rows']:,} rows to {args.output} in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Realistic synthetic feedback submissions for load testing and demos.
+
+``generate_submissions`` yields submission dicts (the form fields plus
+submission_date, status, admin_response and response_date) with skewed
+department, category and priority mixes, semester-shaped submission dates,
+age-dependent statuses and bursts of near-identical outage complaints. The
+same seed always produces the same rows.
+"""
+
+import datetime
+import math
+import random
+
+import feedback_validation
+
+# The 20 hand-written records insert_sample_feedback.py used to load.
+SAMPLE_SUBMISSIONS = [
+    ("CU2023001", "Jane Doe", "jane.doe@caleb.edu.ng", "Computer Science", "CSC101", "Feedback", "Academic", "High", "The course content is very engaging!"),
+    ("CU2023002", "John Smith", "john.smith@caleb.edu.ng", "Engineering", "ENG201", "Grievance", "Facilities", "Urgent", "The air conditioning is not working."),
+    ("CU2023003", "Mary Johnson", "mary.johnson@caleb.edu.ng", "Business Administration", "BUS101", "Suggestion", "Academic", "Medium", "Add more case studies to the curriculum."),
+    ("CU2023004", "Ahmed Musa", "ahmed.musa@caleb.edu.ng", "Natural Sciences", "BIO110", "Feedback", "Student Services", "Low", "The library staff are very helpful."),
+    ("CU2023005", "Chinwe Okafor", "chinwe.okafor@caleb.edu.ng", "Law", "LAW101", "Complaint", "Administrative", "High", "Delays in processing transcripts."),
+    ("CU2023006", "Samuel Adeyemi", "samuel.adeyemi@caleb.edu.ng", "Computer Science", "CSC202", "Appreciation", "Faculty", "Medium", "Thanks for the coding bootcamp."),
+    ("CU2023007", "Grace Uche", "grace.uche@caleb.edu.ng", "Social Sciences", "SOC101", "Feedback", "Academic", "Low", "Lectures are well organized."),
+    ("CU2023008", "Peter Obi", "peter.obi@caleb.edu.ng", "Engineering", "ENG102", "Suggestion", "Facilities", "Medium", "More power outlets in the labs, please."),
+    ("CU2023009", "Aisha Bello", "aisha.bello@caleb.edu.ng", "Medicine", "MED101", "Grievance", "Student Services", "High", "Clinic wait times are too long."),
+    ("CU2023010", "David Mark", "david.mark@caleb.edu.ng", "Education", "EDU101", "Feedback", "Academic", "Medium", "Enjoying the new teaching methods."),
+    ("CU2023011", "Blessing Eze", "blessing.eze@caleb.edu.ng", "Arts & Humanities", "ART101", "Complaint", "Facilities", "Urgent", "The studio needs better lighting."),
+    ("CU2023012", "Musa Ibrahim", "musa.ibrahim@caleb.edu.ng", "Natural Sciences", "CHE101", "Suggestion", "Academic", "Low", "More practical sessions, please."),
+    ("CU2023013", "Ifeanyi Nwosu", "ifeanyi.nwosu@caleb.edu.ng", "Law", "LAW201", "Feedback", "Administrative", "Medium", "Registration process was smooth."),
+    ("CU2023014", "Fatima Sani", "fatima.sani@caleb.edu.ng", "Business Administration", "BUS202", "Grievance", "Financial", "High", "Scholarship disbursement is delayed."),
+    ("CU2023015", "Chinedu Okeke", "chinedu.okeke@caleb.edu.ng", "Computer Science", "CSC303", "Feedback", "Technology", "Medium", "WiFi is much improved this semester."),
+    ("CU2023016", "Esther Paul", "esther.paul@caleb.edu.ng", "Social Sciences", "SOC202", "Suggestion", "Student Services", "Low", "More career counseling sessions."),
+    ("CU2023017", "Michael James", "michael.james@caleb.edu.ng", "Engineering", "ENG203", "Feedback", "Facilities", "High", "Labs are clean and well-equipped."),
+    ("CU2023018", "Ngozi Umeh", "ngozi.umeh@caleb.edu.ng", "Education", "EDU202", "Complaint", "Academic", "Medium", "Some classes are overcrowded."),
+    ("CU2023019", "Sola Adebayo", "sola.adebayo@caleb.edu.ng", "Medicine", "MED202", "Grievance", "Administrative", "High", "Exam schedules are not communicated early."),
+    ("CU2023020", "Ruth Okon", "ruth.okon@caleb.edu.ng", "Arts & Humanities", "ART202", "Appreciation", "Faculty", "Low", "Lecturers are very supportive."),
+]
+
+FIRST_NAMES = ["Jane", "John", "Mary", "Ahmed", "Chinwe", "Samuel", "Grace", "Peter", "Aisha", "David",
+               "Blessing", "Musa", "Ifeanyi", "Fatima", "Chinedu", "Esther", "Michael", "Ngozi", "Sola", "Ruth",
+               "Tunde", "Amaka", "Yusuf", "Kemi", "Emeka", "Halima", "Seun", "Zainab", "Obinna", "Funke"]
+LAST_NAMES = ["Doe", "Smith", "Johnson", "Musa", "Okafor", "Adeyemi", "Uche", "Obi", "Bello", "Mark",
+              "Eze", "Ibrahim", "Nwosu", "Sani", "Okeke", "Paul", "James", "Umeh", "Adebayo", "Okon",
+              "Balogun", "Nnamdi", "Lawal", "Ojo", "Chukwu", "Danjuma", "Afolabi", "Garba", "Onyeka", "Salami"]
+COURSE_PREFIXES = {
+    "Computer Science": "CSC", "Engineering": "ENG", "Business Administration": "BUS",
+    "Arts & Humanities": "ART", "Natural Sciences": "BIO", "Social Sciences": "SOC",
+    "Education": "EDU", "Law": "LAW", "Medicine": "MED",
+}
+BUILDINGS = ["the main library", "Block A hostel", "Block C hostel", "the Engineering complex",
+             "the Science lab", "the lecture theatre", "the cafeteria", "the ICT centre"]
+
+TEXT_TEMPLATES = {
+    "Academic": ["The lectures in {course} are {quality}.", "Please add more practical sessions to {course}.",
+                 "Assessment feedback in {course} comes back too late.", "{course} course materials are outdated."],
+    "Administrative": ["Transcript processing is taking too long.", "Course registration portal was {quality}.",
+                       "Exam schedules are not communicated early enough.", "My records in the bursary are incorrect."],
+    "Facilities": ["The toilets in {building} need attention.", "There are not enough seats in {building}.",
+                   "Lighting in {building} is poor at night.", "{building} is clean and well maintained."],
+    "Student Services": ["Clinic wait times are too long.", "Career counselling sessions were {quality}.",
+                         "The library staff are very helpful.", "Hostel allocation was unfair this session."],
+    "Faculty": ["The lecturer for {course} is very supportive.", "The lecturer for {course} often misses classes.",
+                "Office hours for {course} are never kept.", "Thanks to the {course} teaching team."],
+    "Financial": ["Scholarship disbursement is delayed.", "I was charged twice for school fees.",
+                  "The payment portal rejected my card.", "Please allow fees to be paid in instalments."],
+    "Technology": ["WiFi in {building} is {quality}.", "The e-learning portal is down during exams.",
+                   "Lab computers in {building} are too slow.", "Student email login keeps failing."],
+    "Other": ["Campus shuttle schedule is unreliable.", "Please extend sports centre opening hours.",
+              "Security at the main gate is {quality}.", "More water dispensers are needed on campus."],
+}
+QUALITIES = ["excellent", "very good", "confusing", "poor", "disappointing", "helpful", "unreliable"]
+
+OUTAGE_TEMPLATES = [
+    ("Facilities", "The air conditioning in {building} is not working {suffix}"),
+    ("Facilities", "There has been no power in {building} since {when} {suffix}"),
+    ("Facilities", "The hostel generator in {building} has not been switched on {suffix}"),
+    ("Technology", "WiFi is completely down in {building} {suffix}"),
+    ("Academic", "The exam timetable for {course} clashes with another paper {suffix}"),
+]
+OUTAGE_SUFFIXES = ["", "again.", "and nobody is responding.", "please fix it urgently!", "for the third day."]
+OUTAGE_WHEN = ["this morning", "yesterday", "last night", "Monday"]
+
+ADMIN_RESPONSES = {
+    "Completed": ["Thank you, this has been resolved.", "The issue has been fixed. Please let us know if it recurs.",
+                  "Your request has been processed."],
+    "Rejected": ["This falls outside the scope of Student Affairs.", "We could not verify this report.",
+                 "Duplicate of an existing submission."],
+    "In Progress": ["We are looking into this.", "Forwarded to the responsible department."],
+}
+
+DEPARTMENT_WEIGHTS = [1 / (rank + 1) ** 0.8 for rank in range(len(feedback_validation.DEPARTMENTS))]
+TYPE_WEIGHTS = [30, 25, 20, 18, 7]
+CATEGORY_WEIGHTS = [28, 16, 20, 12, 9, 7, 6, 2]
+PRIORITY_WEIGHTS = [35, 40, 18, 7]
+# Median hours to a response, by priority.
+RESPONSE_HOURS = {"Low": 96, "Medium": 72, "High": 36, "Urgent": 12}
+MONTH_WEIGHTS = [1.4, 1.2, 0.9, 0.8, 1.0, 0.6, 0.4, 0.4, 1.5, 1.3, 1.1, 0.6]
+
+
+def _day_weight(day, start, span):
+    # Volume grows over the generated period, peaks at the start of each
+    # semester and drops at weekends.
+    growth = 0.5 + (day - start).days / span
+    weekend = 0.4 if day.weekday() >= 5 else 1.0
+    return growth * MONTH_WEIGHTS[day.month - 1] * weekend
+
+
+def generate_submissions(rows, seed=0, days=3 * 365, end=None, outage_rate=0.04):
+    """Yield ``rows`` synthetic submissions dated within ``days`` before ``end``."""
+    rng = random.Random(seed)
+    end = end or datetime.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - datetime.timedelta(days=days)
+    max_weight = 1.5 * max(MONTH_WEIGHTS)
+    students = max(1, rows // 3)
+    outages = [
+        (start + datetime.timedelta(days=rng.uniform(0, days)), rng.choice(OUTAGE_TEMPLATES), rng.choice(BUILDINGS))
+        for _ in range(max(1, int(rows * outage_rate) // 150))
+    ]
+
+    for _ in range(rows):
+        # A minority of students file most of the feedback.
+        student = int(students * rng.random() ** 1.5)
+        first = FIRST_NAMES[student % len(FIRST_NAMES)]
+        last = LAST_NAMES[(student // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        department = rng.choices(feedback_validation.DEPARTMENTS, DEPARTMENT_WEIGHTS)[0]
+        course = f"{COURSE_PREFIXES[department]}{rng.randrange(1, 5)}{rng.randrange(0, 3)}{rng.randrange(1, 10)}"
+        feedback_type = rng.choices(feedback_validation.FEEDBACK_TYPES, TYPE_WEIGHTS)[0]
+
+        if rng.random() < outage_rate:
+            when, (category, template), building = rng.choice(outages)
+            submitted = when + datetime.timedelta(hours=rng.expovariate(1 / 18))
+            priority = rng.choice(["High", "Urgent"])
+            feedback_type = "Grievance"
+            text = template.format(building=building, course=course, when=rng.choice(OUTAGE_WHEN),
+                                   suffix=rng.choice(OUTAGE_SUFFIXES)).strip()
+        else:
+            while True:
+                submitted = start + datetime.timedelta(seconds=rng.uniform(0, days * 86400))
+                if rng.random() * max_weight < _day_weight(submitted, start, days):
+                    break
+            category = rng.choices(feedback_validation.CATEGORIES, CATEGORY_WEIGHTS)[0]
+            priority = rng.choices(feedback_validation.PRIORITIES, PRIORITY_WEIGHTS)[0]
+            text = rng.choice(TEXT_TEMPLATES[category]).format(
+                course=course, building=rng.choice(BUILDINGS), quality=rng.choice(QUALITIES))
+            text = text[0].upper() + text[1:]
+        submitted = min(submitted, end)
+
+        age_days = (end - submitted).total_seconds() / 86400
+        if age_days < 2 and rng.random() < 0.8:
+            status = "Pending"
+        else:
+            status = rng.choices(feedback_validation.STATUSES, [8, 10, 72, 10])[0]
+        response_date = admin_response = None
+        if status != "Pending":
+            lag = RESPONSE_HOURS[priority] * math.exp(rng.gauss(0, 0.8))
+            responded = submitted + datetime.timedelta(hours=lag)
+            if responded <= end:
+                response_date = responded.strftime("%Y-%m-%d %H:%M:%S")
+                admin_response = rng.choice(ADMIN_RESPONSES[status])
+            else:
+                status = "Pending"
+
+        yield {
+            "student_id": f"CU{2019 + student % 6}{student:05d}",
+            "student_name": f"{first} {last}",
+            "email": f"{first.lower()}.{last.lower()}{student}@caleb.edu.ng",
+            "department": department,
+            "course_code": course,
+            "feedback_type": feedback_type,
+            "category": category,
+            "priority": priority,
+            "feedback_text": text,
+            "submission_date": submitted.strftime("%Y-%m-%d %H:%M:%S"),
+            "status": status,
+            "admin_response": admin_response,
+            "response_date": response_date,
+        }
+
+
+def sample_submissions():
+    fields = ("student_id", "student_name", "email", "department", "course_code",
+              "feedback_type", "category", "priority", "feedback_text")
+    return [dict(zip(fields, record)) for record in SAMPLE_SUBMISSIONS]
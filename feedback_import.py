@@ -0,0 +1,300 @@
+"""Bulk import of historical feedback and synthetic load generation.
+
+    python feedback_import.py --defer-indexes import export.csv
+    python feedback_import.py import export.jsonl --rejects rejects.jsonl
+    python feedback_import.py generate --rows 1000000 --seed 0
+    python feedback_import.py generate --rows 100000 --output synthetic.jsonl
+    python feedback_import.py sample
+
+Input is streamed in bounded chunks. Each chunk is validated against the
+submit form's rules and written with one ``executemany`` inside one
+transaction, with ``synchronous = OFF`` for the duration of the import;
+the same transaction adds the new rows to the near-duplicate index.
+``--defer-indexes`` also drops the secondary indexes and maintenance
+triggers on feedback_submissions while loading, then recreates them,
+rebuilds the trigger-maintained tables (rollups, search index) and
+clusters the new rows once at the end. That pays off for large backfills. Writes made meanwhile would miss
+those triggers (change feed stamps, tombstones, text feature cleanup), so
+the whole import then runs in one ``BEGIN EXCLUSIVE`` transaction: it
+refuses to start while another connection is writing, the app's writes
+fail with "database is locked" until it finishes, and a failed import
+leaves the database as it was. Stop the app first.
+"""
+
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import sqlite3
+import sys
+import time
+
+import feedback_db
+import feedback_dedup
+import feedback_generator
+import feedback_migrations
+import feedback_validation
+
+IMPORT_FIELDS = feedback_db.SUBMISSION_FIELDS + (
+    "submission_date", "status", "admin_response", "response_date",
+)
+
+BULK_INSERT_SQL = '''
+    INSERT INTO feedback_submissions
+    (student_id, student_name, email, department, course_code,
+     feedback_type, category, priority, feedback_text,
+     submission_date, status, admin_response, response_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, 'Pending'), ?, ?)
+'''
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+class InvalidLine(str):
+    """The text of a JSON-lines line that does not parse; rejected like an invalid row."""
+
+    def __new__(cls, text, error):
+        line = super().__new__(cls, text)
+        line.error = error
+        return line
+
+
+def read_rows(filename):
+    """Stream dict rows from a .csv file or a JSON-lines file ("-" for stdin).
+
+    A JSON line that does not parse comes back as an InvalidLine and one
+    that is not an object as whatever it holds; ``clean_row`` rejects both.
+    """
+    if filename.lower().endswith(".csv"):
+        with open(filename, newline="", encoding="utf-8") as fh:
+            yield from csv.DictReader(fh)
+        return
+    fh = sys.stdin if filename == "-" else open(filename, encoding="utf-8")
+    try:
+        for line in fh:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield InvalidLine(line.rstrip("\n"), f"Invalid JSON: {exc.msg} (column {exc.colno}).")
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+def _timestamp(value):
+    if value in (None, ""):
+        return None
+    parsed = datetime.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def clean_row(row):
+    """Return ``(values, None)`` for BULK_INSERT_SQL, or ``(None, error)``."""
+    if isinstance(row, InvalidLine):
+        return None, row.error
+    if not isinstance(row, dict):
+        return None, "Not a JSON object."
+    row = {field: (row.get(field) or None) for field in IMPORT_FIELDS}
+    for field in ("student_id", "student_name", "email", "feedback_text"):
+        if row[field] is not None:
+            row[field] = str(row[field]).strip()
+    error = feedback_validation.submission_error(row)
+    if error:
+        return None, error
+    if row["status"] is not None and row["status"] not in feedback_validation.STATUSES:
+        return None, f"Unknown status {row['status']!r}."
+    try:
+        row["submission_date"] = _timestamp(row["submission_date"])
+        row["response_date"] = _timestamp(row["response_date"])
+    except ValueError as exc:
+        return None, f"Invalid date: {exc}"
+    return tuple(row[field] for field in IMPORT_FIELDS), None
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _deferrable_objects(conn):
+    """Secondary indexes and triggers on feedback_submissions, as (type, name, sql)."""
+    return conn.execute('''
+        SELECT type, name, sql FROM sqlite_master
+        WHERE type IN ('index', 'trigger') AND tbl_name = 'feedback_submissions' AND sql IS NOT NULL
+    ''').fetchall()
+
+
+def bulk_import(rows, path=None, chunk_size=DEFAULT_CHUNK_SIZE, defer_indexes=False,
+                on_reject=None, on_progress=None):
+    """Validate and insert ``rows`` (an iterable of dicts) in batched transactions.
+
+    ``on_reject(line_number, row, error)`` is called for every invalid row and
+    ``on_progress(inserted, seconds)`` after every chunk. Returns a dict with
+    inserted, rejected, seconds and rows_per_sec. With ``defer_indexes`` the
+    import is one exclusive transaction; DatabaseBusy if another connection
+    holds the write lock.
+    """
+    feedback_db.init_database(path)
+    conn = feedback_db.open_connection(path)
+    inserted = rejected = 0
+    started = time.perf_counter()
+    try:
+        conn.execute("PRAGMA synchronous = OFF")
+        if defer_indexes:
+            # Held until the indexes and triggers are back, so no other
+            # connection can write while they are missing.
+            conn.execute("PRAGMA busy_timeout = 0")
+            try:
+                conn.execute("BEGIN EXCLUSIVE")
+            except sqlite3.OperationalError:
+                raise feedback_db.DatabaseBusy("Another connection is writing to the database; "
+                                               "stop the app before importing with --defer-indexes.") from None
+            deferred = _deferrable_objects(conn)
+            for kind, name, _ in deferred:
+                conn.execute(f"DROP {kind.upper()} {name}")
+
+        line_numbers = itertools.count(1)
+        for chunk in _chunks(rows, chunk_size):
+            batch = []
+            for row in chunk:
+                line = next(line_numbers)
+                values, error = clean_row(row)
+                if error:
+                    rejected += 1
+                    if on_reject:
+                        on_reject(line, row, error)
+                else:
+                    batch.append(values)
+            if not defer_indexes:
+                conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(BULK_INSERT_SQL, batch)
+                if not defer_indexes:
+                    feedback_dedup.index_new_submissions(conn)
+            except BaseException:
+                conn.rollback()
+                raise
+            if not defer_indexes:
+                conn.commit()
+            inserted += len(batch)
+            if on_progress:
+                on_progress(inserted, time.perf_counter() - started)
+
+        if defer_indexes:
+            for kind, _, sql in deferred:
+                conn.execute(sql)
+            feedback_migrations.rebuild_derived(conn)
+            feedback_dedup.index_new_submissions(conn)
+            conn.commit()
+    finally:
+        if conn.in_transaction:
+            # A failed deferred import: dropping the indexes is undone too.
+            conn.rollback()
+            inserted = 0
+        if inserted:
+            conn.execute("ANALYZE")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.close()
+        feedback_db.invalidate_cache(path)
+
+    seconds = time.perf_counter() - started
+    return {
+        "inserted": inserted,
+        "rejected": rejected,
+        "seconds": seconds,
+        "rows_per_sec": inserted / seconds if seconds else 0.0,
+    }
+
+
+def _progress_printer(every):
+    state = {"next": every}
+
+    def report(inserted, seconds):
+        if inserted >= state["next"]:
+            print(f"  {inserted:,} rows ({inserted / seconds:,.0f} rows/s)", file=sys.stderr)
+            state["next"] = (inserted // every + 1) * every
+    return report
+
+
+def _print_stats(stats):
+    print(f"Inserted {stats['inserted']:,} rows, rejected {stats['rejected']:,} "
+          f"in {stats['seconds']:.1f}s ({stats['rows_per_sec']:,.0f} rows/s).")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-import or generate feedback submissions.")
+    parser.add_argument("--db", default=feedback_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="drop secondary indexes and triggers during the load and rebuild at the end "
+                             "(one exclusive transaction; stop the app first)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_cmd = commands.add_parser("import", help="import a CSV or JSON-lines export")
+    import_cmd.add_argument("file", help=".csv or .jsonl file, or - for JSON lines on stdin")
+    import_cmd.add_argument("--rejects", help="write rejected rows with their errors to this JSON-lines file")
+
+    generate_cmd = commands.add_parser("generate", help="generate synthetic submissions")
+    generate_cmd.add_argument("--rows", type=int, default=100000)
+    generate_cmd.add_argument("--seed", type=int, default=0)
+    generate_cmd.add_argument("--days", type=int, default=3 * 365, help="spread submissions over this many days")
+    generate_cmd.add_argument("--output", help="write JSON lines here instead of inserting into the database")
+
+    commands.add_parser("sample", help="insert the 20 built-in sample submissions")
+
+    args = parser.parse_args(argv)
+    progress = _progress_printer(100000)
+
+    if args.command == "import":
+        rejects = open(args.rejects, "w", encoding="utf-8") if args.rejects else None
+
+        def on_reject(line, row, error):
+            if rejects:
+                rejects.write(json.dumps({"line": line, "error": error, "row": row}) + "\n")
+            else:
+                print(f"  line {line}: {error}", file=sys.stderr)
+
+        try:
+            stats = bulk_import(read_rows(args.file), args.db, args.chunk_size,
+                                args.defer_indexes, on_reject, progress)
+        except feedback_db.DatabaseBusy as e:
+            print(e, file=sys.stderr)
+            return 2
+        finally:
+            if rejects:
+                rejects.close()
+        _print_stats(stats)
+        return 1 if stats["rejected"] else 0
+
+    if args.command == "generate":
+        rows = feedback_generator.generate_submissions(args.rows, seed=args.seed, days=args.days)
+        if args.output:
+            started = time.perf_counter()
+            with open(args.output, "w", encoding="utf-8") as fh:
+                for row in rows:
+                    fh.write(json.dumps(row) + "\n")
+            seconds = time.perf_counter() - started
+            print(f"Wrote {args.rows:,} rows to {args.output} in {seconds:.1f}s.")
+            return 0
+        try:
+            _print_stats(bulk_import(rows, args.db, args.chunk_size, args.defer_indexes, on_progress=progress))
+        except feedback_db.DatabaseBusy as e:
+            print(e, file=sys.stderr)
+            return 2
+        return 0
+
+    stats = bulk_import(feedback_generator.sample_submissions(), args.db)
+    print(f"{stats['inserted']} sample feedback records inserted successfully!")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
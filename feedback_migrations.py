@@ -0,0 +1,344 @@
+"""Versioned schema migrations for the feedback database.
+
+The schema version lives in ``PRAGMA user_version``. Each entry in
+``MIGRATIONS`` upgrades the database by one version and runs in its own
+``BEGIN IMMEDIATE`` transaction, so an existing ``feedback_database.db`` is
+upgraded in place and two processes starting at once cannot both apply the
+same step.
+"""
+
+import feedback_archive
+import feedback_dedup
+import feedback_enrich
+import feedback_ratelimit
+import feedback_rollups
+import feedback_sla
+import feedback_triage
+import feedback_validation
+
+
+def _create_base_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT NOT NULL,
+            student_name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            department TEXT NOT NULL,
+            course_code TEXT,
+            feedback_type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            feedback_text TEXT NOT NULL,
+            submission_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'Pending',
+            admin_response TEXT,
+            response_date TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS admin_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        INSERT OR IGNORE INTO admin_users (username, password_hash, role)
+        VALUES ('admin', 'admin123', 'super_admin')
+    ''')
+
+
+def _add_filter_indexes(conn):
+    # One (column, submission_date) index per Manage Submissions filter so a
+    # filtered, date-ordered page is an index range scan.
+    for column in ("status", "priority", "category", "department"):
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_feedback_{column}_date
+            ON feedback_submissions ({column}, submission_date)
+        ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_student_date
+        ON feedback_submissions (student_id, submission_date)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_submission_date
+        ON feedback_submissions (submission_date)
+    ''')
+    # Covering index for the metric cards and analytics group-bys: they
+    # touch only these short columns, never feedback_text.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_summary
+        ON feedback_submissions (status, priority, category, feedback_type, department, submission_date)
+    ''')
+
+
+def _add_analytics_rollups(conn):
+    feedback_rollups.create_rollups(conn)
+    feedback_rollups.rebuild_rollups(conn, source="feedback_submissions")
+
+
+def _add_change_counter(conn):
+    # A single-row counter bumped by every write to feedback_submissions;
+    # read caches compare it to decide whether a stored result is stale.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_changes (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            seq INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO feedback_changes (id, seq) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_feedback_changes_{event.lower()}
+            AFTER {event} ON feedback_submissions
+            BEGIN
+                UPDATE feedback_changes SET seq = seq + 1 WHERE id = 1;
+            END
+        ''')
+
+
+def _add_full_text_search(conn):
+    # External-content FTS5 index: the text lives only in feedback_submissions
+    # and the triggers below mirror every change into the index.
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS feedback_fts USING fts5(
+            feedback_text, admin_response,
+            content='feedback_submissions', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_fts_insert
+        AFTER INSERT ON feedback_submissions
+        BEGIN
+            INSERT INTO feedback_fts (rowid, feedback_text, admin_response)
+            VALUES (NEW.id, NEW.feedback_text, NEW.admin_response);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_fts_delete
+        AFTER DELETE ON feedback_submissions
+        BEGIN
+            INSERT INTO feedback_fts (feedback_fts, rowid, feedback_text, admin_response)
+            VALUES ('delete', OLD.id, OLD.feedback_text, OLD.admin_response);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_fts_update
+        AFTER UPDATE OF feedback_text, admin_response ON feedback_submissions
+        BEGIN
+            INSERT INTO feedback_fts (feedback_fts, rowid, feedback_text, admin_response)
+            VALUES ('delete', OLD.id, OLD.feedback_text, OLD.admin_response);
+            INSERT INTO feedback_fts (rowid, feedback_text, admin_response)
+            VALUES (NEW.id, NEW.feedback_text, NEW.admin_response);
+        END
+    ''')
+    conn.execute("INSERT INTO feedback_fts (feedback_fts) VALUES ('rebuild')")
+
+
+def _add_sla_rollups(conn):
+    feedback_sla.create_sla_rollups(conn)
+    feedback_sla.rebuild_sla_rollups(conn, source="feedback_submissions")
+
+
+def _add_duplicate_index(conn):
+    # Existing rows are clustered later by feedback_dedup.backfill, in short
+    # transactions, instead of holding up startup here.
+    feedback_dedup.create_duplicate_index(conn)
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM feedback_submissions").fetchone()[0]
+    feedback_dedup.create_backfill_state(conn, last_id)
+
+
+def _add_triage_queue(conn):
+    feedback_triage.create_triage_queue(conn)
+
+
+def _add_archive(conn):
+    feedback_archive.create_archive(conn)
+    feedback_rollups.keep_archived_counts(conn)
+    feedback_sla.keep_archived_counts(conn)
+
+
+def _add_change_feed(conn):
+    # Every UPDATE stamps the row with the change counter value it bumped
+    # to, and every DELETE leaves a tombstone, so a view can fetch what
+    # changed since a counter value. Inserts need neither: ids only grow.
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(feedback_submissions)")}
+    if "updated_seq" not in existing:
+        conn.execute("ALTER TABLE feedback_submissions ADD COLUMN updated_seq INTEGER")
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_updated_seq
+        ON feedback_submissions (updated_seq) WHERE updated_seq IS NOT NULL
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_deletions (
+            deleted_seq INTEGER NOT NULL,
+            id INTEGER NOT NULL,
+            PRIMARY KEY (deleted_seq, id)
+        ) WITHOUT ROWID
+    ''')
+    # The stamping UPDATE changes updated_seq, so it does not fire this again.
+    conn.execute("DROP TRIGGER IF EXISTS trg_feedback_changes_update")
+    conn.execute('''
+        CREATE TRIGGER trg_feedback_changes_update
+        AFTER UPDATE ON feedback_submissions
+        WHEN NEW.updated_seq IS OLD.updated_seq
+        BEGIN
+            UPDATE feedback_changes SET seq = seq + 1 WHERE id = 1;
+            UPDATE feedback_submissions SET updated_seq = (SELECT seq FROM feedback_changes WHERE id = 1)
+            WHERE id = NEW.id;
+        END
+    ''')
+    conn.execute("DROP TRIGGER IF EXISTS trg_feedback_changes_delete")
+    conn.execute('''
+        CREATE TRIGGER trg_feedback_changes_delete
+        AFTER DELETE ON feedback_submissions
+        BEGIN
+            UPDATE feedback_changes SET seq = seq + 1 WHERE id = 1;
+            INSERT INTO feedback_deletions (deleted_seq, id)
+            VALUES ((SELECT seq FROM feedback_changes WHERE id = 1), OLD.id);
+        END
+    ''')
+
+
+def _add_text_features(conn):
+    feedback_enrich.create_text_features(conn)
+
+
+def _add_rate_limits(conn):
+    feedback_ratelimit.create_rate_limits(conn)
+
+
+def _add_student_lookup_index(conn):
+    # Serves the student's own Track My Submission lookup, newest first; both
+    # keys compare without case or stray whitespace, as students type them
+    # differently and they are stored as typed.
+    for table, name in (("feedback_submissions", "idx_feedback_student_lookup"),
+                        (feedback_archive.ARCHIVE_TABLE, "idx_feedback_archive_student_lookup")):
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS {name}
+            ON {table} ({feedback_validation.STUDENT_ID_KEY_SQL}, {feedback_validation.EMAIL_KEY_SQL}, submission_date)
+        ''')
+
+
+def _trim_student_lookup_index(conn):
+    # Version 13 indexed the raw values, which padded ones never matched.
+    conn.execute("DROP INDEX IF EXISTS idx_feedback_student_email_date")
+    conn.execute("DROP INDEX IF EXISTS idx_feedback_archive_student_email_date")
+    _add_student_lookup_index(conn)
+
+
+def _add_dedup_backfill_state(conn):
+    # Databases that already clustered every row in version 7 have nothing to backfill.
+    feedback_dedup.create_backfill_state(conn)
+
+
+def _add_tombstone_horizon(conn):
+    # Tombstones are pruned after a while (feedback_sync.prune_tombstones); a
+    # view whose marks predate the newest pruned one reloads instead.
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(feedback_deletions)")}
+    if "deleted_at" not in existing:
+        conn.execute("ALTER TABLE feedback_deletions ADD COLUMN deleted_at TIMESTAMP")
+    conn.execute("DROP TRIGGER IF EXISTS trg_feedback_changes_delete")
+    conn.execute('''
+        CREATE TRIGGER trg_feedback_changes_delete
+        AFTER DELETE ON feedback_submissions
+        BEGIN
+            UPDATE feedback_changes SET seq = seq + 1 WHERE id = 1;
+            INSERT INTO feedback_deletions (deleted_seq, id, deleted_at)
+            VALUES ((SELECT seq FROM feedback_changes WHERE id = 1), OLD.id, CURRENT_TIMESTAMP);
+        END
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_tombstone_horizon (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            pruned_seq INTEGER NOT NULL
+        )
+    ''')
+    conn.execute("INSERT OR IGNORE INTO feedback_tombstone_horizon (id, pruned_seq) VALUES (1, 0)")
+
+
+def _add_text_backfill_mark(conn):
+    # The background enricher re-analysed the whole history after every
+    # refit; it now starts above backfill_to. The submissions of a model
+    # fitted before this are all left to feedback_enrich.backfill.
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(feedback_text_model)")}
+    if "backfill_to" not in existing:
+        conn.execute("ALTER TABLE feedback_text_model ADD COLUMN backfill_to INTEGER NOT NULL DEFAULT 0")
+    conn.execute(f'''
+        UPDATE feedback_text_model
+        SET backfill_to = (SELECT COALESCE(MAX(id), 0) FROM {feedback_archive.ALL_SUBMISSIONS})
+    ''')
+
+
+MIGRATIONS = [
+    _create_base_tables,
+    _add_filter_indexes,
+    _add_analytics_rollups,
+    _add_change_counter,
+    _add_full_text_search,
+    _add_sla_rollups,
+    _add_duplicate_index,
+    _add_triage_queue,
+    _add_archive,
+    _add_change_feed,
+    _add_text_features,
+    _add_rate_limits,
+    _add_student_lookup_index,
+    _add_dedup_backfill_state,
+    _trim_student_lookup_index,
+    _add_tombstone_horizon,
+    _add_text_backfill_mark,
+]
+
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def rebuild_derived(conn):
+    """Recompute every trigger-maintained table from feedback_submissions and the archive.
+
+    Used after bulk loads that ran with the maintenance triggers dropped.
+    """
+    feedback_rollups.rebuild_rollups(conn)
+    feedback_sla.rebuild_sla_rollups(conn)
+    conn.execute("INSERT INTO feedback_fts (feedback_fts) VALUES ('rebuild')")
+    conn.execute("UPDATE feedback_changes SET seq = seq + 1 WHERE id = 1")
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every pending migration and return the versions applied.
+
+    ``conn`` must be in autocommit mode (``isolation_level=None``), as
+    connections from ``feedback_db`` are.
+    """
+    applied = []
+    if schema_version(conn) == 0 and not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+        # Lets the archiver hand freed pages back with PRAGMA incremental_vacuum.
+        # The WAL header is already written, so the mode needs a VACUUM of the
+        # still empty file to take effect.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    while schema_version(conn) < LATEST_VERSION:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = schema_version(conn)
+            if version < LATEST_VERSION:
+                MIGRATIONS[version](conn)
+                conn.execute(f"PRAGMA user_version = {version + 1}")
+                applied.append(version + 1)
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    if applied:
+        conn.execute("ANALYZE")
+    return applied
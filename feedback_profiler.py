@@ -0,0 +1,332 @@
+"""Startup, rerun and query profiling for the Streamlit app.
+
+Inside the app, ``lazy_import`` loads heavy modules only on the pages that
+need them and records how long each first import took. ``start_rerun`` and
+``finish_rerun`` time every script rerun per page, and ``record_frame``
+notes how much memory the DataFrame behind each view holds. With
+FEEDBACK_PROFILE=1 the app shows these numbers in the sidebar and also
+collects:
+
+- the time and row count of every SQL statement, from the connection's
+  trace callback: a statement runs from its trace call until the next
+  statement starts on that connection or the connection goes back to the
+  pool, so fetching the rows is included;
+- ``span`` timings around parts of a page such as one Analytics chart;
+- query-cache hits and misses per cached read.
+
+Statements, spans and cache lookups are kept in bounded in-memory buffers
+for the admin Performance tab and appended as JSON lines to the rotating
+log ``FEEDBACK_PROFILE_LOG``. Statements are recorded with their literals
+replaced by ``?``, so no submitted text reaches the log. With profiling off
+``span`` returns a shared no-op context and nothing else is collected.
+
+From the command line this module measures cold import cost in fresh
+interpreters, which is what a new server process pays:
+
+    python feedback_profiler.py [--repeats 3]
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+ENABLED = os.environ.get("FEEDBACK_PROFILE") == "1"
+LOG_PATH = os.environ.get("FEEDBACK_PROFILE_LOG", "feedback_profile.log")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# Modules the app imports, heaviest first; the CLI reports each one.
+PROFILED_MODULES = ["streamlit", "pandas", "plotly.express", "feedback_db", "feedback_ui", "feedback_writer"]
+RERUN_HISTORY = 200
+QUERY_HISTORY = 5000
+
+import_times = {}
+_reruns = {}
+_frames = {}
+_spans = {}
+_queries = deque(maxlen=QUERY_HISTORY)
+_cache_lookups = {}
+_lock = threading.Lock()
+_local = threading.local()
+_log = None
+
+
+def lazy_import(name):
+    """Import ``name`` on first use, recording how long that first import took."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    import_times.setdefault(name, time.perf_counter() - started)
+    return module
+
+
+def start_rerun():
+    return time.perf_counter()
+
+
+def finish_rerun(page, started):
+    elapsed = time.perf_counter() - started
+    with _lock:
+        _reruns.setdefault(page, deque(maxlen=RERUN_HISTORY)).append(elapsed)
+    if ENABLED:
+        _write_log("page", page, elapsed * 1000)
+    return elapsed
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _timing_summary(history, count_key):
+    with _lock:
+        snapshot = {name: sorted(times) for name, times in history.items()}
+        last = {name: times[-1] for name, times in history.items()}
+    return {
+        name: {
+            count_key: len(times),
+            "median_ms": times[len(times) // 2] * 1000,
+            "p95_ms": _percentile(times, 0.95) * 1000,
+            "max_ms": times[-1] * 1000,
+            "last_ms": last[name] * 1000,
+        }
+        for name, times in snapshot.items()
+    }
+
+
+def rerun_summary():
+    """Per page: rerun count, then median, p95, max and last rerun time in ms."""
+    return _timing_summary(_reruns, "reruns")
+
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+def span(name):
+    """Time the ``with`` block as ``name`` (e.g. ``"analytics: category chart"``).
+
+    Returns a shared no-op context when profiling is off.
+    """
+    return _span(name) if ENABLED else _NO_SPAN
+
+
+@contextlib.contextmanager
+def _span(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _spans.setdefault(name, deque(maxlen=RERUN_HISTORY)).append(elapsed)
+        _write_log("span", name, elapsed * 1000)
+
+
+def span_summary():
+    """Per span: count, then median, p95, max and last time in ms."""
+    return _timing_summary(_spans, "count")
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_REPEATED = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def fingerprint(sql):
+    """``sql`` with literals replaced by ``?`` and whitespace collapsed.
+
+    The trace callback reports statements with their parameters filled in;
+    this groups executions of one statement and keeps values out of the log.
+    """
+    return _REPEATED.sub("?, ...", _LITERALS.sub("?", " ".join(sql.split())))
+
+
+class _Statements:
+    """Times the statements run on one borrowed connection."""
+
+    __slots__ = ("conn", "sql", "started", "changes", "rows")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.sql = None
+
+    def start(self, sql):
+        # Statements run by triggers are traced as "-- TRIGGER name" or as
+        # the statement that fired them; both belong to the running one.
+        if sql.startswith("--") or sql == self.sql:
+            return
+        now = time.perf_counter()
+        self.finish(now)
+        self.sql, self.started, self.changes, self.rows = sql, now, self.conn.total_changes, None
+
+    def finish(self, now=None):
+        if self.sql is None:
+            return
+        elapsed = (now or time.perf_counter()) - self.started
+        rows = self.rows if self.rows is not None else self.conn.total_changes - self.changes
+        record_query(self.sql, elapsed * 1000, rows)
+        self.sql = None
+
+
+def begin_statements(conn):
+    """Start timing the statements run on ``conn`` by this thread."""
+    statements = _Statements(conn)
+    stack = getattr(_local, "statements", None)
+    if stack is None:
+        stack = _local.statements = []
+    stack.append(statements)
+    return statements
+
+
+def end_statements(statements):
+    statements.finish()
+    _local.statements.remove(statements)
+
+
+def trace_statement(sql):
+    """Statement listener for ``feedback_db.add_statement_listener``."""
+    stack = getattr(_local, "statements", None)
+    if stack:
+        stack[-1].start(sql)
+
+
+def record_rows(count):
+    """Note how many rows the running statement returned.
+
+    Statements that return no rows record the rows they changed, including
+    changes made by triggers.
+    """
+    stack = getattr(_local, "statements", None)
+    if stack and stack[-1].sql is not None:
+        stack[-1].rows = count
+
+
+def record_query(sql, ms, rows):
+    sql = fingerprint(sql)
+    with _lock:
+        _queries.append((sql, ms, rows))
+    _write_log("query", sql, ms, rows)
+
+
+def query_summary(limit=20):
+    """The ``limit`` statements with the highest p95 time over the recent history.
+
+    One dict per statement fingerprint: sql, count, median_ms, p95_ms,
+    max_ms, total_ms and mean rows.
+    """
+    with _lock:
+        recent = list(_queries)
+    grouped = {}
+    for sql, ms, rows in recent:
+        grouped.setdefault(sql, []).append((ms, rows))
+    summary = []
+    for sql, runs in grouped.items():
+        times = sorted(ms for ms, _ in runs)
+        summary.append({
+            "sql": sql,
+            "count": len(runs),
+            "median_ms": times[len(times) // 2],
+            "p95_ms": _percentile(times, 0.95),
+            "max_ms": times[-1],
+            "total_ms": sum(times),
+            "rows": sum(rows for _, rows in runs) / len(runs),
+        })
+    summary.sort(key=lambda row: row["p95_ms"], reverse=True)
+    return summary[:limit]
+
+
+def record_cache(name, hit):
+    """Count one query-cache lookup of the cached read ``name``."""
+    with _lock:
+        counts = _cache_lookups.setdefault(name, [0, 0])
+        counts[0 if hit else 1] += 1
+
+
+def cache_summary():
+    """Per cached read: hits, misses and hit rate."""
+    with _lock:
+        snapshot = {name: tuple(counts) for name, counts in _cache_lookups.items()}
+    return {
+        name: {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses)}
+        for name, (hits, misses) in snapshot.items()
+    }
+
+
+def _write_log(kind, name, ms, rows=None):
+    global _log
+    if not LOG_PATH:
+        return
+    if _log is None:
+        import logging
+        import logging.handlers
+
+        logger = logging.getLogger("feedback.profile")
+        with _lock:
+            if not logger.handlers:
+                handler = logging.handlers.RotatingFileHandler(
+                    LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+                logger.addHandler(handler)
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+        _log = logger
+    entry = {"ts": round(time.time(), 3), "kind": kind, "name": name, "ms": round(ms, 3)}
+    if rows is not None:
+        entry["rows"] = rows
+    _log.info(json.dumps(entry))
+
+
+def record_frame(view, df):
+    """Remember the row count and memory of the DataFrame behind ``view``.
+
+    A no-op unless profiling is on: measuring walks every string in the frame.
+    """
+    if not ENABLED:
+        return
+    size = int(df.memory_usage(index=True, deep=True).sum())
+    with _lock:
+        _frames[view] = {"rows": len(df), "kib": size / 1024}
+
+
+def frame_summary():
+    """Per view: rows and KiB of the last DataFrame recorded for it."""
+    with _lock:
+        return dict(_frames)
+
+
+def cold_import_ms(module, repeats=3):
+    """Best-of-``repeats`` import time of ``module`` in a fresh interpreter."""
+    code = ("import time; t = time.perf_counter(); "
+            f"import {module}; print(time.perf_counter() - t)")
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None
+        seconds = float(result.stdout.strip())
+        best = seconds if best is None else min(best, seconds)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import cost of the app's modules.")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'module':20}{'cold import ms':>16}")
+    for module in PROFILED_MODULES:
+        ms = cold_import_ms(module, args.repeats)
+        print(f"{module:20}{'not installed' if ms is None else f'{ms:.1f}':>16}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""Per-student rate limiting and load shedding for new submissions.
+
+Every submission spends one token from each of its buckets: one per student
+ID, one per email address and, in the app, one per browser session (the API
+has no trusted per-client identity, so it uses only the first two). A
+bucket holds at most ``BURST``
+tokens and regains ``PER_HOUR`` an hour, so a student can send a few
+submissions in a row but not a flood.
+
+The buckets live in ``feedback_rate_limits``, one short row per key, and are
+charged inside the writer's batch transaction, so limits hold across
+restarts and across the app and API processes without an extra commit. Each
+process also remembers the last state it saw of every bucket. That copy can
+only overstate what is left (other processes may have spent tokens since),
+so a bucket it shows as empty is refused before the submission is queued,
+without touching the database.
+
+Before any of that, ``shed_reason`` refuses new submissions outright while
+the write queue is deeper than ``SHED_QUEUE_DEPTH`` or the writer recently
+waited longer than ``SHED_LOCK_WAIT_MS`` for the write lock.
+
+``FEEDBACK_RATE_LIMIT=0`` turns the per-key limits off (load tests);
+shedding stays on.
+
+Refusals are counted per process and added to ``feedback_throttle_counts``
+(per day and reason) by the writer's next commit; the Performance tab shows
+both.
+
+    python feedback_ratelimit.py status
+    python feedback_ratelimit.py reset --key student:CU2023001
+"""
+
+import argparse
+import collections
+import datetime
+import os
+import sys
+import threading
+import time
+
+import feedback_validation
+
+ENABLED = os.environ.get("FEEDBACK_RATE_LIMIT", "1") != "0"
+BURST = float(os.environ.get("FEEDBACK_RATE_BURST", "5"))
+PER_HOUR = float(os.environ.get("FEEDBACK_RATE_PER_HOUR", "10"))
+SHED_QUEUE_DEPTH = int(os.environ.get("FEEDBACK_SHED_QUEUE_DEPTH", "500"))
+SHED_LOCK_WAIT_MS = float(os.environ.get("FEEDBACK_SHED_LOCK_WAIT_MS", "1000"))
+# A lock wait older than this says nothing about the load now.
+LOCK_WAIT_WINDOW_SECONDS = 5.0
+MEMORY_KEYS = 10000
+PRUNE_EVERY_SECONDS = 60.0
+
+KEY_KINDS = ("student", "email", "session")
+SHED_REASONS = ("queue", "lock_wait")
+
+# Charges one token if the bucket has one, after crediting the refill since
+# its last update; returns nothing when it is empty.
+TAKE_SQL = '''
+    INSERT INTO feedback_rate_limits (key, tokens, updated_at) VALUES (:key, :burst - 1, :now)
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = MIN(:burst, tokens + (:now - updated_at) * :rate) - 1,
+        updated_at = :now
+    WHERE MIN(:burst, tokens + (:now - updated_at) * :rate) >= 1
+    RETURNING tokens
+'''
+
+BUCKET_SQL = "SELECT tokens, updated_at FROM feedback_rate_limits WHERE key = ?"
+
+# A bucket untouched for this long is full again and can be forgotten.
+PRUNE_SQL = "DELETE FROM feedback_rate_limits WHERE updated_at < ?"
+
+COUNT_SQL = '''
+    INSERT INTO feedback_throttle_counts (day, reason, count) VALUES (?, ?, ?)
+    ON CONFLICT (day, reason) DO UPDATE SET count = count + excluded.count
+'''
+
+
+class RateLimited(Exception):
+    """Raised for a submission whose student, email or session has no tokens left."""
+
+    def __init__(self, kind, retry_after):
+        super().__init__(f"Too many submissions for this {kind}; retry in {retry_after:.0f}s.")
+        self.kind = kind
+        self.retry_after = retry_after
+
+
+def create_rate_limits(conn):
+    """Create the bucket and counter tables (used by a migration)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_rate_limits (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_throttle_counts (
+            day TEXT NOT NULL,
+            reason TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (day, reason)
+        ) WITHOUT ROWID
+    ''')
+
+
+def limit_keys(submission, session=None):
+    """The bucket keys a submission is charged to, normalised so case and spacing do not dodge them."""
+    if not ENABLED:
+        return ()
+    student_id, email = feedback_validation.student_key(submission.get("student_id"), submission.get("email"))
+    keys = [f"student:{student_id}", f"email:{email}"]
+    if session:
+        keys.append(f"session:{session}")
+    return tuple(keys)
+
+
+class RateLimiter:
+    """Token buckets for one database, plus this process's refusal counters."""
+
+    def __init__(self, burst=BURST, per_hour=PER_HOUR, memory_keys=MEMORY_KEYS):
+        self.burst = burst
+        self.rate = per_hour / 3600
+        self.memory_keys = memory_keys
+        self._seen = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = collections.Counter()
+        self._unsaved = collections.Counter()
+        self._pruned_at = 0.0
+
+    def _tokens(self, tokens, updated_at, now):
+        return min(self.burst, tokens + (now - updated_at) * self.rate)
+
+    def _retry_after(self, tokens):
+        return (1 - tokens) / self.rate if self.rate else float("inf")
+
+    def _remember(self, key, tokens, now):
+        with self._lock:
+            self._seen[key] = (tokens, now)
+            self._seen.move_to_end(key)
+            while len(self._seen) > self.memory_keys:
+                self._seen.popitem(last=False)
+
+    def forget(self, keys):
+        """Drop what this process remembers of ``keys`` (after a rolled back charge)."""
+        with self._lock:
+            for key in keys:
+                self._seen.pop(key, None)
+
+    def count(self, reason):
+        with self._lock:
+            self.counts[reason] += 1
+            self._unsaved[reason] += 1
+
+    def check(self, keys, now=None):
+        """Raise RateLimited if this process already knows one of ``keys`` is out of tokens."""
+        now = time.time() if now is None else now
+        for key in keys:
+            seen = self._seen.get(key)
+            if seen is not None:
+                tokens = self._tokens(*seen, now)
+                if tokens < 1:
+                    kind = key.partition(":")[0]
+                    self.count(kind)
+                    raise RateLimited(kind, self._retry_after(tokens))
+
+    def take(self, conn, keys, now=None):
+        """Charge one token to every key, all or none; returns RateLimited instead of charging.
+
+        Call inside the write transaction that inserts the submission.
+        """
+        now = time.time() if now is None else now
+        conn.execute("SAVEPOINT rate_limit")
+        taken = []
+        for key in keys:
+            row = conn.execute(TAKE_SQL, {"key": key, "burst": self.burst, "now": now, "rate": self.rate}).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK TO rate_limit")
+                conn.execute("RELEASE rate_limit")
+                tokens = self._tokens(*conn.execute(BUCKET_SQL, (key,)).fetchone(), now)
+                self._remember(key, tokens, now)
+                kind = key.partition(":")[0]
+                self.count(kind)
+                return RateLimited(kind, self._retry_after(tokens))
+            taken.append((key, row[0]))
+        conn.execute("RELEASE rate_limit")
+        for key, tokens in taken:
+            self._remember(key, tokens, now)
+        return None
+
+    def save_counts(self, conn, now=None):
+        """Add the refusals counted since the last call to feedback_throttle_counts.
+
+        Call inside a write transaction; also forgets buckets that are full again.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, collections.Counter()
+        day = datetime.datetime.utcfromtimestamp(now).strftime("%Y-%m-%d")
+        try:
+            conn.executemany(COUNT_SQL, [(day, reason, count) for reason, count in unsaved.items()])
+            if self.rate and now - self._pruned_at >= PRUNE_EVERY_SECONDS:
+                conn.execute(PRUNE_SQL, (now - self.burst / self.rate,))
+                self._pruned_at = now
+        except BaseException:
+            with self._lock:
+                self._unsaved.update(unsaved)
+            raise
+
+
+def shed_reason(depth, lock_wait_ms, lock_wait_at, now=None):
+    """``"queue"`` or ``"lock_wait"`` when new submissions should be refused outright, else None."""
+    now = time.monotonic() if now is None else now
+    if depth >= SHED_QUEUE_DEPTH:
+        return "queue"
+    if lock_wait_ms >= SHED_LOCK_WAIT_MS and now - lock_wait_at <= LOCK_WAIT_WINDOW_SECONDS:
+        return "lock_wait"
+    return None
+
+
+def main(argv=None):
+    import feedback_db
+
+    parser = argparse.ArgumentParser(description="Inspect or reset submission rate limits.")
+    parser.add_argument("command", choices=["status", "reset"])
+    parser.add_argument("--db", default=feedback_db.DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--key", help="bucket to reset, e.g. student:CU2023001 (default: all)")
+    parser.add_argument("--days", type=int, default=14)
+    args = parser.parse_args(argv)
+
+    feedback_db.init_database(args.db)
+    if args.command == "reset":
+        with feedback_db.transaction(args.db) as conn:
+            if args.key:
+                reset = conn.execute("DELETE FROM feedback_rate_limits WHERE key = ?", (args.key,)).rowcount
+            else:
+                reset = conn.execute("DELETE FROM feedback_rate_limits").rowcount
+        print(f"Reset {reset:,} rate limit buckets.")
+        return 0
+
+    limiter = RateLimiter()
+    now = time.time()
+    empty = [row["key"] for row in feedback_db.fetch_all("SELECT key, tokens, updated_at FROM feedback_rate_limits",
+                                                          path=args.db)
+             if limiter._tokens(row["tokens"], row["updated_at"], now) < 1]
+    print(f"{len(empty):,} buckets empty right now (burst {BURST:g}, {PER_HOUR:g} per hour).")
+    for key in empty[:20]:
+        print(f"  {key}")
+    for row in feedback_db.throttle_counts(args.days, path=args.db):
+        print(f"{row['day']}  {row['reason']:<10}{row['count']:>8,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Read-only snapshot replica for heavy analytics reads.
+
+Analytics, SLA reports and exports read a copy of the database kept next to
+it (``<name>_replica.db``, or ``FEEDBACK_REPLICA_PATH``) instead of the live
+file, so their long scans never hold a read snapshot that keeps the WAL from
+being checkpointed behind the submit form's inserts.
+
+A background thread per process copies the live file into the replica with
+the SQLite online backup API. It copies once the live file has seen
+``REFRESH_AFTER_WRITES`` writes, or any write once the replica is
+``REFRESH_SECONDS`` old. The backup runs in a single read transaction on
+the live file, so writers are never blocked. The replica is in WAL mode too,
+so queries already running on it keep their snapshot until they finish.
+
+``read_path`` returns the replica while it is at most
+``MAX_STALENESS_SECONDS`` old and falls back to the live file otherwise.
+``FEEDBACK_REPLICA=0`` turns the replica off.
+
+    python feedback_replica.py refresh
+    python feedback_replica.py status
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import feedback_db
+import feedback_migrations
+
+ENABLED = os.environ.get("FEEDBACK_REPLICA", "1") != "0"
+REPLICA_PATH = os.environ.get("FEEDBACK_REPLICA_PATH")
+REFRESH_SECONDS = float(os.environ.get("FEEDBACK_REPLICA_REFRESH_SECONDS", "60"))
+REFRESH_AFTER_WRITES = int(os.environ.get("FEEDBACK_REPLICA_REFRESH_WRITES", "500"))
+MAX_STALENESS_SECONDS = float(os.environ.get("FEEDBACK_REPLICA_MAX_STALENESS", "300"))
+POLL_SECONDS = 2.0
+
+# Written into the replica after each copy; the live file has no such table.
+INFO_SQL = "SELECT refreshed_at FROM feedback_replica_info WHERE id = 1"
+
+
+def replica_path(path=None):
+    """The replica file for the database at ``path``."""
+    if REPLICA_PATH:
+        return REPLICA_PATH
+    root, ext = os.path.splitext(os.path.abspath(path or feedback_db.DB_PATH))
+    return f"{root}_replica{ext or '.db'}"
+
+
+class SnapshotReplica:
+    """Keeps the replica of one database file current."""
+
+    def __init__(self, path, replica, refresh_seconds=REFRESH_SECONDS, refresh_after_writes=REFRESH_AFTER_WRITES):
+        self.path = path
+        self.replica = replica
+        self.refresh_seconds = refresh_seconds
+        self.refresh_after_writes = refresh_after_writes
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.refreshed_at = None
+        self.replica_seq = None
+        self.refreshes = 0
+        self.last_refresh_ms = 0.0
+
+    def refresh(self):
+        """Copy the live file into the replica now; returns the copy's change token."""
+        with self._lock:
+            started = time.time()
+            source = feedback_db.open_connection(self.path)
+            target = sqlite3.connect(self.replica, isolation_level=None, timeout=feedback_db.BUSY_TIMEOUT_MS / 1000)
+            try:
+                target.execute("PRAGMA journal_mode = WAL")
+                # A crash mid-copy loses only the copy; the next refresh redoes it.
+                target.execute("PRAGMA synchronous = OFF")
+                source.backup(target)
+                target.execute('''
+                    CREATE TABLE IF NOT EXISTS feedback_replica_info (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        refreshed_at REAL NOT NULL
+                    )
+                ''')
+                target.execute("INSERT OR REPLACE INTO feedback_replica_info (id, refreshed_at) VALUES (1, ?)",
+                               (started,))
+                seq = target.execute(feedback_db.CHANGE_TOKEN_SQL).fetchone()[0]
+            finally:
+                target.close()
+                source.close()
+            self.refreshed_at = started
+            self.replica_seq = seq
+            self.refreshes += 1
+            self.last_refresh_ms = (time.time() - started) * 1000
+            return seq
+
+    def age(self):
+        """Seconds since the replica's snapshot was taken, or None without a replica."""
+        if self.refreshed_at is None and os.path.exists(self.replica):
+            try:
+                row = feedback_db.fetch_one(INFO_SQL, path=self.replica)
+                version = feedback_db.fetch_one("PRAGMA user_version", path=self.replica)[0]
+            except sqlite3.Error:
+                row = None
+            # A copy taken before a schema upgrade is not used until refreshed.
+            if row is not None and version == feedback_migrations.LATEST_VERSION:
+                self.refreshed_at = row[0]
+        return None if self.refreshed_at is None else time.time() - self.refreshed_at
+
+    def due(self):
+        """True when the live file has changed enough since the last copy."""
+        age = self.age()
+        if age is None:
+            return True
+        if self.replica_seq is None:
+            self.replica_seq = feedback_db.change_token(self.replica)
+        lag = feedback_db.change_token(self.path) - self.replica_seq
+        return lag >= self.refresh_after_writes or (lag > 0 and age >= self.refresh_seconds)
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._thread_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="feedback-replica", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                if self.due():
+                    self.refresh()
+            except sqlite3.Error:
+                # Retried on the next poll; readers fall back to the live
+                # file once the replica is too old.
+                pass
+            time.sleep(POLL_SECONDS)
+
+    def stats(self):
+        age = self.age()
+        return {
+            "age_seconds": age,
+            "max_staleness_seconds": MAX_STALENESS_SECONDS,
+            "refreshes": self.refreshes,
+            "last_refresh_ms": self.last_refresh_ms,
+        }
+
+
+_replicas = {}
+_replicas_lock = threading.Lock()
+
+
+def get_replica(path=None):
+    """Return this process's replica manager for ``path``, creating it on first use."""
+    key = (os.getpid(), os.path.abspath(path or feedback_db.DB_PATH))
+    replica = _replicas.get(key)
+    if replica is None:
+        with _replicas_lock:
+            replica = _replicas.get(key)
+            if replica is None:
+                replica = _replicas[key] = SnapshotReplica(key[1], replica_path(key[1]))
+    return replica
+
+
+def read_path(path=None, start=True):
+    """The file heavy read-only views should query: the replica while fresh enough, else ``path``.
+
+    Starts the refresh thread on first use unless ``start`` is false
+    (one-off scripts that should not copy the database on their way out).
+    """
+    if not ENABLED:
+        return path
+    replica = get_replica(path)
+    if start:
+        replica._ensure_started()
+    age = replica.age()
+    return replica.replica if age is not None and age <= MAX_STALENESS_SECONDS else path
+
+
+def staleness(path=None):
+    """Seconds the data behind ``read_path(path)`` may be behind the live file (0 when it is live)."""
+    if not ENABLED:
+        return 0.0
+    age = get_replica(path).age()
+    return age if age is not None and age <= MAX_STALENESS_SECONDS else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh or inspect the analytics replica.")
+    parser.add_argument("command", choices=["refresh", "status"])
+    parser.add_argument("--db", default=feedback_db.DB_PATH, help="database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    feedback_db.init_database(args.db)
+    replica = get_replica(args.db)
+    if args.command == "refresh":
+        seq = replica.refresh()
+        print(f"Replica {replica.replica} refreshed at change {seq:,} ({replica.last_refresh_ms:.0f} ms).")
+        return 0
+
+    age = replica.age()
+    if age is None:
+        print(f"No replica at {replica.replica}.")
+        return 1
+    lag = feedback_db.change_token(args.db) - feedback_db.change_token(replica.replica)
+    print(f"Replica {replica.replica} is {age:,.0f}s old and {lag:,} writes behind "
+          f"(reads fall back to the live file after {MAX_STALENESS_SECONDS:g}s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Trigger-maintained count rollups behind the Analytics tab.
+
+``feedback_rollups`` holds one row per (dimension, value) with the number of
+submissions carrying that value. Triggers on ``feedback_submissions`` keep it
+current on INSERT, UPDATE and DELETE, so each Analytics chart reads a handful
+of pre-aggregated rows no matter how large the table grows. Counts are
+all-time: rows moved to ``feedback_archive`` stay counted.
+
+    python feedback_rollups.py rebuild   # recompute from scratch
+    python feedback_rollups.py check     # compare against live counts
+"""
+
+import argparse
+import sys
+
+import feedback_archive
+
+DIMENSIONS = ("category", "priority", "feedback_type", "department", "status")
+
+
+def _increment(dimension, row):
+    # INSERT ... SELECT needs a WHERE clause before ON CONFLICT to parse.
+    return f'''
+        INSERT INTO feedback_rollups (dimension, value, count)
+        SELECT '{dimension}', {row}.{dimension}, 1 WHERE {row}.{dimension} IS NOT NULL
+        ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+    '''
+
+
+def _decrement(dimension, row):
+    return f'''
+        UPDATE feedback_rollups SET count = count - 1
+        WHERE dimension = '{dimension}' AND value = {row}.{dimension};
+    '''
+
+
+def create_rollups(conn):
+    """Create the rollup table and its triggers (used by a migration)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feedback_rollups (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_rollups_insert
+        AFTER INSERT ON feedback_submissions
+        BEGIN
+            {"".join(_increment(d, "NEW") for d in DIMENSIONS)}
+        END
+    ''')
+    conn.execute(_delete_trigger())
+    for dimension in DIMENSIONS:
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_feedback_rollups_update_{dimension}
+            AFTER UPDATE OF {dimension} ON feedback_submissions
+            WHEN OLD.{dimension} IS NOT NEW.{dimension}
+            BEGIN
+                {_decrement(dimension, "OLD")}
+                {_increment(dimension, "NEW")}
+            END
+        ''')
+
+
+def _delete_trigger(when=""):
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_rollups_delete
+        AFTER DELETE ON feedback_submissions
+        {when}
+        BEGIN
+            {"".join(_decrement(d, "OLD") for d in DIMENSIONS)}
+        END
+    '''
+
+
+def keep_archived_counts(conn):
+    """Stop counting down rows moved to the archive (used by a migration)."""
+    conn.execute("DROP TRIGGER IF EXISTS trg_feedback_rollups_delete")
+    conn.execute(_delete_trigger(feedback_archive.NOT_ARCHIVED))
+
+
+def rebuild_rollups(conn, source=feedback_archive.ALL_SUBMISSIONS):
+    """Recompute every rollup row from ``source`` (hot and archived submissions).
+
+    Call inside a write transaction so readers never see a half-built table.
+    """
+    conn.execute("DELETE FROM feedback_rollups")
+    for dimension in DIMENSIONS:
+        conn.execute(f'''
+            INSERT INTO feedback_rollups (dimension, value, count)
+            SELECT '{dimension}', {dimension}, COUNT(*)
+            FROM {source}
+            WHERE {dimension} IS NOT NULL
+            GROUP BY {dimension}
+        ''')
+
+
+def check_rollups(conn, source=feedback_archive.ALL_SUBMISSIONS):
+    """Return ``(dimension, value, rollup_count, live_count)`` for every mismatch."""
+    mismatches = []
+    for dimension in DIMENSIONS:
+        live = dict(conn.execute(f'''
+            SELECT {dimension}, COUNT(*) FROM {source}
+            WHERE {dimension} IS NOT NULL GROUP BY {dimension}
+        '''))
+        rolled = dict(conn.execute(
+            "SELECT value, count FROM feedback_rollups WHERE dimension = ? AND count != 0",
+            (dimension,),
+        ))
+        for value in sorted(live.keys() | rolled.keys()):
+            if live.get(value, 0) != rolled.get(value, 0):
+                mismatches.append((dimension, value, rolled.get(value, 0), live.get(value, 0)))
+    return mismatches
+
+
+def main(argv=None):
+    import feedback_db
+
+    parser = argparse.ArgumentParser(description="Rebuild or verify the Analytics rollup tables.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--db", default=feedback_db.DB_PATH, help="database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    feedback_db.init_database(args.db)
+    if args.command == "rebuild":
+        with feedback_db.transaction(args.db) as conn:
+            rebuild_rollups(conn)
+        print("Rollups rebuilt.")
+        return 0
+
+    with feedback_db.connection(args.db) as conn:
+        mismatches = check_rollups(conn)
+    for dimension, value, rolled, live in mismatches:
+        print(f"{dimension}={value!r}: rollup {rolled}, live {live}")
+    print("Rollups consistent." if not mismatches else f"{len(mismatches)} mismatched rollup rows.")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
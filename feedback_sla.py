@@ -0,0 +1,244 @@
+"""Trigger-maintained daily rollups behind the response-time SLA charts.
+
+``feedback_sla_daily`` has one row per (UTC submission day, priority,
+department) with the number of submissions, responses and SLA breaches, the
+summed response time in hours, and a histogram of response times over
+``BUCKET_BOUNDS`` (one ``bucket_N`` column per bucket). Medians and tail
+percentiles are estimated from the summed histogram, so a year of trends
+reads a few thousand pre-aggregated rows instead of every submission, and
+the table grows with the number of days, not submissions.
+
+Triggers on ``feedback_submissions`` keep it current on INSERT, DELETE and on
+any UPDATE that moves a row between days, priorities or departments or
+changes its response date. Rows moved to ``feedback_archive``
+stay counted.
+
+A response breaches the SLA when it arrives after ``sla_hours(priority)``.
+The Help page promises a reply within 24 hours for urgent matters and within
+3-5 business days otherwise; five business days is counted as seven
+calendar days, which is exact for anything submitted on a weekday.
+
+    python feedback_sla.py rebuild   # recompute from scratch
+    python feedback_sla.py check     # compare against live counts
+"""
+
+import argparse
+import sys
+
+import feedback_archive
+
+SLA_HOURS = {"Urgent": 24}
+DEFAULT_SLA_HOURS = 7 * 24
+
+# Upper bounds (hours) of the response-time buckets; the last bucket is open.
+BUCKET_BOUNDS = (1, 2, 4, 8, 12, 16, 24, 36, 48, 72, 96, 120, 168, 240, 336, 504, 720, 1440)
+BUCKET_COLUMNS = tuple(f"bucket_{i}" for i in range(len(BUCKET_BOUNDS) + 1))
+
+COUNT_COLUMNS = ("submitted", "responded", "breached", "response_hours") + BUCKET_COLUMNS
+TRACKED_COLUMNS = ("submission_date", "priority", "department", "response_date")
+
+
+def sla_hours(priority):
+    return SLA_HOURS.get(priority, DEFAULT_SLA_HOURS)
+
+
+def sla_expression(row):
+    """SQL for the SLA deadline in hours of ``row`` (a table alias, NEW or OLD)."""
+    cases = " ".join(f"WHEN '{priority}' THEN {hours}" for priority, hours in SLA_HOURS.items())
+    return f"(CASE {row}.priority {cases} ELSE {DEFAULT_SLA_HOURS} END)"
+
+
+def _bucket(hours):
+    cases = " ".join(f"WHEN {hours} < {bound} THEN {i}" for i, bound in enumerate(BUCKET_BOUNDS))
+    return f"(CASE WHEN {hours} IS NULL THEN NULL {cases} ELSE {len(BUCKET_BOUNDS)} END)"
+
+
+def _contributions(row, source="", sign=1):
+    """SELECT of (day, priority, department, *COUNT_COLUMNS) for ``row``.
+
+    ``row`` is NEW or OLD inside a trigger, or an alias defined by ``source``
+    (a FROM clause). ``sign=-1`` negates the counts to retract a row.
+    """
+    counts = [
+        "1",
+        "h.hours IS NOT NULL",
+        "COALESCE(h.hours > h.sla, 0)",
+        "COALESCE(h.hours, 0)",
+    ] + [f"h.bucket IS {i}" for i in range(len(BUCKET_COLUMNS))]
+    if sign < 0:
+        counts = [f"-({count})" for count in counts]
+    columns = ", ".join(f"{count} AS {column}" for count, column in zip(counts, COUNT_COLUMNS))
+    return f'''
+        SELECT h.day, h.priority, h.department, {columns}
+        FROM (
+            SELECT b.*, {_bucket("b.hours")} AS bucket
+            FROM (
+                SELECT date({row}.submission_date) AS day, {row}.priority AS priority,
+                       {row}.department AS department, {sla_expression(row)} AS sla,
+                       MAX(0, (julianday({row}.response_date) - julianday({row}.submission_date)) * 24) AS hours
+                {source}
+            ) b
+        ) h
+        WHERE h.day IS NOT NULL
+    '''
+
+
+def _apply(row, sign):
+    # Retracting is an upsert of negated counts, so INSERT, DELETE and UPDATE
+    # share one statement. INSERT ... SELECT needs the WHERE clause inside
+    # _contributions before ON CONFLICT to parse.
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in COUNT_COLUMNS)
+    return f'''
+        INSERT INTO feedback_sla_daily (day, priority, department, {", ".join(COUNT_COLUMNS)})
+        {_contributions(row, sign=sign)}
+        ON CONFLICT (day, priority, department) DO UPDATE SET {updates};
+    '''
+
+
+def create_sla_rollups(conn):
+    """Create the SLA rollup table and its triggers (used by a migration)."""
+    counts = "".join(
+        f"{column} {'REAL' if column == 'response_hours' else 'INTEGER'} NOT NULL, "
+        for column in COUNT_COLUMNS
+    )
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS feedback_sla_daily (
+            day TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            department TEXT NOT NULL,
+            {counts}
+            PRIMARY KEY (day, priority, department)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_sla_insert
+        AFTER INSERT ON feedback_submissions
+        BEGIN
+            {_apply("NEW", 1)}
+        END
+    ''')
+    conn.execute(_delete_trigger())
+    changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in TRACKED_COLUMNS)
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_sla_update
+        AFTER UPDATE OF {", ".join(TRACKED_COLUMNS)} ON feedback_submissions
+        WHEN {changed}
+        BEGIN
+            {_apply("OLD", -1)}
+            {_apply("NEW", 1)}
+        END
+    ''')
+    # Unanswered submissions, for counting open breaches. Partial, so it only
+    # holds the open backlog rather than the whole table.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_unanswered
+        ON feedback_submissions (priority, submission_date, department)
+        WHERE response_date IS NULL
+    ''')
+
+
+def _delete_trigger(when=""):
+    return f'''
+        CREATE TRIGGER IF NOT EXISTS trg_feedback_sla_delete
+        AFTER DELETE ON feedback_submissions
+        {when}
+        BEGIN
+            {_apply("OLD", -1)}
+        END
+    '''
+
+
+def keep_archived_counts(conn):
+    """Stop retracting rows moved to the archive (used by a migration)."""
+    conn.execute("DROP TRIGGER IF EXISTS trg_feedback_sla_delete")
+    conn.execute(_delete_trigger(feedback_archive.NOT_ARCHIVED))
+
+
+def _live_sql(source):
+    sums = ", ".join(f"SUM({column})" for column in COUNT_COLUMNS)
+    per_row = _contributions("s", source=f"FROM {source} s")
+    return f"SELECT day, priority, department, {sums} FROM ({per_row}) GROUP BY 1, 2, 3"
+
+
+def rebuild_sla_rollups(conn, source=feedback_archive.ALL_SUBMISSIONS):
+    """Recompute the SLA rollups from ``source`` (hot and archived submissions).
+
+    Call inside a write transaction so readers never see a half-built table.
+    """
+    conn.execute("DELETE FROM feedback_sla_daily")
+    conn.execute(f'''
+        INSERT INTO feedback_sla_daily (day, priority, department, {", ".join(COUNT_COLUMNS)})
+        {_live_sql(source)}
+    ''')
+
+
+def check_sla_rollups(conn, source=feedback_archive.ALL_SUBMISSIONS):
+    """Return ``(key, rollup, live)`` for every day/priority/department that disagrees.
+
+    Compares the integer counts; summed hours are left out because
+    floating-point sums drift slightly under incremental updates.
+    """
+    integer_columns = [column for column in COUNT_COLUMNS if column != "response_hours"]
+    positions = [3 + COUNT_COLUMNS.index(column) for column in integer_columns]
+    live = {row[:3]: tuple(row[i] for i in positions) for row in conn.execute(_live_sql(source))}
+    rolled = {
+        row[:3]: row[3:]
+        for row in conn.execute(f'''
+            SELECT day, priority, department, {", ".join(integer_columns)}
+            FROM feedback_sla_daily WHERE submitted != 0
+        ''')
+    }
+    empty = (0,) * len(integer_columns)
+    mismatches = []
+    for key in sorted(live.keys() | rolled.keys()):
+        if live.get(key, empty) != rolled.get(key, empty):
+            mismatches.append((key, rolled.get(key, empty), live.get(key, empty)))
+    return mismatches
+
+
+def percentile(histogram, fraction):
+    """Estimate a percentile in hours from per-bucket counts (in BUCKET_COLUMNS order).
+
+    Interpolates linearly inside the bucket the percentile falls in; the open
+    last bucket reports its lower bound.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    target = fraction * total
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        if count and seen + count >= target:
+            lower = BUCKET_BOUNDS[bucket - 1] if bucket else 0
+            if bucket >= len(BUCKET_BOUNDS):
+                return float(lower)
+            return lower + (BUCKET_BOUNDS[bucket] - lower) * (target - seen) / count
+        seen += count
+    return float(BUCKET_BOUNDS[-1])
+
+
+def main(argv=None):
+    import feedback_db
+
+    parser = argparse.ArgumentParser(description="Rebuild or verify the SLA rollup table.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--db", default=feedback_db.DB_PATH, help="database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    feedback_db.init_database(args.db)
+    if args.command == "rebuild":
+        with feedback_db.transaction(args.db) as conn:
+            rebuild_sla_rollups(conn)
+        print("SLA rollups rebuilt.")
+        return 0
+
+    with feedback_db.connection(args.db) as conn:
+        mismatches = check_sla_rollups(conn)
+    for (day, priority, department), rolled, live in mismatches:
+        print(f"{day} {priority} {department}: rollup {rolled}, live {live}")
+    print("SLA rollups consistent." if not mismatches else f"{len(mismatches)} mismatched SLA rows.")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
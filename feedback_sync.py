@@ -0,0 +1,166 @@
+"""Incremental sync for admin views that stay open all day.
+
+A ``SyncedView`` loads the submissions it shows once, together with two
+marks read in the same snapshot: the last id handed out and the change
+counter (``feedback_changes.seq``). Every later ``refresh`` reads only
+
+- rows inserted since (``id`` above the first mark; ids only grow),
+- rows updated since (``updated_seq`` above the second mark; a trigger
+  stamps every UPDATE with the counter value it bumped to), and
+- ids deleted or archived since (tombstones in ``feedback_deletions``),
+
+and merges them into the rows it holds. Each of those is an index range
+over the changes only, and when nothing changed a refresh reads just the
+two marks, so the cost of a refresh follows the number of changes, not the
+size of the table.
+
+Tombstones are only kept for ``FEEDBACK_SYNC_TOMBSTONE_HOURS`` (default 24):
+``prune_tombstones``, run after every archive pass, deletes older ones and
+records the newest counter value it dropped. A view whose marks predate
+that value may have missed a deletion and reloads in full instead.
+"""
+
+import os
+
+import feedback_db
+
+POLL_SECONDS = float(os.environ.get("FEEDBACK_SYNC_POLL_SECONDS", "10"))
+TOMBSTONE_HOURS = float(os.environ.get("FEEDBACK_SYNC_TOMBSTONE_HOURS", "24"))
+
+OPEN_STATUSES = ("Pending", "In Progress")
+
+MARKS_SQL = '''
+    SELECT
+        COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'feedback_submissions'), 0),
+        (SELECT seq FROM feedback_changes WHERE id = 1)
+'''
+
+LOAD_SQL = "SELECT {columns} FROM feedback_submissions WHERE status IN ({statuses})"
+
+# Rows both inserted and updated since the marks come back from the first
+# half only.
+CHANGED_SQL = '''
+    SELECT {columns} FROM feedback_submissions WHERE id > ?
+    UNION ALL
+    SELECT {columns} FROM feedback_submissions WHERE updated_seq > ? AND id <= ?
+'''
+
+DELETED_SQL = "SELECT id FROM feedback_deletions WHERE deleted_seq > ?"
+
+HORIZON_SQL = "SELECT pruned_seq FROM feedback_tombstone_horizon WHERE id = 1"
+
+# Counter values only grow with time, so everything up to the newest
+# expired tombstone is expired too. Tombstones from before deleted_at
+# existed have none.
+EXPIRED_SEQ_SQL = '''
+    SELECT MAX(deleted_seq) FROM feedback_deletions
+    WHERE deleted_at IS NULL OR deleted_at < datetime('now', ?)
+'''
+
+
+class MarksExpired(Exception):
+    """Raised by ``read_changes`` when tombstones newer than the marks were pruned."""
+
+
+def prune_tombstones(path=None, hours=TOMBSTONE_HOURS):
+    """Delete tombstones older than ``hours``; returns how many."""
+    with feedback_db.transaction(path) as conn:
+        expired = conn.execute(EXPIRED_SEQ_SQL, (f"-{hours} hours",)).fetchone()[0]
+        if expired is None:
+            return 0
+        pruned = conn.execute("DELETE FROM feedback_deletions WHERE deleted_seq <= ?", (expired,)).rowcount
+        conn.execute("UPDATE feedback_tombstone_horizon SET pruned_seq = MAX(pruned_seq, ?) WHERE id = 1",
+                     (expired,))
+    return pruned
+
+
+def read_changes(marks, columns, path=None):
+    """``(marks, changed_rows, deleted_ids)`` since ``marks`` (``(last_id, seq)``).
+
+    Everything is read in one snapshot, so the returned marks cover exactly
+    the rows returned. ``changed_rows`` is None when nothing changed.
+    Raises MarksExpired when deletions since ``marks`` may have been pruned.
+    """
+    with feedback_db.connection(path) as conn:
+        conn.execute("BEGIN")
+        try:
+            current = tuple(conn.execute(MARKS_SQL).fetchone())
+            if current == tuple(marks):
+                return current, None, []
+            last_id, seq = marks
+            if seq < conn.execute(HORIZON_SQL).fetchone()[0]:
+                raise MarksExpired()
+            sql = CHANGED_SQL.format(columns=", ".join(columns))
+            rows = conn.execute(sql, (last_id, seq, last_id)).fetchall()
+            deleted = [row[0] for row in conn.execute(DELETED_SQL, (seq,))]
+        finally:
+            conn.commit()
+    return current, rows, deleted
+
+
+class SyncedView:
+    """The submissions with one of ``statuses``, kept current by ``refresh``.
+
+    Keep one per session (e.g. in ``st.session_state``); ``frame`` is only
+    rebuilt after a refresh that changed something.
+    """
+
+    def __init__(self, statuses=OPEN_STATUSES, columns=feedback_db.MANAGE_COLUMNS):
+        self.statuses = tuple(statuses)
+        self.columns = tuple(columns)
+        self.marks = None
+        self._rows = {}
+        self._frame = None
+        self._status = self.columns.index("status")
+        self._date = self.columns.index("submission_date")
+
+    def refresh(self, path=None):
+        """Load or sync the rows; returns how many rows were added, changed or removed."""
+        if self.marks is None:
+            return self._load(path)
+        try:
+            self.marks, rows, deleted = read_changes(self.marks, self.columns, path)
+        except MarksExpired:
+            return self._load(path)
+        if rows is None:
+            return 0
+        changed = 0
+        for submission_id in deleted:
+            changed += self._rows.pop(submission_id, None) is not None
+        for row in rows:
+            if row[self._status] in self.statuses:
+                self._rows[row[0]] = row
+                changed += 1
+            else:
+                changed += self._rows.pop(row[0], None) is not None
+        if changed:
+            self._frame = None
+        return changed
+
+    def _load(self, path):
+        with feedback_db.connection(path) as conn:
+            conn.execute("BEGIN")
+            try:
+                marks = tuple(conn.execute(MARKS_SQL).fetchone())
+                sql = LOAD_SQL.format(columns=", ".join(self.columns),
+                                      statuses=", ".join("?" * len(self.statuses)))
+                rows = conn.execute(sql, self.statuses).fetchall()
+            finally:
+                conn.commit()
+        self.marks = marks
+        self._rows = {row[0]: row for row in rows}
+        self._frame = None
+        return len(rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def frame(self):
+        """The rows as a typed DataFrame, newest first."""
+        if self._frame is None:
+            import pandas as pd
+
+            rows = sorted(self._rows.values(), key=lambda row: (row[self._date] or "", row[0]), reverse=True)
+            self._frame = feedback_db.typed_frame(pd.DataFrame.from_records(rows, columns=self.columns))
+        return self._frame
@@ -0,0 +1,66 @@
+"""Priority triage queue with leased claims and versioned admin updates.
+
+The queue holds every Pending submission, Urgent first, then High, Medium
+and Low, oldest first within a priority. A partial expression index serves
+it in exactly that order. An admin claims the next items in one UPDATE, which
+stamps them with a lease of ``LEASE_MINUTES``; claimed items drop out of the
+queue until the lease expires or the item is answered.
+
+Every admin update checks and bumps the row's ``version`` column, so an
+update made from a stale copy is reported as a conflict instead of silently
+overwriting someone else's response.
+"""
+
+import os
+
+LEASE_MINUTES = int(os.environ.get("FEEDBACK_CLAIM_LEASE_MINUTES", "15"))
+
+TRIAGE_ORDER = ("Urgent", "High", "Medium", "Low")
+# The queue query must repeat this expression verbatim to use the index.
+RANK_SQL = "CASE priority {} ELSE {} END".format(
+    " ".join(f"WHEN '{priority}' THEN {rank}" for rank, priority in enumerate(TRIAGE_ORDER[:-1])),
+    len(TRIAGE_ORDER) - 1,
+)
+
+UNCLAIMED_SQL = f'''
+    SELECT id FROM feedback_submissions
+    WHERE status = 'Pending' AND (claim_expires IS NULL OR claim_expires <= CURRENT_TIMESTAMP)
+    ORDER BY {RANK_SQL}, submission_date, id
+    LIMIT ?
+'''
+
+CLAIM_SQL = f'''
+    UPDATE feedback_submissions
+    SET claimed_by = ?, claim_expires = datetime('now', ?)
+    WHERE id IN ({UNCLAIMED_SQL})
+    RETURNING id
+'''
+
+
+def create_triage_queue(conn):
+    """Add the version and claim columns and their indexes (used by a migration)."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(feedback_submissions)")}
+    for column, definition in (
+        ("version", "INTEGER NOT NULL DEFAULT 0"),
+        ("claimed_by", "TEXT"),
+        ("claim_expires", "TIMESTAMP"),
+    ):
+        if column not in existing:
+            conn.execute(f"ALTER TABLE feedback_submissions ADD COLUMN {column} {definition}")
+    # claim_expires is the last key column so skipping claimed items never
+    # leaves the index.
+    conn.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_feedback_triage
+        ON feedback_submissions ({RANK_SQL}, submission_date, id, claim_expires)
+        WHERE status = 'Pending'
+    ''')
+    # Claims are looked up per admin; only claimed rows are in this index.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_feedback_claimed_by
+        ON feedback_submissions (claimed_by) WHERE claimed_by IS NOT NULL
+    ''')
+
+
+def lease_modifier(minutes=None):
+    """The ``datetime('now', ?)`` modifier for a lease of ``minutes``."""
+    return f"+{LEASE_MINUTES if minutes is None else minutes} minutes"
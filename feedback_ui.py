@@ -0,0 +1,336 @@
+"""Static CSS and HTML blocks for the Streamlit pages.
+
+They live in an imported module so they are built once per process instead
+of on every script rerun.
+"""
+
+
+# Custom CSS for beautiful styling
+PAGE_CSS = """
+<style>
+    .main-header {
+        font-size: 3rem;
+        color: #1f4e79;
+        text-align: center;
+        margin-bottom: 2rem;
+        font-weight: bold;
+        text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
+    }
+
+    .sub-header {
+        font-size: 1.8rem;
+        color: #2c5aa0;
+        margin-bottom: 1.5rem;
+        font-weight: 600;
+    }
+
+    .welcome-text {
+        font-size: 1.2rem;
+        color: #333;
+        line-height: 1.6;
+        text-align: center;
+        margin: 2rem 0;
+    }
+
+    .info-box, .feature-card, .success-box, .admin-section, .footer {
+        color: #1a1a1a !important;
+        background: #e9ecef !important;
+    }
+
+    .info-box *, .feature-card *, .success-box *, .admin-section *, .footer * {
+        color: #1a1a1a !important;
+    }
+
+    .main-header, .sub-header {
+        color: #1f4e79;
+    }
+
+    .metric-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        padding: 1.5rem;
+        border-radius: 1rem;
+        text-align: center;
+        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
+    }
+
+    .metric-value {
+        font-size: 2.5rem;
+        font-weight: bold;
+        margin-bottom: 0.5rem;
+    }
+
+    .metric-label {
+        font-size: 1rem;
+        opacity: 0.9;
+    }
+
+    .feature-card {
+        background: white;
+        padding: 1.5rem;
+        border-radius: 1rem;
+        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
+        margin: 1rem 0;
+        border: 1px solid #e9ecef;
+        transition: transform 0.3s ease;
+    }
+
+    .feature-card:hover {
+        transform: translateY(-5px);
+    }
+
+    .admin-section {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        padding: 1rem;
+        border-radius: 0.5rem;
+        margin: 1rem 0;
+    }
+
+    .footer {
+        text-align: center;
+        color: #666;
+        margin-top: 3rem;
+        padding: 2rem;
+        border-top: 1px solid #e9ecef;
+    }
+</style>
+"""
+
+
+# Banners shown after a successful write
+SUBMIT_SUCCESS_BANNER = """
+<div class="success-box" style="background-color: #e8f5e9; border-left: 6px solid #4CAF50; color: #155724; font-size: 1.15rem;">
+    <strong>✅ Feedback Submitted Successfully!</strong><br>
+    Your feedback has been recorded and will be reviewed by the appropriate department. 
+    You will receive a confirmation email shortly. Follow its progress on the 'Track My Submission' page.
+</div>
+"""
+
+ADMIN_SUCCESS_BANNER = """
+<div class="success-box" style="background-color: #e3f2fd; border-left: 6px solid #1976d2; color: #0d2a4d; font-size: 1.1rem;">
+    <strong>✅ Submission updated successfully!</strong><br>
+    The feedback status and response have been updated.
+</div>
+"""
+
+
+# Sidebar
+SIDEBAR_HEADER = """
+<div style='text-align: center; padding: 1rem;'>
+    <h2 style='color: white; margin-bottom: 0.5rem;'>🎓 Caleb University</h2>
+    <p style='color: #e0e0e0; font-size: 0.9rem; margin: 0;'>Feedback & Grievance System</p>
+</div>
+"""
+
+
+# Welcome page
+WELCOME_TEXT = """
+<div class="welcome-text">
+    Welcome to Caleb University's comprehensive feedback and grievance redressal system. 
+    This platform is designed to provide students with a seamless way to submit feedback, 
+    report grievances, and contribute to the continuous improvement of our academic community.
+</div>
+"""
+
+FEATURE_EASY_SUBMISSION = """
+<div class="feature-card">
+    <h3 style="color: #1f4e79; margin-bottom: 1rem;">📝 Easy Submission</h3>
+    <p>Submit feedback and grievances through our user-friendly interface with comprehensive form validation.</p>
+</div>
+"""
+
+FEATURE_CONFIDENTIAL = """
+<div class="feature-card">
+    <h3 style="color: #1f4e79; margin-bottom: 1rem;">🔒 Confidential & Secure</h3>
+    <p>All submissions are treated with strict confidentiality and stored securely in our database.</p>
+</div>
+"""
+
+FEATURE_ANALYTICS = """
+<div class="feature-card">
+    <h3 style="color: #1f4e79; margin-bottom: 1rem;">📊 Real-time Analytics</h3>
+    <p>Access comprehensive analytics and insights to understand feedback patterns and trends.</p>
+</div>
+"""
+
+
+# Submit Feedback page
+SUBMIT_INFO = """
+<div style="
+    background: #f5f7fa;
+    border-left: 6px solid #1f4e79;
+    padding: 1.2rem 1.5rem;
+    border-radius: 0.7rem;
+    margin-bottom: 1.5rem;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.04);
+    color: #1a1a1a;
+">
+    <span style="font-size:1.2rem;font-weight:bold;color:#1f4e79;">📋 Important Information:</span>
+    <ul style="margin-top:0.7rem;">
+        <li>All submissions are confidential and will be reviewed by the appropriate department.</li>
+        <li>Please provide accurate and constructive feedback.</li>
+        <li>For urgent matters, contact your department head directly.</li>
+        <li>You will receive a confirmation email once your submission is processed.</li>
+    </ul>
+</div>
+"""
+
+
+# Track My Submission page
+TRACK_INFO = (
+    "Enter the Student ID and email address you used when submitting. Both must match; new responses "
+    "can take up to {ttl:g} seconds to appear."
+)
+
+NO_TRACKED_SUBMISSIONS = """
+<div class="info-box">
+    <h3 style="text-align: center;">No submissions found</h3>
+    <p style="text-align: center;">Check that the Student ID and email match the ones on your submission.</p>
+</div>
+"""
+
+
+# Admin panel empty states
+NO_DASHBOARD_DATA = """
+<div class="info-box">
+    <h3 style="text-align: center;">No feedback submissions found</h3>
+    <p style="text-align: center;">Submit your first feedback using the form!</p>
+</div>
+"""
+
+NO_ANALYTICS_DATA = """
+<div class="info-box">
+    <h3 style="text-align: center;">No data available for analytics</h3>
+    <p style="text-align: center;">Submit some feedback first!</p>
+</div>
+"""
+
+SLA_NOTE = (
+    "Response targets: 24 hours for Urgent, 5 business days (counted as 7 calendar days) otherwise. "
+    "Figures are grouped by the day a submission arrived; median, p90 and p99 are in hours and "
+    "estimated from bucketed response times."
+)
+
+TEXT_ANALYTICS_NOTE = (
+    "Sentiment is the mean polarity of known positive and negative words in a submission; topics group "
+    "submissions by their TF-IDF terms. Both are computed once per submission in the background, so new "
+    "submissions appear within a minute or so, once the analytics snapshot catches up."
+)
+
+NO_TEXT_ANALYTICS = (
+    "No text analytics yet. Run `python feedback_enrich.py backfill` once (it needs scikit-learn) to analyse "
+    "existing submissions; new ones are then picked up here automatically."
+)
+
+THROTTLE_NOTE = (
+    "Each student ID, email address and browser session may send {burst:g} submissions in a row and "
+    "{per_hour:g} more per hour. New submissions are refused outright while {queue:,} are waiting to be "
+    "written or the last write waited over {lock_wait:,.0f} ms for the database. The table counts refusals "
+    "from every app and API process per day (student, email and session are rate limits; queue and "
+    "lock_wait are load shedding)."
+)
+
+# Canned admin responses offered by the bulk update panel.
+CANNED_RESPONSES = {
+    "Resolved": "Thank you for your feedback. This issue has been resolved; please let us know if it recurs.",
+    "Under review": "We have received your submission and forwarded it to the responsible department.",
+    "Duplicate": "This duplicates an existing submission that is already being handled.",
+    "Out of scope": "This falls outside the scope of Student Affairs. Please contact the relevant office directly.",
+}
+
+NO_SUBMISSIONS = """
+<div class="info-box">
+    <h3 style="text-align: center;">No submissions to manage</h3>
+    <p style="text-align: center;">No feedback submissions found in the system.</p>
+</div>
+"""
+
+
+# Help & Support page
+HELP_INTRO = """
+<div style="
+    background: #f5f7fa;
+    border-left: 6px solid #d63384;
+    padding: 1.2rem 1.5rem;
+    border-radius: 0.7rem;
+    margin-bottom: 1.5rem;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.04);
+    color: #1a1a1a;
+">
+    <span style="font-size:1.2rem;font-weight:bold;color:#d63384;">☎️ Need Help?</span>
+    <p style="margin-top:0.7rem;">
+        If you need assistance with the feedback system or have questions, please contact:
+    </p>
+</div>
+"""
+
+HELP_CONTACTS = """
+<div class="feature-card">
+    <h3 style="color: #1f4e79; margin-bottom: 1rem;">📧 Contact Information</h3>
+    <p><strong>IT Support:</strong><br>
+    Email: itsupport@calebuniversity.edu.ng<br>
+    Phone: +234-803-123-4567</p>
+    <p><strong>Student Affairs:</strong><br>
+    Email: studentaffairs@calebuniversity.edu.ng<br>
+    Phone: +234-802-234-5678</p>
+    <p><strong>Academic Affairs:</strong><br>
+    Email: academics@calebuniversity.edu.ng<br>
+    Phone: +234-701-345-6789</p>
+</div>
+"""
+
+HELP_FAQ = """
+<div class="feature-card">
+    <h3 style="color: #1f4e79; margin-bottom: 1rem;">📋 FAQ</h3>
+    <details>
+        <summary><strong>How do I submit feedback?</strong></summary>
+        <p>Use the 'Submit Feedback' page to fill out the form with your details and feedback.</p>
+    </details>
+    <details>
+        <summary><strong>How long does it take to get a response?</strong></summary>
+        <p>Responses are typically provided within 3-5 business days for regular submissions, and within 24 hours for urgent matters.</p>
+    </details>
+    <details>
+        <summary><strong>Is my feedback confidential?</strong></summary>
+        <p>Yes, all feedback submissions are treated with strict confidentiality. Only authorized personnel have access to the submissions.</p>
+    </details>
+    <details>
+        <summary><strong>Can I track my submission status?</strong></summary>
+        <p>Yes. Open the 'Track My Submission' page and enter the Student ID and email address you submitted with to see the status of each submission and any response from the department.</p>
+    </details>
+</div>
+"""
+
+HELP_GUIDELINES = """
+<div class="feature-card">
+    <h3 style="color: #1f4e79; margin-bottom: 1rem;">📚 Guidelines for Effective Feedback</h3>
+    <ul>
+        <li><strong>Be Specific:</strong> Provide concrete examples and details</li>
+        <li><strong>Be Constructive:</strong> Suggest solutions when possible</li>
+        <li><strong>Be Respectful:</strong> Use professional and courteous language</li>
+        <li><strong>Be Timely:</strong> Submit feedback as close to the event as possible</li>
+        <li><strong>Be Honest:</strong> Provide accurate and truthful information</li>
+    </ul>
+</div>
+"""
+
+
+# Footer
+FOOTER = """
+<div class="footer">
+    <p>© 2024 Caleb University Feedback System | Developed for Academic Excellence</p>
+    <p style="font-size: 0.9rem; margin-top: 0.5rem;">
+        🎓 Empowering Students, Enhancing Education
+    </p>
+</div>
+"""
+
+
+def metric_card(value, label):
+    return f"""
+<div class="metric-card">
+    <div class="metric-value">{value}</div>
+    <div class="metric-label">{label}</div>
+</div>
+"""
@@ -0,0 +1,51 @@
+"""Form choices and validation rules for feedback submissions.
+
+Shared by the Streamlit submit form and every non-UI write path (bulk
+import, API) so they all accept exactly the same submissions.
+"""
+
+DEPARTMENTS = [
+    "Computer Science", "Engineering", "Business Administration", "Arts & Humanities",
+    "Natural Sciences", "Social Sciences", "Education", "Law", "Medicine",
+]
+FEEDBACK_TYPES = ["Feedback", "Grievance", "Suggestion", "Complaint", "Appreciation"]
+CATEGORIES = [
+    "Academic", "Administrative", "Facilities", "Student Services",
+    "Faculty", "Financial", "Technology", "Other",
+]
+PRIORITIES = ["Low", "Medium", "High", "Urgent"]
+STATUSES = ["Pending", "In Progress", "Completed", "Rejected"]
+
+REQUIRED_FIELDS = ("student_id", "student_name", "email", "feedback_text")
+CHOICE_FIELDS = {
+    "department": DEPARTMENTS,
+    "feedback_type": FEEDBACK_TYPES,
+    "category": CATEGORIES,
+    "priority": PRIORITIES,
+}
+
+# Student IDs and emails are stored as typed; lookups by them ignore case
+# and surrounding whitespace. The SQL forms match the lookup indexes.
+KEY_WHITESPACE = " \t\n\r"
+STUDENT_ID_KEY_SQL = "TRIM(student_id, ' ' || char(9, 10, 13)) COLLATE NOCASE"
+EMAIL_KEY_SQL = "TRIM(email, ' ' || char(9, 10, 13)) COLLATE NOCASE"
+
+MISSING_FIELDS_ERROR = "Please fill in all required fields marked with *."
+INVALID_EMAIL_ERROR = "Please enter a valid email address."
+
+
+def submission_error(submission):
+    """Return the form's error message for ``submission``, or None if it is valid."""
+    if not all(submission.get(field) for field in REQUIRED_FIELDS):
+        return MISSING_FIELDS_ERROR
+    if any(submission.get(field) not in choices for field, choices in CHOICE_FIELDS.items()):
+        return MISSING_FIELDS_ERROR
+    email = submission["email"]
+    if "@" not in email or "." not in email:
+        return INVALID_EMAIL_ERROR
+    return None
+
+
+def student_key(student_id, email):
+    """``(student_id, email)`` as lookups compare them: trimmed, upper- and lower-case."""
+    return (student_id or "").strip(KEY_WHITESPACE).upper(), (email or "").strip(KEY_WHITESPACE).lower()
@@ -0,0 +1,216 @@
+"""Coalescing background writer for feedback submissions.
+
+Submissions go into a bounded queue drained by a single writer thread per
+database. The writer takes whatever is pending, waits up to
+``BATCH_WINDOW_MS`` for more, and commits the whole group in one
+transaction, so a burst of students submitting at once costs a handful of
+commits instead of one lock round-trip each. Callers block on a future for
+their own row id. When the queue is full, ``submit`` raises
+``WriteQueueFull`` instead of letting requests pile up; it does so early,
+before the queue fills, while ``feedback_ratelimit.shed_reason`` says the
+database is overloaded. Each submission's rate limit buckets are charged in
+the same transaction that inserts it (see feedback_ratelimit), and the student's
+cached Track My Submission pages are dropped once it commits.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import feedback_db
+import feedback_dedup
+import feedback_enrich
+import feedback_ratelimit
+
+QUEUE_SIZE = int(os.environ.get("FEEDBACK_WRITE_QUEUE_SIZE", "1000"))
+BATCH_WINDOW_MS = float(os.environ.get("FEEDBACK_WRITE_BATCH_MS", "5"))
+MAX_BATCH = 500
+SUBMIT_TIMEOUT = 2.0
+RESULT_TIMEOUT = 30.0
+
+
+class WriteQueueFull(Exception):
+    """Raised when the write queue stays full for the whole submit timeout."""
+
+
+class SubmissionWriter:
+    def __init__(self, path, queue_size=QUEUE_SIZE, batch_window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.path = path
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.submitted = 0
+        self.committed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.last_commit_ms = 0.0
+        self.throttled = 0
+        self.shed = 0
+        self.last_lock_wait_ms = 0.0
+        self._lock_wait_at = 0.0
+        self.limiter = feedback_ratelimit.RateLimiter()
+
+    def submit(self, submission, timeout=SUBMIT_TIMEOUT, keys=()):
+        """Queue one submission and return a Future for its row id.
+
+        ``keys`` are its rate limit buckets (``feedback_ratelimit.limit_keys``);
+        the Future raises ``feedback_ratelimit.RateLimited`` if one is empty.
+        """
+        self._ensure_started()
+        reason = feedback_ratelimit.shed_reason(self._queue.qsize(), self.last_lock_wait_ms, self._lock_wait_at)
+        if reason:
+            self.limiter.count(reason)
+            with self._lock:
+                self.shed += 1
+            raise WriteQueueFull("The database is overloaded; new submissions are refused for now.")
+        try:
+            self.limiter.check(keys)
+        except feedback_ratelimit.RateLimited:
+            with self._lock:
+                self.throttled += 1
+            raise
+        future = Future()
+        try:
+            self._queue.put((submission, keys, future), timeout=timeout)
+        except queue.Full:
+            self.limiter.count("queue")
+            with self._lock:
+                self.rejected += 1
+            raise WriteQueueFull("The submission queue is full.") from None
+        with self._lock:
+            self.submitted += 1
+        return future
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "submitted": self.submitted,
+                "committed": self.committed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "avg_batch_size": self.committed / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "last_commit_ms": self.last_commit_ms,
+                "last_lock_wait_ms": self.last_lock_wait_ms,
+                "throttled": self.throttled,
+                "shed": self.shed,
+            }
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(
+                        target=self._run, name="feedback-writer", daemon=True)
+                    self._thread.start()
+                    # Analyses what this writer inserts, off the request path.
+                    feedback_enrich.start_background(self.path)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = feedback_db.open_connection(self.path)
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            try:
+                ids = self._write(conn, [(submission, keys) for submission, keys, _ in batch])
+            except Exception:
+                # Something in the group failed; write one by one so only
+                # the offending submissions report an error.
+                ids = []
+                for submission, keys, future in batch:
+                    try:
+                        ids.extend(self._write(conn, [(submission, keys)]))
+                    except Exception as exc:
+                        ids.append(exc)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            feedback_db.invalidate_cache(self.path)
+
+            ok = throttled = 0
+            for (submission, _, future), result in zip(batch, ids):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                    throttled += isinstance(result, feedback_ratelimit.RateLimited)
+                else:
+                    feedback_db.forget_student(submission.get("student_id") or "", submission.get("email") or "", self.path)
+                    future.set_result(result)
+                    ok += 1
+            with self._lock:
+                self.committed += ok
+                self.throttled += throttled
+                self.failed += len(batch) - ok - throttled
+                self.batches += 1
+                self.largest_batch = max(self.largest_batch, len(batch))
+                self.last_commit_ms = elapsed_ms
+
+    def _write(self, conn, items):
+        """Insert each ``(submission, keys)`` in one transaction; returns ids, or RateLimited for refused ones."""
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        self.last_lock_wait_ms = (time.perf_counter() - started) * 1000
+        self._lock_wait_at = time.monotonic()
+        try:
+            ids = []
+            for submission, keys in items:
+                refused = self.limiter.take(conn, keys) if keys else None
+                ids.append(refused or conn.execute(
+                    feedback_db.INSERT_SUBMISSION_SQL,
+                    tuple(submission.get(field) for field in feedback_db.SUBMISSION_FIELDS),
+                ).lastrowid)
+            feedback_dedup.index_new_submissions(conn)
+            self.limiter.save_counts(conn)
+        except BaseException:
+            conn.rollback()
+            for _, keys in items:
+                self.limiter.forget(keys)
+            raise
+        conn.commit()
+        return ids
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path=None):
+    """Return this process's writer for ``path``, creating it on first use."""
+    key = (os.getpid(), os.path.abspath(path or feedback_db.DB_PATH))
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(key)
+            if writer is None:
+                writer = _writers[key] = SubmissionWriter(key[1])
+    return writer
+
+
+def submit_feedback(submission, path=None, timeout=RESULT_TIMEOUT, session=None):
+    """Queue a submission, wait for its batch to commit and return its id.
+
+    Raises WriteQueueFull under backpressure and feedback_ratelimit.RateLimited
+    when the student, email or ``session`` has submitted too often.
+    """
+    keys = feedback_ratelimit.limit_keys(submission, session)
+    return get_writer(path).submit(submission, keys=keys).result(timeout=timeout)
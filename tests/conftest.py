@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedback_db  # noqa: E402
+
+SUBMISSION = {
+    "student_id": "CU2023001",
+    "student_name": "Test Student",
+    "email": "test.student@caleb.edu.ng",
+    "department": "Computer Science",
+    "course_code": "CSC101",
+    "feedback_type": "Feedback",
+    "category": "Academic",
+    "priority": "Medium",
+    "feedback_text": "The lecture notes for this course are always uploaded late.",
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh database at the latest schema version."""
+    path = str(tmp_path / "feedback.db")
+    feedback_db.init_database(path)
+    yield path
+    feedback_db.close_pools()
+
+
+def submission(**fields):
+    return dict(SUBMISSION, **fields)
@@ -0,0 +1,31 @@
+import feedback_archive
+import feedback_db
+import feedback_import
+from feedback_generator import generate_submissions
+
+
+def totals(path):
+    metrics = feedback_db.submission_metrics(days=3650, path=path)
+    return (
+        {key: metrics[key] for key in ("total", "pending", "high_priority", "this_week", "departments")},
+        feedback_db.analytics_counts(path=path),
+        feedback_db.sla_summary("priority", days=None, path=path),
+        feedback_db.sla_summary("department", days=None, path=path),
+    )
+
+
+def test_archiving_leaves_every_total_unchanged(db):
+    feedback_import.bulk_import(generate_submissions(800, seed=6), db)
+    before = totals(db)
+    oldest_resolved = feedback_db.fetch_one(
+        "SELECT id FROM feedback_submissions WHERE status IN ('Completed', 'Rejected') "
+        "ORDER BY submission_date LIMIT 1", path=db)[0]
+
+    archived = feedback_archive.archive_resolved(db)["archived"]
+
+    assert archived > 0
+    assert feedback_db.archived_count(path=db) == archived
+    assert totals(db) == before
+    assert before[0]["total"] == 800
+    row = feedback_db.get_submission(oldest_resolved, db)
+    assert row is not None and row["archived_date"] is not None
@@ -0,0 +1,29 @@
+import threading
+
+import pytest
+
+import feedback_db
+
+
+def test_acquire_times_out_when_the_pool_is_exhausted(db):
+    pool = feedback_db.ConnectionPool(db, size=1)
+    conn = pool.acquire()
+    with pytest.raises(feedback_db.DatabaseBusy):
+        pool.acquire(timeout=0.1)
+    pool.release(conn)
+    pool.release(pool.acquire(timeout=0.1))
+    pool.close()
+
+
+def test_discarded_connection_is_replaced_for_a_waiting_caller(db):
+    pool = feedback_db.ConnectionPool(db, size=1)
+    conn = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiter.start()
+    pool.discard(conn)
+    waiter.join(5)
+    assert len(acquired) == 1 and acquired[0] is not conn
+    assert acquired[0].execute("SELECT COUNT(*) FROM feedback_submissions").fetchone() == (0,)
+    pool.release(acquired[0])
+    pool.close()
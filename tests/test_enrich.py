@@ -0,0 +1,27 @@
+import pytest
+
+import feedback_db
+import feedback_enrich
+import feedback_import
+from conftest import submission
+from feedback_generator import generate_submissions
+
+pytest.importorskip("sklearn")
+
+
+def analysed(path):
+    return feedback_db.fetch_one("SELECT COUNT(*) FROM feedback_text_features", path=path)[0]
+
+
+def test_refit_leaves_the_history_to_backfill(db):
+    feedback_import.bulk_import(generate_submissions(300, seed=0), db)
+    feedback_enrich.fit(db, n_topics=3, sample=300)
+
+    assert feedback_enrich.enrich_new(db) == 0
+    feedback_import.bulk_import([submission(), submission()], db)
+    assert feedback_enrich.enrich_new(db) == 2
+
+    stats = feedback_enrich.backfill(db, workers=1, batch_size=100)
+    assert stats["rows"] == 300
+    assert analysed(db) == 302
+    assert feedback_enrich.backfill(db, workers=1)["rows"] == 0
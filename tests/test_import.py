@@ -0,0 +1,37 @@
+import json
+
+import feedback_db
+import feedback_dedup
+import feedback_generator
+import feedback_import
+from conftest import SUBMISSION
+
+
+def test_malformed_json_lines_are_rejected_not_fatal(db, tmp_path):
+    source = tmp_path / "rows.jsonl"
+    source.write_text("\n".join([json.dumps(SUBMISSION), "{bad json", "[1, 2]", json.dumps(SUBMISSION)]) + "\n")
+    rejects = []
+
+    result = feedback_import.bulk_import(feedback_import.read_rows(str(source)), db,
+                                         on_reject=lambda line, row, error: rejects.append((line, error)))
+
+    assert result["inserted"] == 2
+    assert result["rejected"] == 2
+    assert [line for line, _ in rejects] == [2, 3]
+    assert rejects[0][1].startswith("Invalid JSON")
+    assert rejects[1][1] == "Not a JSON object."
+
+
+def test_deferred_import_clusters_like_a_chunked_one(tmp_path):
+    rows = list(feedback_generator.generate_submissions(3000, seed=1))
+    clusters = []
+    for name, options in [("chunked", {"chunk_size": 250}), ("deferred", {"defer_indexes": True})]:
+        path = str(tmp_path / f"{name}.db")
+        feedback_import.bulk_import(iter(rows), path, **options)
+        with feedback_db.connection(path) as conn:
+            assert feedback_dedup.check_duplicate_index(conn) == []
+            clusters.append(conn.execute("SELECT submission_id, cluster_id FROM feedback_duplicates "
+                                         "ORDER BY submission_id").fetchall())
+        feedback_db.close_pools()
+    assert len(clusters[0]) == 3000
+    assert clusters[0] == clusters[1]
@@ -0,0 +1,74 @@
+import os
+import shutil
+
+import feedback_db
+import feedback_dedup
+import feedback_import
+import feedback_migrations
+import feedback_rollups
+import feedback_sla
+from feedback_generator import generate_submissions
+
+SHIPPED_DATABASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "feedback_database.db")
+
+
+def database_at(path, version, rows):
+    """A database built by the first ``version`` migrations and holding ``rows`` generated submissions."""
+    conn = feedback_db.open_connection(path)
+    for applied, migration in enumerate(feedback_migrations.MIGRATIONS[:version], 1):
+        conn.execute("BEGIN IMMEDIATE")
+        migration(conn)
+        conn.execute(f"PRAGMA user_version = {applied}")
+        conn.commit()
+    values = [feedback_import.clean_row(row)[0] for row in generate_submissions(rows, seed=2)]
+    conn.execute("BEGIN IMMEDIATE")
+    conn.executemany(feedback_import.BULK_INSERT_SQL, values)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'feedback_duplicates'").fetchone():
+        # Inserts cluster themselves once the index exists.
+        feedback_dedup.index_submissions(conn, conn.execute("SELECT id, feedback_text FROM feedback_submissions"))
+    conn.commit()
+    conn.close()
+
+
+def assert_consistent(path):
+    feedback_dedup.backfill(path)
+    with feedback_db.connection(path) as conn:
+        assert feedback_migrations.schema_version(conn) == feedback_migrations.LATEST_VERSION
+        assert feedback_rollups.check_rollups(conn) == []
+        assert feedback_sla.check_sla_rollups(conn) == []
+        assert feedback_dedup.check_duplicate_index(conn) == []
+        assert feedback_dedup.backfill_pending(conn) == 0
+        total = conn.execute("SELECT COUNT(*) FROM feedback_submissions").fetchone()[0]
+        indexed = conn.execute("SELECT COUNT(*) FROM feedback_fts").fetchone()[0]
+        assert indexed == total
+
+
+def test_upgrade_from_the_base_schema(tmp_path):
+    path = str(tmp_path / "old.db")
+    database_at(path, 1, 400)
+
+    applied = feedback_db.init_database(path)
+
+    assert applied == list(range(2, feedback_migrations.LATEST_VERSION + 1))
+    assert_consistent(path)
+    feedback_db.close_pools()
+
+
+def test_upgrade_from_every_version_with_rows(tmp_path):
+    for version in range(1, feedback_migrations.LATEST_VERSION):
+        path = str(tmp_path / f"v{version}.db")
+        database_at(path, version, 50)
+        assert feedback_db.init_database(path) == list(range(version + 1, feedback_migrations.LATEST_VERSION + 1))
+        assert_consistent(path)
+    feedback_db.close_pools()
+
+
+def test_upgrade_of_the_shipped_database(tmp_path):
+    path = str(tmp_path / "feedback_database.db")
+    shutil.copyfile(SHIPPED_DATABASE, path)
+
+    feedback_db.init_database(path)
+
+    assert_consistent(path)
+    assert feedback_db.init_database(path) == []
+    feedback_db.close_pools()
@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+import feedback_db
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import check_query_plans  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def plans(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("plans") / "plans.db")
+    check_query_plans.seed(path, 5000)
+    yield check_query_plans.query_plans(path)
+    feedback_db.close_pools()
+
+
+@pytest.mark.parametrize("name", sorted(check_query_plans.HOT_QUERIES))
+def test_hot_query_does_not_scan_large_tables(plans, name):
+    assert check_query_plans.full_scans(name, check_query_plans.HOT_QUERIES[name][0], plans[name]) == set()
+
+
+def test_full_scans_are_found_under_aliases(db):
+    sql = "SELECT * FROM feedback_duplicate_clusters AS c WHERE size > 1"
+    with feedback_db.connection(db) as conn:
+        steps = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    assert check_query_plans.full_scans("ad_hoc", sql, steps) == {"feedback_duplicate_clusters"}
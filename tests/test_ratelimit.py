@@ -0,0 +1,44 @@
+import feedback_db
+import feedback_ratelimit
+
+KEYS = ("student:CU2023001", "email:test.student@caleb.edu.ng")
+
+
+def take(db, limiter, keys, now):
+    with feedback_db.transaction(db) as conn:
+        return limiter.take(conn, keys, now=now)
+
+
+def tokens(db, key):
+    return feedback_db.fetch_one(feedback_ratelimit.BUCKET_SQL, (key,), path=db)[0]
+
+
+def test_burst_then_refill(db):
+    limiter = feedback_ratelimit.RateLimiter(burst=3, per_hour=3600)
+
+    assert [take(db, limiter, KEYS, now=1000.0) for _ in range(3)] == [None, None, None]
+    refused = take(db, limiter, KEYS, now=1000.0)
+    assert isinstance(refused, feedback_ratelimit.RateLimited)
+    assert refused.kind == "student"
+    assert refused.retry_after == 1
+
+    assert take(db, limiter, KEYS, now=1001.0) is None
+    assert take(db, limiter, KEYS, now=1001.0) is not None
+    # Refill stops at the burst size.
+    for _ in range(3):
+        assert take(db, limiter, KEYS, now=5000.0) is None
+    assert tokens(db, KEYS[0]) == 0
+
+
+def test_charges_all_keys_or_none(db):
+    limiter = feedback_ratelimit.RateLimiter(burst=2, per_hour=3600)
+    email_only = ("email:test.student@caleb.edu.ng",)
+    assert take(db, limiter, email_only, now=1000.0) is None
+    assert take(db, limiter, email_only, now=1000.0) is None
+
+    refused = take(db, limiter, ("student:CU2023001",) + email_only, now=1000.0)
+
+    assert refused.kind == "email"
+    # The student bucket was not charged for the refused submission.
+    assert feedback_db.fetch_one(feedback_ratelimit.BUCKET_SQL, ("student:CU2023001",), path=db) is None
+    assert tokens(db, email_only[0]) == 0
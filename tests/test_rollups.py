@@ -0,0 +1,39 @@
+import feedback_archive
+import feedback_db
+import feedback_dedup
+import feedback_import
+import feedback_rollups
+import feedback_sla
+from feedback_generator import generate_submissions
+
+
+def assert_rollups_match(path):
+    with feedback_db.connection(path) as conn:
+        assert feedback_rollups.check_rollups(conn) == []
+        assert feedback_sla.check_sla_rollups(conn) == []
+        assert feedback_dedup.check_duplicate_index(conn) == []
+
+
+def test_triggers_keep_rollups_consistent_through_every_write(db):
+    feedback_import.bulk_import(generate_submissions(600, seed=3), db)
+    assert_rollups_match(db)
+
+    pending = [row[0] for row in feedback_db.fetch_all(
+        "SELECT id FROM feedback_submissions WHERE status = 'Pending' ORDER BY id LIMIT 40", path=db)]
+    for submission_id in pending[:20]:
+        feedback_db.update_submission(submission_id, "Completed", "Resolved.", path=db)
+    feedback_db.bulk_update_submissions(pending[20:], "In Progress", "Looking into it.", path=db)
+    assert_rollups_match(db)
+
+    with feedback_db.transaction(db) as conn:
+        conn.execute("DELETE FROM feedback_submissions WHERE id IN (SELECT id FROM feedback_submissions LIMIT 25)")
+    assert_rollups_match(db)
+
+    assert feedback_archive.archive_resolved(db)["archived"] > 0
+    assert_rollups_match(db)
+
+
+def test_deferred_import_rebuilds_consistent_rollups(db):
+    feedback_import.bulk_import(generate_submissions(300, seed=4), db)
+    feedback_import.bulk_import(generate_submissions(300, seed=5), db, defer_indexes=True)
+    assert_rollups_match(db)
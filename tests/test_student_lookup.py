@@ -0,0 +1,49 @@
+import feedback_archive
+import feedback_db
+import feedback_validation
+from conftest import submission
+
+
+def test_padded_and_differently_cased_keys_match(db):
+    stored = feedback_db.insert_submission(submission(student_id="CU1 ", email=" a@b.com"), path=db)
+    for student_id, email in (("CU1 ", " a@b.com"), ("cu1", "A@B.com"), ("\tCu1", "a@b.com\n")):
+        rows, cursor = feedback_db.student_submissions(student_id, email, path=db)
+        assert [row["id"] for row in rows] == [stored], (student_id, email)
+        assert cursor is None
+
+
+def test_email_must_match_too(db):
+    feedback_db.insert_submission(submission(student_id="CU1"), path=db)
+    assert feedback_db.student_submissions("CU1", "someone.else@caleb.edu.ng", path=db) == ([], None)
+
+
+def test_pages_cover_hot_and_archived_rows(db):
+    ids = [feedback_db.insert_submission(submission(), path=db) for _ in range(5)]
+    with feedback_db.transaction(db) as conn:
+        conn.execute("UPDATE feedback_submissions SET submission_date = datetime('2025-01-01', '+' || id || ' days')")
+        conn.execute("UPDATE feedback_submissions SET status = 'Completed' WHERE id <= 2")
+    with feedback_db.transaction(db) as conn:
+        feedback_archive.archive_batch(conn, "2100-01-01")
+    feedback_db.forget_student(submission()["student_id"], submission()["email"], path=db)
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = feedback_db.student_submissions("cu2023001", "TEST.student@caleb.edu.ng",
+                                                       after=cursor, page_size=2, path=db)
+        seen += [row["id"] for row in rows]
+        if cursor is None:
+            break
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_lookup_uses_the_index(db):
+    sql = feedback_db._student_page_query(("2025-01-01 00:00:00", 10), feedback_db.STUDENT_PAGE_SIZE)
+    params = {"student": "CU1", "email": "a@b.com", "date": "2025-01-01 00:00:00", "id": 10, "limit": 11}
+    with feedback_db.connection(db) as conn:
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    assert any("idx_feedback_student_lookup" in step for step in plan)
+    assert any("idx_feedback_archive_student_lookup" in step for step in plan)
+
+
+def test_student_key_matches_the_rate_limit_keys():
+    assert feedback_validation.student_key(" cu1\t", " A@B.com ") == ("CU1", "a@b.com")
@@ -0,0 +1,52 @@
+import feedback_archive
+import feedback_db
+import feedback_sync
+from conftest import submission
+
+
+def _delete(db, submission_id):
+    with feedback_db.transaction(db) as conn:
+        conn.execute("DELETE FROM feedback_submissions WHERE id = ?", (submission_id,))
+
+
+def test_refresh_applies_inserts_updates_and_deletes(db):
+    first, second = (feedback_db.insert_submission(submission(), path=db) for _ in range(2))
+    view = feedback_sync.SyncedView()
+    assert view.refresh(db) == 2
+    assert view.refresh(db) == 0
+
+    third = feedback_db.insert_submission(submission(), path=db)
+    feedback_db.update_submission(first, "Completed", "Done.", path=db)
+    _delete(db, second)
+    assert view.refresh(db) == 3
+    assert set(view._rows) == {third}
+
+
+def test_prune_keeps_recent_tombstones(db):
+    submission_id = feedback_db.insert_submission(submission(), path=db)
+    _delete(db, submission_id)
+    assert feedback_sync.prune_tombstones(db) == 0
+    assert feedback_db.fetch_one("SELECT COUNT(*) FROM feedback_deletions", path=db)[0] == 1
+
+
+def test_view_reloads_when_its_tombstones_were_pruned(db):
+    kept, deleted = (feedback_db.insert_submission(submission(), path=db) for _ in range(2))
+    view = feedback_sync.SyncedView()
+    view.refresh(db)
+    _delete(db, deleted)
+    with feedback_db.transaction(db) as conn:
+        conn.execute("UPDATE feedback_deletions SET deleted_at = datetime('now', '-2 days')")
+    assert feedback_sync.prune_tombstones(db) == 1
+    assert feedback_db.fetch_one("SELECT COUNT(*) FROM feedback_deletions", path=db)[0] == 0
+
+    view.refresh(db)
+    assert set(view._rows) == {kept}
+
+
+def test_archive_run_prunes_expired_tombstones(db):
+    submission_id = feedback_db.insert_submission(submission(), path=db)
+    _delete(db, submission_id)
+    with feedback_db.transaction(db) as conn:
+        conn.execute("UPDATE feedback_deletions SET deleted_at = datetime('now', '-2 days')")
+    stats = feedback_archive.archive_resolved(db)
+    assert stats["tombstones_pruned"] == 1
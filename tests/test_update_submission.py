@@ -0,0 +1,37 @@
+import pytest
+
+import feedback_db
+from conftest import submission
+
+
+def test_update_at_the_read_version_applies_and_bumps_it(db):
+    submission_id = feedback_db.insert_submission(submission(), db)
+    version = feedback_db.get_submission(submission_id, db)["version"]
+
+    assert feedback_db.update_submission(submission_id, "Completed", "Fixed.", version=version, path=db)
+
+    row = feedback_db.get_submission(submission_id, db)
+    assert (row["status"], row["admin_response"], row["version"]) == ("Completed", "Fixed.", version + 1)
+    assert row["response_date"] is not None
+
+
+def test_stale_version_raises_with_the_current_row(db):
+    submission_id = feedback_db.insert_submission(submission(), db)
+    version = feedback_db.get_submission(submission_id, db)["version"]
+    feedback_db.update_submission(submission_id, "In Progress", "On it.", version=version, path=db)
+
+    with pytest.raises(feedback_db.UpdateConflict) as conflict:
+        feedback_db.update_submission(submission_id, "Rejected", "Duplicate.", version=version, path=db)
+
+    assert conflict.value.current["version"] == version + 1
+    assert conflict.value.current["admin_response"] == "On it."
+    assert feedback_db.get_submission(submission_id, db)["status"] == "In Progress"
+
+
+def test_unconditional_update_and_missing_row(db):
+    submission_id = feedback_db.insert_submission(submission(), db)
+    feedback_db.update_submission(submission_id, "In Progress", "On it.", path=db)
+
+    assert feedback_db.update_submission(submission_id, "Completed", "Done.", path=db)
+    assert not feedback_db.update_submission(submission_id + 1, "Completed", "Done.", path=db)
+    assert not feedback_db.update_submission(submission_id + 1, "Completed", "Done.", version=0, path=db)